@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the API JSON renderers on a large project payload.
+
+Builds a synthetic project (backlog plus a roadmap tree) in memory, serializes
+it with the real DRF serializers and times `JSONRenderer` against
+`ORJSONRenderer`. No database access is needed.
+
+Usage:
+  python benchmark_renderers.py [--items 2000] [--repeat 20]
+"""
+import os
+import sys
+import timeit
+import argparse
+from pathlib import Path
+from datetime import date, timedelta
+
+BASE = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_projects.settings')
+import django
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from projects.models import Project, Feature, Bug, Improvement, Roadmap, RoadmapPhase, RoadmapItem
+from projects.renderers import ORJSONRenderer
+from projects.serializers import (
+    FeatureSerializer, BugSerializer, ImprovementSerializer, RoadmapItemSerializer
+)
+
+
+def build_payload(items):
+    """Return a ProjectSerializer/RoadmapSerializer shaped payload with `items` rows per collection."""
+    now = timezone.now()
+    project = Project(id=1, user_id=1, name='Benchmark project', created_at=now)
+
+    def backlog(model, serializer_class, status):
+        rows = [
+            model(
+                id=i, project=project, description=f'{model.__name__} {i} ' + 'lorem ipsum ' * 8,
+                status=status, rank=i, tags='["backend", "api"]',
+                estimated_work_time=timedelta(hours=i % 40, minutes=15),
+                priority=('low', 'medium', 'high')[i % 3],
+                deadline=date(2026, 1, 1) + timedelta(days=i % 365),
+                created_at=now,
+            )
+            for i in range(items)
+        ]
+        return serializer_class(rows, many=True).data
+
+    roadmap = Roadmap(id=1, project=project, name='Roadmap', created_at=now, updated_at=now)
+    phases = []
+    for p in range(10):
+        phase = RoadmapPhase(id=p, roadmap=roadmap, name=f'Phase {p}', order=p, created_at=now, updated_at=now)
+        phase_items = [
+            RoadmapItem(
+                id=p * items + i, roadmap_phase=phase, title=f'Item {i}', description='dolor sit amet ' * 4,
+                estimated_work_time=timedelta(days=i % 3, hours=i % 8),
+                deadline=date(2026, 6, 1) + timedelta(days=i % 90),
+                created_at=now, updated_at=now,
+            )
+            for i in range(items // 10)
+        ]
+        phases.append({
+            'id': phase.id, 'roadmapId': roadmap.id, 'name': phase.name, 'order': phase.order,
+            'targetDate': None, 'estimatedWorkTime': None, 'deadline': None, 'status': phase.status,
+            'items': RoadmapItemSerializer(phase_items, many=True).data,
+            'createdAt': now.isoformat(), 'updatedAt': now.isoformat(),
+        })
+
+    return {
+        'id': project.id,
+        'name': project.name,
+        'features': backlog(Feature, FeatureSerializer, 'pending'),
+        'bugs': backlog(Bug, BugSerializer, 'open'),
+        'improvements': backlog(Improvement, ImprovementSerializer, 'pending'),
+        'roadmaps': [{'id': roadmap.id, 'name': roadmap.name, 'phases': phases}],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=2000, help='Rows per backlog collection')
+    parser.add_argument('--repeat', type=int, default=20, help='Renders per timing run')
+    args = parser.parse_args()
+
+    payload = build_payload(args.items)
+    renderers = [('JSONRenderer', JSONRenderer()), ('ORJSONRenderer', ORJSONRenderer())]
+
+    size = len(JSONRenderer().render(payload))
+    print(f'Payload: {size / 1024:.1f} KiB, {args.items} rows per collection')
+    baseline = None
+    for name, renderer in renderers:
+        best = min(timeit.repeat(lambda: renderer.render(payload), number=args.repeat, repeat=5)) / args.repeat
+        baseline = baseline or best
+        print(f'{name:16} {best * 1000:8.2f} ms/render  ({baseline / best:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
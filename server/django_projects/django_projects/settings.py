@@ -26,9 +26,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'projects.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'projects.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -54,13 +56,68 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'django_projects.wsgi.application'
+ASGI_APPLICATION = 'django_projects.asgi.application'
 
 
 # Database
+# Connections come from psycopg 3's native pool (one pool per process), so
+# CONN_MAX_AGE stays 0. Health checks make the pool ping a connection on
+# checkout instead of handing out a dead one. Set DB_POOL=0 when running
+# behind an external pooler.
 DATABASES = {
-    'default': dj_database_url.config(conn_max_age=600, ssl_require=True)
+    'default': dj_database_url.config(conn_max_age=0, conn_health_checks=True, ssl_require=True)
 }
 
+# Read replicas: comma separated URLs. Safe /api/ requests read from them
+# (see projects.db_routers); tests mirror them onto the default database, so
+# pointing a replica at DATABASE_URL is a valid local setup.
+for index, replica_url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(','))):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(
+        replica_url.strip(), conn_max_age=0, conn_health_checks=True, ssl_require=True
+    )
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+
+if DATABASES['default'] and os.environ.get('DB_POOL', '1') == '1':
+    for database in DATABASES.values():
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1 if DEBUG else 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4 if DEBUG else 10)),
+            # Seconds a request waits for a free connection before erroring.
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 600)),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+        }
+
+DATABASE_ROUTERS = ['projects.db_routers.ReplicaRouter']
+# Seconds a user's reads stay on the primary after they write.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+# Seconds a GET waits for an identical in-flight request (see viewsets.SingleFlightMixin)
+# before computing the response itself.
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 30))
+
+# Shared cache. Without REDIS_URL each process gets its own local memory cache,
+# which is enough for a single worker but not for cross-process state.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Broker behind the /api/events/ change stream; the in-memory one only reaches
+# clients connected to the same process.
+EVENTS_BROKER = os.environ.get(
+    'EVENTS_BROKER', 'projects.events.RedisBroker' if REDIS_URL else 'projects.events.InMemoryBroker'
+)
+# Seconds between keep-alive comments on idle event streams.
+EVENTS_KEEPALIVE_SECONDS = int(os.environ.get('EVENTS_KEEPALIVE_SECONDS', 15))
+
+# Token Prometheus must send (Authorization: Bearer <token>) to read /api/metrics/.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -105,6 +162,15 @@ CSRF_TRUSTED_ORIGINS = [
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_RENDERER_CLASSES': [
+        'projects.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'projects.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Compare throughput of the sync (WSGI) and async (ASGI) read endpoints.
+
+Fires the same number of requests at a sync endpoint and at its async twin
+with many concurrent clients, and prints requests/second plus latency
+percentiles for each. Run it against a server started the way it runs in
+production, for example:
+
+  gunicorn django_projects.wsgi -w 2 --threads 4         # WSGI path
+  uvicorn django_projects.asgi:application --workers 2  # ASGI path
+
+Usage:
+  python load_test.py --base-url http://localhost:8000 --token <jwt access token>
+      [--concurrency 50] [--requests 500] [--pair /api/projects/ /api/async/projects/]
+"""
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_PAIRS = [
+    ('/api/projects/', '/api/async/projects/'),
+    ('/api/activities/', '/api/async/activities/'),
+    ('/api/users/me/', '/api/async/users/me/'),
+]
+
+
+def run(url, token, concurrency, total):
+    session = requests.Session()
+    session.headers['Authorization'] = f'Bearer {token}'
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def one(_):
+        start = time.perf_counter()
+        response = session.get(url, timeout=60)
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    return {
+        'rps': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--token', required=True, help='JWT access token for the test user')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--pair', nargs=2, action='append', metavar=('SYNC_PATH', 'ASYNC_PATH'),
+                        help='Sync/async path pair to compare (repeatable)')
+    args = parser.parse_args()
+
+    print(f'{"path":32} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"errors":>7}')
+    for pair in args.pair or DEFAULT_PAIRS:
+        for path in pair:
+            stats = run(args.base_url.rstrip('/') + path, args.token, args.concurrency, args.requests)
+            print(f'{path:32} {stats["rps"]:8.1f} {stats["p50"]:8.1f} {stats["p95"]:8.1f} {stats["errors"]:7}')
+
+
+if __name__ == '__main__':
+    main()
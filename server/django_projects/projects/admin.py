@@ -1,6 +1,75 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import CustomUser, Project, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from django.template.response import TemplateResponse
+from .models import CustomUser, Project, ProjectDetails, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from .bulk import bulk_set
+from .paginators import EstimatedCountPaginator
+
+
+class RelatedAdmin(admin.ModelAdmin):
+    """
+    Admin for models whose `__str__` follows foreign keys.
+
+    `list_select_related` is joined into every queryset the admin builds, not
+    only the changelist's, so autocomplete results render without a query per
+    row. Foreign keys use autocomplete widgets rather than loading every row
+    into a select.
+    """
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+
+class LargeTableAdmin(RelatedAdmin):
+    """Changelist counts come from planner estimates instead of COUNT(*)."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+def bulk_set_action(field):
+    """Admin action that asks for a new `field` value, then sets it on every selected row at once."""
+    @admin.action(description=f'Set {field} of selected %(verbose_name_plural)s')
+    def action(modeladmin, request, queryset):
+        model_field = queryset.model._meta.get_field(field)
+        form_class = type('BulkSetForm', (forms.Form,), {field: model_field.formfield()})
+        if 'apply' in request.POST:
+            form = form_class(request.POST)
+            if form.is_valid():
+                value = form.cleaned_data[field]
+                if value == '' and model_field.null:
+                    value = None
+                changed = bulk_set(queryset, field, value, **modeladmin.bulk_activity)
+                modeladmin.message_user(request, f'Set {field} on {changed} {queryset.model._meta.verbose_name_plural}.')
+                return None
+        else:
+            form = form_class()
+        return TemplateResponse(request, 'admin/projects/bulk_set.html', {
+            **modeladmin.admin_site.each_context(request),
+            'title': f'Set {field}',
+            'opts': modeladmin.model._meta,
+            'form': form,
+            'action': f'set_{field}',
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        })
+    action.__name__ = f'set_{field}'
+    return action
+
+
+class BacklogAdmin(LargeTableAdmin):
+    """Features, bugs and improvements: one admin each, with bulk triage actions."""
+    list_display = ('id', 'project', 'description', 'status', 'rank', 'estimated_work_time', 'priority', 'deadline', 'created_at')
+    list_select_related = ('project',)
+    autocomplete_fields = ('project',)
+    search_fields = ('description', 'project__name')
+    list_filter = ('status', 'priority', 'deadline', 'created_at')
+    fieldsets = (
+        (None, {'fields': ('project', 'description', 'status', 'rank', 'tags', 'estimated_work_time', 'priority', 'deadline')}),
+        ('Timestamps', {'fields': ('created_at',), 'classes': ('collapse',)}),
+    )
+    actions = [bulk_set_action(field) for field in ('status', 'priority', 'deadline', 'rank')]
 
 
 @admin.register(CustomUser)
@@ -9,66 +78,62 @@ class CustomUserAdmin(BaseUserAdmin):
     search_fields = ('email', 'first_name', 'last_name', 'username')
 
 
+class ProjectDetailsInline(admin.StackedInline):
+    model = ProjectDetails
+    can_delete = False
+
+
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(RelatedAdmin):
     list_display = ('id', 'name', 'user', 'created_at')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
     search_fields = ('name', 'description')
     list_filter = ('created_at',)
+    inlines = (ProjectDetailsInline,)
 
 
 @admin.register(Feature)
-class FeatureAdmin(admin.ModelAdmin):
-    list_display = ('id', 'project', 'description', 'status', 'rank', 'estimated_work_time', 'priority', 'deadline', 'created_at')
-    search_fields = ('description', 'project__name')
-    list_filter = ('status', 'priority', 'deadline', 'created_at')
-    fieldsets = (
-        (None, {'fields': ('project', 'description', 'status', 'rank', 'tags', 'estimated_work_time', 'priority', 'deadline')}),
-        ('Timestamps', {'fields': ('created_at',), 'classes': ('collapse',)}),
-    )
+class FeatureAdmin(BacklogAdmin):
+    bulk_activity = {'entity': 'feature', 'noun': 'Feature'}
 
 
 @admin.register(Bug)
-class BugAdmin(admin.ModelAdmin):
-    list_display = ('id', 'project', 'description', 'status', 'rank', 'estimated_work_time', 'priority', 'deadline', 'created_at')
-    search_fields = ('description', 'project__name')
-    list_filter = ('status', 'priority', 'deadline', 'created_at')
-    fieldsets = (
-        (None, {'fields': ('project', 'description', 'status', 'rank', 'tags', 'estimated_work_time', 'priority', 'deadline')}),
-        ('Timestamps', {'fields': ('created_at',), 'classes': ('collapse',)}),
-    )
+class BugAdmin(BacklogAdmin):
+    bulk_activity = {'entity': 'bug', 'noun': 'Bug'}
 
 
 @admin.register(Improvement)
-class ImprovementAdmin(admin.ModelAdmin):
-    list_display = ('id', 'project', 'description', 'status', 'rank', 'estimated_work_time', 'priority', 'deadline', 'created_at')
-    search_fields = ('description', 'project__name')
-    list_filter = ('status', 'priority', 'deadline', 'created_at')
-    fieldsets = (
-        (None, {'fields': ('project', 'description', 'status', 'rank', 'tags', 'estimated_work_time', 'priority', 'deadline')}),
-        ('Timestamps', {'fields': ('created_at',), 'classes': ('collapse',)}),
-    )
+class ImprovementAdmin(BacklogAdmin):
+    bulk_activity = {'entity': 'improvement', 'noun': 'Improvement'}
 
 
 @admin.register(Activity)
-class ActivityAdmin(admin.ModelAdmin):
+class ActivityAdmin(LargeTableAdmin):
     list_display = ('id', 'project', 'type', 'entity', 'created_at')
+    list_select_related = ('project',)
+    autocomplete_fields = ('project',)
     search_fields = ('description', 'project__name')
     list_filter = ('type', 'entity', 'created_at')
 
 
 @admin.register(Roadmap)
-class RoadmapAdmin(admin.ModelAdmin):
+class RoadmapAdmin(RelatedAdmin):
     list_display = ('id', 'project', 'name', 'status', 'created_at', 'updated_at')
+    list_select_related = ('project',)
+    autocomplete_fields = ('project',)
     search_fields = ('name', 'description', 'project__name')
     list_filter = ('status', 'created_at', 'updated_at')
     readonly_fields = ('created_at', 'updated_at')
 
 
 @admin.register(RoadmapPhase)
-class RoadmapPhaseAdmin(admin.ModelAdmin):
+class RoadmapPhaseAdmin(RelatedAdmin):
     list_display = ('id', 'roadmap', 'name', 'order', 'status', 'target_date', 'estimated_work_time', 'deadline', 'created_at')
+    list_select_related = ('roadmap__project',)
+    autocomplete_fields = ('roadmap',)
     search_fields = ('name', 'roadmap__name', 'roadmap__project__name')
-    list_filter = ('status', 'target_date', 'deadline', 'created_at', 'roadmap__project')
+    list_filter = ('status', 'target_date', 'deadline', 'created_at')
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('roadmap', 'order')
     fieldsets = (
@@ -78,11 +143,18 @@ class RoadmapPhaseAdmin(admin.ModelAdmin):
 
 
 @admin.register(RoadmapItem)
-class RoadmapItemAdmin(admin.ModelAdmin):
+class RoadmapItemAdmin(LargeTableAdmin):
     list_display = ('id', 'roadmap_phase', 'title', 'status', 'priority', 'estimated_work_time', 'deadline', 'created_at')
-    search_fields = ('title', 'description', 'roadmap_phase__name', 'roadmap_phase__roadmap__name')
-    list_filter = ('status', 'priority', 'deadline', 'created_at', 'roadmap_phase__roadmap__project')
+    list_select_related = ('roadmap_phase__roadmap',)
+    autocomplete_fields = ('roadmap_phase', 'linked_feature', 'linked_bug', 'linked_improvement')
+    search_fields = (
+        'title', 'description', 'roadmap_phase__name', 'roadmap_phase__roadmap__name',
+        'roadmap_phase__roadmap__project__name',
+    )
+    list_filter = ('status', 'priority', 'deadline', 'created_at')
     readonly_fields = ('created_at', 'updated_at')
+    actions = [bulk_set_action(field) for field in ('status', 'priority', 'deadline')]
+    bulk_activity = {'entity': 'roadmap_item', 'noun': 'Item', 'label': 'title', 'project': 'roadmap_phase__roadmap__project_id'}
     fieldsets = (
         ('Basic Info', {
             'fields': ('roadmap_phase', 'title', 'description', 'status', 'priority', 'estimated_work_time', 'deadline')
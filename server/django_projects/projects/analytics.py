@@ -0,0 +1,55 @@
+"""Workload analytics, aggregated in the database and cached per user until their next write."""
+from django.core.cache import cache
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .models import Feature, Bug, Improvement, RoadmapItem
+from .utils import get_data_version
+
+# Writes outside the API (e.g. the admin) don't log an Activity, so cached results also expire.
+WORKLOAD_CACHE_SECONDS = 3600
+
+
+def workload_querysets(user):
+    owned = (
+        ('feature', Feature.live.filter(project__user=user)),
+        ('bug', Bug.live.filter(project__user=user)),
+        ('improvement', Improvement.live.filter(project__user=user)),
+        ('roadmap_item', RoadmapItem.live.filter(roadmap_phase__roadmap__project__user=user)),
+    )
+    return [
+        queryset.order_by().values('priority', 'status', week=TruncWeek('deadline')).annotate(
+            kind=Value(kind), count=Count('id'), estimated=Sum('estimated_work_time'),
+        )
+        for kind, queryset in owned
+    ]
+
+
+def compute_workload(user):
+    first, *rest = workload_querysets(user)
+    buckets = [
+        {
+            'kind': row['kind'],
+            'priority': row['priority'],
+            'status': row['status'],
+            'week': row['week'],
+            'count': row['count'],
+            'estimatedSeconds': row['estimated'].total_seconds() if row['estimated'] else 0,
+        }
+        for row in first.union(*rest, all=True).order_by('week', 'kind', 'priority', 'status')
+    ]
+    return {'buckets': buckets, 'generatedAt': timezone.now()}
+
+
+def get_workload(user):
+    """Return `{buckets, generatedAt}`: item count and summed estimate per kind, priority, status and deadline week.
+
+    `week` is the Monday of the deadline's week, or None for items without a deadline.
+    """
+    key = f'workload:{user.id}:{get_data_version(user.id)}'
+    result = cache.get(key)
+    if result is None:
+        result = compute_workload(user)
+        cache.set(key, result, WORKLOAD_CACHE_SECONDS)
+    return result
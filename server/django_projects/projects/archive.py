@@ -0,0 +1,220 @@
+"""Single-project archives, for moving or duplicating a project between accounts.
+
+An archive is gzip-compressed NDJSON. The first line is a header and every
+other line is one row, `{"model": <section>, "row": {<column>: value}}`, in
+SECTIONS order so parents always come before their children. Both sides work
+in chunks of ARCHIVE_CHUNK_SIZE rows: export streams from server-side
+cursors, import bulk inserts each chunk and keeps only an old id -> new id
+map per section to rewrite the foreign keys of later rows.
+
+An export reads every section from one REPEATABLE READ snapshot, so rows
+written meanwhile can't leave it with children whose parents are missing.
+Imports stop at ARCHIVE_MAX_BYTES decompressed or ARCHIVE_MAX_ROWS rows.
+"""
+import gzip
+import zlib
+from collections import namedtuple
+
+import orjson
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Project, ProjectDetails, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+
+ARCHIVE_FORMAT = 'project-archive'
+ARCHIVE_VERSION = 1
+ARCHIVE_CHUNK_SIZE = 2000
+ARCHIVE_MAX_BYTES = 256 * 1024 * 1024
+ARCHIVE_MAX_ROWS = 1_000_000
+
+Section = namedtuple('Section', 'name model project_path')
+
+SECTIONS = [
+    Section('project', Project, 'id'),
+    Section('details', ProjectDetails, 'project_id'),
+    Section('feature', Feature, 'project_id'),
+    Section('bug', Bug, 'project_id'),
+    Section('improvement', Improvement, 'project_id'),
+    Section('roadmap', Roadmap, 'project_id'),
+    Section('roadmap_phase', RoadmapPhase, 'roadmap__project_id'),
+    Section('roadmap_item', RoadmapItem, 'roadmap_phase__roadmap__project_id'),
+    Section('activity', Activity, 'project_id'),
+]
+SECTIONS_BY_NAME = {section.name: section for section in SECTIONS}
+
+# Owner and bookkeeping columns; the importing account and time take their place.
+SKIPPED_COLUMNS = {'user_id', 'deleted_at', 'updated_at'}
+
+# Foreign key column -> section its ids come from. Rows whose parent is
+# missing from the archive are dropped; missing link targets become null.
+PARENT_COLUMNS = {'project_id': 'project', 'roadmap_id': 'roadmap', 'roadmap_phase_id': 'roadmap_phase'}
+LINK_COLUMNS = {'linked_feature_id': 'feature', 'linked_bug_id': 'bug', 'linked_improvement_id': 'improvement'}
+
+
+def archive_columns(model):
+    return [field.attname for field in model._meta.concrete_fields if field.attname not in SKIPPED_COLUMNS]
+
+
+def export_archive(project):
+    """Yield the compressed archive of `project` chunk by chunk."""
+    using = project._state.db or 'default'  # the database the request reads from
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    default = DjangoJSONEncoder().default  # durations and anything else orjson can't encode
+    snapshot = not connections[using].in_atomic_block
+    with transaction.atomic(using=using):
+        if snapshot:
+            with connections[using].cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        yield compressor.compress(orjson.dumps({'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION}) + b'\n')
+        for section in SECTIONS:
+            rows = section.model._base_manager.using(using).filter(**{section.project_path: project.id}).order_by(
+                'pk'
+            ).values(*archive_columns(section.model)).iterator(chunk_size=ARCHIVE_CHUNK_SIZE)
+            lines = []
+            for row in rows:
+                lines.append(orjson.dumps({'model': section.name, 'row': row}, default=default))
+                if len(lines) == ARCHIVE_CHUNK_SIZE:
+                    yield compressor.compress(b'\n'.join(lines) + b'\n')
+                    lines = []
+            if lines:
+                yield compressor.compress(b'\n'.join(lines) + b'\n')
+    yield compressor.flush()
+
+
+def archive_lines(archive):
+    """Yield the decompressed lines of `archive`, refusing it past ARCHIVE_MAX_BYTES or ARCHIVE_MAX_ROWS."""
+    remaining = ARCHIVE_MAX_BYTES
+    lines = 0
+    # Never read past the byte budget, even looking for the end of a line.
+    while line := archive.readline(remaining + 1):
+        remaining -= len(line)
+        if remaining < 0:
+            raise ValidationError({'archive': [f'The archive is over {ARCHIVE_MAX_BYTES} bytes uncompressed.']})
+        lines += 1
+        if lines > ARCHIVE_MAX_ROWS + 1:  # the header isn't a row
+            raise ValidationError({'archive': [f'The archive holds more than {ARCHIVE_MAX_ROWS} rows.']})
+        yield line
+
+
+def read_archive(stream):
+    """Yield `(section name, row)` pairs from a compressed archive, reading `stream` incrementally."""
+    try:
+        with gzip.GzipFile(fileobj=stream) as archive:
+            lines = archive_lines(archive)
+            header = orjson.loads(next(lines, b'null'))
+            if not isinstance(header, dict) or header.get('format') != ARCHIVE_FORMAT:
+                raise ValidationError({'archive': ['Not a project archive.']})
+            if header.get('version') != ARCHIVE_VERSION:
+                raise ValidationError({'archive': [f"Unsupported archive version {header.get('version')}."]})
+            for line in lines:
+                if not line.strip():
+                    continue
+                record = orjson.loads(line)
+                if (not isinstance(record, dict) or record.get('model') not in SECTIONS_BY_NAME
+                        or not isinstance(record.get('row'), dict)):
+                    raise ValidationError({'archive': [f'Unexpected record: {line[:100]!r}.']})
+                yield record['model'], record['row']
+    except (OSError, EOFError, zlib.error, orjson.JSONDecodeError) as error:
+        raise ValidationError({'archive': [f'Unreadable archive: {error}.']})
+
+
+class ArchiveImporter:
+    """Recreates an archived project for `user`, one bulk insert per chunk of rows."""
+
+    def __init__(self, user, name=None):
+        self.user = user
+        self.name = name
+        self.ids = {section.name: {} for section in SECTIONS}  # old id -> new id
+        self.counts = {section.name: 0 for section in SECTIONS}
+        self.position = -1
+        self.pending = []
+        self.project = None
+
+    def add(self, section_name, row):
+        position = SECTIONS.index(SECTIONS_BY_NAME[section_name])
+        if position != self.position:
+            if position < self.position:
+                raise ValidationError({'archive': [f"'{section_name}' rows are out of order."]})
+            self.flush()
+            self.position = position
+        if self.project is None and section_name != 'project':
+            raise ValidationError({'archive': ['The archive has to start with its project.']})
+        self.pending.append(row)
+        if len(self.pending) == ARCHIVE_CHUNK_SIZE:
+            self.flush()
+
+    def build(self, model, row):
+        """Return an unsaved instance for an archived row, or None when its parent isn't in the archive."""
+        values = {}
+        for field in model._meta.concrete_fields:
+            name = field.attname
+            if name not in row or name in SKIPPED_COLUMNS:
+                continue
+            value = row[name]
+            if name in PARENT_COLUMNS:
+                value = self.ids[PARENT_COLUMNS[name]].get(value)
+                if value is None:
+                    return None
+            elif name in LINK_COLUMNS:
+                value = self.ids[LINK_COLUMNS[name]].get(value)
+            elif field.primary_key:
+                continue
+            else:
+                try:
+                    value = field.to_python(value)
+                except DjangoValidationError as error:
+                    raise ValidationError({'archive': [f'{model.__name__}.{name}: {"; ".join(error.messages)}']})
+                if field.choices and value is not None and value not in dict(field.flatchoices):
+                    raise ValidationError({'archive': [f'{model.__name__}.{name}: {value!r} is not a valid choice.']})
+            values[name] = value
+        if model is Activity:
+            # Point activities at the imported copies of what they describe.
+            values['entity_id'] = self.ids.get(values.get('entity'), {}).get(values.get('entity_id'))
+        if model is Project:
+            values.update(user=self.user, **({'name': self.name} if self.name else {}))
+        return model(**values)
+
+    def flush(self):
+        if not self.pending:
+            return
+        section = SECTIONS[self.position]
+        rows, self.pending = self.pending, []
+        if section.model is Project and (self.project is not None or len(rows) != 1):
+            raise ValidationError({'archive': ['An archive holds exactly one project.']})
+        built = [(row, obj) for row, obj in ((row, self.build(section.model, row)) for row in rows) if obj is not None]
+        section.model.objects.bulk_create([obj for _, obj in built])
+        if section.model is Project:
+            self.project = built[0][1]
+        stamped = []
+        for row, obj in built:
+            if 'id' in row:
+                self.ids[section.name][row['id']] = obj.pk
+            # bulk_create stamps auto_now_add columns with the current time; restore the archived one.
+            if row.get('created_at') is not None:
+                obj.created_at = section.model._meta.get_field('created_at').to_python(row['created_at'])
+                stamped.append(obj)
+        if stamped:
+            section.model._base_manager.bulk_update(stamped, ['created_at'])
+        self.counts[section.name] += len(built)
+
+
+def import_archive(stream, user, name=None):
+    """Import the archive read from `stream` as a new project of `user`; returns (project, counts)."""
+    with transaction.atomic():
+        importer = ArchiveImporter(user, name)
+        for section_name, row in read_archive(stream):
+            importer.add(section_name, row)
+        importer.flush()
+        if importer.project is None:
+            raise ValidationError({'archive': ['The archive has no project.']})
+        Activity.objects.create(
+            project=importer.project,
+            type="create",
+            entity="project",
+            entity_id=importer.project.id,
+            description=f"Project '{importer.project.name}' imported with "
+                        + ', '.join(f'{count} {name}' for name, count in importer.counts.items() if count and name != 'project'),
+        )
+    return importer.project, importer.counts
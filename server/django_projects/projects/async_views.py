@@ -0,0 +1,110 @@
+"""Async entry points for ASGI deployments.
+
+The /api/async/ read paths answer with the very ProjectViewSet,
+ActivityViewSet, RoadmapViewSet and UserViewSet actions behind the router
+routes: authentication, fieldsets, pagination and request coalescing are
+theirs, so the two can't drift apart. Each request runs the action off the
+event loop, in the thread Django gives that request's sync code. The router
+routes are served the same way under ASGI, so the twins are kept only for
+clients already calling them.
+
+The event stream is natively async: it holds a connection open for as long
+as the client listens, which only the ASGI server can afford.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from .events import activity_event, get_broker
+from .models import Activity
+from .renderers import ORJSONRenderer
+from .utils import jwt_authentication
+from .viewsets import ActivityViewSet, ProjectViewSet, RoadmapViewSet, UserViewSet
+
+EVENTS_RETRY_MS = 3000
+# Activities replayed to a client reconnecting with Last-Event-ID.
+EVENTS_REPLAY_LIMIT = 100
+
+
+def json_response(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def viewset_action(viewset, action):
+    """An async view answering GET requests with `viewset`'s `action`."""
+    view = sync_to_async(viewset.as_view({'get': action}))
+
+    async def async_view(request, *args, **kwargs):
+        return await view(request, *args, **kwargs)
+    return async_view
+
+
+project_list = viewset_action(ProjectViewSet, 'list')
+project_detail = viewset_action(ProjectViewSet, 'retrieve')
+activity_list = viewset_action(ActivityViewSet, 'list')
+roadmap_detail = viewset_action(RoadmapViewSet, 'retrieve')
+user_me = viewset_action(UserViewSet, 'me')
+
+
+async def get_jwt_user(raw_token):
+    """Return the active user of a raw access token, or None; the same checks as the API's JWT authentication."""
+    if not raw_token:
+        return None
+    try:
+        token = jwt_authentication.get_validated_token(raw_token)
+        return await sync_to_async(jwt_authentication.get_user)(token)
+    except AuthenticationFailed:
+        return None
+
+
+def format_event(event):
+    return f'id: {event["id"]}\nevent: change\ndata: {json.dumps(event)}\n\n'
+
+
+async def event_stream(user_id, last_event_id=None):
+    async with get_broker().subscribe(user_id) as subscription:
+        yield f'retry: {EVENTS_RETRY_MS}\n\n'
+        # Subscribed before replaying, so nothing falls in between; skip what the replay already sent.
+        replayed = 0
+        if last_event_id and last_event_id.isdigit():
+            missed = Activity.live.filter(project__user_id=user_id, id__gt=int(last_event_id)).order_by('id')
+            async for activity in missed[:EVENTS_REPLAY_LIMIT]:
+                replayed = activity.id
+                yield format_event(activity_event(activity))
+        while True:
+            event = await subscription.get(settings.EVENTS_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ': keep-alive\n\n'
+            elif event['id'] > replayed:
+                yield format_event(event)
+
+
+async def events(request):
+    """Server-sent events: one `change` event per Activity on the user's projects.
+
+    Browsers' EventSource can't set headers, so the access token may also be
+    passed as `?token=`. Needs the ASGI server; under WSGI a stream would
+    hold a worker thread for as long as the client stays connected.
+    """
+    if request.method != 'GET':
+        return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return json_response({'detail': 'The event stream is only served by the ASGI application.'}, status=501)
+    header = jwt_authentication.get_header(request)
+    try:
+        raw_token = request.GET.get('token') or (header and jwt_authentication.get_raw_token(header))
+    except AuthenticationFailed:
+        raw_token = None
+    user = await get_jwt_user(raw_token)
+    if user is None:
+        return json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+    response = StreamingHttpResponse(
+        event_stream(user.id, request.headers.get('Last-Event-ID')), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
@@ -0,0 +1,123 @@
+"""Run several API requests in one round trip (POST /api/batch/).
+
+Sub-requests are dispatched in-process, in order, straight to the router's
+views. Each one is a request of its own, built from the batch request's
+headers, but it is authenticated as the batch request's user (see
+BatchAuthentication) instead of reading the token again, and it skips the
+middleware, which already ran for the batch request. Only DRF views can be
+batched, and streamed responses (exports, the event stream) are refused.
+"""
+import io
+from functools import partial
+from urllib.parse import urlsplit
+
+import orjson
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.views import APIView
+
+BATCH_LIMIT = 20
+
+
+def batch_error(status, detail):
+    return {'status': status, 'body': {'detail': detail}}
+
+
+def resolve_api_view(path):
+    """The resolver match of a batchable view for `path` (without query string), or None."""
+    try:
+        match = resolve(path)
+    except (Resolver404, Http404):
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None or not issubclass(view_class, APIView) or getattr(view_class, 'batchable', True) is False:
+        return None
+    return match
+
+
+class BatchAuthentication(BaseAuthentication):
+    """Authenticates a sub-request as the user the batch request was authenticated as."""
+
+    def __init__(self, user, auth):
+        self.user = user
+        self.auth = auth
+
+    def authenticate(self, request):
+        return self.user, self.auth
+
+
+def build_subrequest(request, method, path, data):
+    """A request for `path` carrying the batch request's headers, with a JSON body of `data`."""
+    url = urlsplit(path)
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE') and not key.startswith('wsgi.')
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(data),
+        'wsgi.url_scheme': request.scheme,
+    })
+    return WSGIRequest(environ)
+
+
+def run_subrequest(request, method, path, body):
+    match = resolve_api_view(path.split('?', 1)[0])
+    if match is None:
+        return batch_error(404, f'No batchable endpoint at {path}.')
+    data = b'' if body is None else orjson.dumps(body)
+    subrequest = build_subrequest(request, method, path, data)
+    # The same view, authenticating as the batch request's user instead of with the view's own classes.
+    initkwargs = {
+        **match.func.initkwargs, 'authentication_classes': [partial(BatchAuthentication, request.user, request.auth)],
+    }
+    actions = getattr(match.func, 'actions', None)
+    view = match.func.cls.as_view(actions, **initkwargs) if actions else match.func.cls.as_view(**initkwargs)
+    response = view(subrequest, *match.args, **match.kwargs)
+    if response.streaming:
+        return batch_error(400, f"{path} streams its response and can't be batched.")
+    if hasattr(response, 'data'):
+        content = response.data
+    elif response.content:
+        try:
+            content = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            content = response.content.decode(response.charset, 'replace')
+    else:
+        content = None
+    return {'status': response.status_code, 'body': content}
+
+
+def run_batch(request, subrequests, atomic=False):
+    """Dispatch `subrequests` (dicts with method, path and optional body) and return their responses.
+
+    With `atomic` they share one transaction: the first response with an
+    error status rolls everything back and the remaining requests aren't run
+    (they get a 424).
+    """
+    responses = []
+    if not atomic:
+        for entry in subrequests:
+            responses.append(run_subrequest(request, entry['method'], entry['path'], entry.get('body')))
+        return {'responses': responses}
+
+    with transaction.atomic():
+        for entry in subrequests:
+            responses.append(run_subrequest(request, entry['method'], entry['path'], entry.get('body')))
+            if responses[-1]['status'] >= 400:
+                transaction.set_rollback(True)
+                break
+        committed = not transaction.get_rollback()
+    responses += [
+        batch_error(424, 'Not run because an earlier request of the transaction failed.')
+        for _ in subrequests[len(responses):]
+    ]
+    return {'responses': responses, 'committed': committed}
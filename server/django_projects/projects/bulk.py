@@ -0,0 +1,215 @@
+"""Bulk writes that still leave an Activity trail.
+
+Each one issues a fixed number of statements however many rows it touches
+(e.g. one UPDATE for the rows plus one INSERT for their Activities).
+bulk_create skips signals, so where Activities are bulk inserted the events
+and cache invalidation normally done in projects.signals are triggered
+explicitly.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Activity, Bug, Feature, Improvement, Roadmap, RoadmapItem, RoadmapPhase
+from .signals import publish_activities
+from .utils import describe_changes
+
+
+def bulk_set(queryset, field, value, entity, noun, label='description', project='project_id'):
+    """Set `field` to `value` on every row of `queryset` and log one Activity per row changed.
+
+    `noun` and the row's `label` field name it in the Activity description,
+    and `project` is the lookup of the row's project id. Rows that already
+    hold `value` are left alone. Returns the number of rows changed.
+    """
+    model = queryset.model
+    with transaction.atomic(using=queryset.db):
+        rows = list(
+            queryset.exclude(**{field: value}).select_for_update(of=('self',))
+            .order_by('pk').values_list('pk', project, label, field)
+        )
+        if not rows:
+            return 0
+        model._base_manager.using(queryset.db).filter(pk__in=[row[0] for row in rows]).update(
+            **{field: value, 'updated_at': timezone.now()}
+        )
+        activities = Activity.objects.using(queryset.db).bulk_create(
+            Activity(
+                project_id=project_id,
+                type='status_change' if field == 'status' else 'update',
+                entity=entity,
+                entity_id=pk,
+                description=(
+                    f"{noun} '{name}' status changed from '{old_value}' to '{value}'" if field == 'status'
+                    else f"{noun} '{name}' updated with {describe_changes({field: (old_value, value)})}"
+                ),
+            )
+            for pk, project_id, name, old_value in rows
+        )
+        publish_activities(activities, using=queryset.db)
+    return len(rows)
+
+
+BULK_LINK_LIMIT = 1000
+
+# Roadmap item link columns: the backlog model each points at, and its API name.
+LINK_FIELDS = {
+    'linked_feature_id': (Feature, 'linkedFeatureId'),
+    'linked_bug_id': (Bug, 'linkedBugId'),
+    'linked_improvement_id': (Improvement, 'linkedImprovementId'),
+}
+
+
+def unlink_roadmap_items(targets, items=None):
+    """Clear roadmap item links to backlog rows and stamp the items' updated_at.
+
+    `targets` maps link columns (see LINK_FIELDS) to the ids, or a subquery
+    of the ids, to unlink; `items` narrows the roadmap items considered.
+    Deleting the targets would null the links anyway (SET_NULL), but without
+    a new updated_at /api/sync/ would never re-send the items. Returns the
+    number of items changed.
+    """
+    linked = Q()
+    for field, ids in targets.items():
+        linked |= Q(**{f'{field}__in': ids})
+    return (RoadmapItem.objects.all() if items is None else items).filter(linked).update(
+        updated_at=timezone.now(),
+        **{field: Case(When(**{f'{field}__in': ids}, then=Value(None)), default=F(field)) for field, ids in targets.items()},
+    )
+
+
+def link_target_errors(requests):
+    """Check link targets, given `(project_id, {link field: target id or None})` pairs.
+
+    Every target has to be a backlog entry of the same project as the item
+    it's linked from. Targets are looked up with one `id__in` query per
+    backlog type, however many pairs there are. Returns one dict of errors
+    (keyed by the field's API name) per pair, empty when the pair is valid.
+    """
+    owners = {}
+    for field, (model, _) in LINK_FIELDS.items():
+        ids = {links[field] for _, links in requests if links.get(field) is not None}
+        owners[field] = dict(model.objects.filter(id__in=ids).values_list('id', 'project_id')) if ids else {}
+    errors = []
+    for project_id, links in requests:
+        errors.append({
+            LINK_FIELDS[field][1]: [f'No {LINK_FIELDS[field][0]._meta.verbose_name} with id {target} in this project.']
+            for field, target in links.items()
+            if target is not None and owners[field].get(target) != project_id
+        })
+    return errors
+
+
+def bulk_link(queryset, links):
+    """Apply many link changes to the roadmap items of `queryset` at once.
+
+    `links` is a list of `{'id': item id, <link field>: target id or None}`;
+    None unlinks and fields left out are kept. Everything is validated before
+    anything is written (ValidationError lists the errors per entry), then
+    the items that change are written with one bulk_update and logged with
+    one Activity per project. Returns the items in `links` order.
+    """
+    with transaction.atomic(using=queryset.db):
+        items = {
+            item.id: item for item in queryset.filter(id__in=[link['id'] for link in links])
+            .annotate(item_project_id=F('roadmap_phase__roadmap__project_id'))
+            .select_for_update(of=('self',))
+        }
+        errors = [{} for _ in links]
+        seen = set()
+        for link, entry_errors in zip(links, errors):
+            if link['id'] not in items:
+                entry_errors['itemId'] = [f"No roadmap item with id {link['id']}."]
+            elif link['id'] in seen:
+                entry_errors['itemId'] = [f"Roadmap item {link['id']} is listed more than once."]
+            seen.add(link['id'])
+        checked = [(index, link) for index, link in enumerate(links) if not errors[index]]
+        target_errors = link_target_errors([
+            (items[link['id']].item_project_id, {field: link[field] for field in LINK_FIELDS if field in link})
+            for _, link in checked
+        ])
+        for (index, _), entry_errors in zip(checked, target_errors):
+            errors[index].update(entry_errors)
+        if any(errors):
+            raise ValidationError({'links': errors})
+
+        now = timezone.now()
+        changed, fields = {}, set()
+        for link in links:
+            item = items[link['id']]
+            for field in LINK_FIELDS:
+                if field in link and getattr(item, field) != link[field]:
+                    setattr(item, field, link[field])
+                    changed[item.id] = item
+                    fields.add(field)
+        for item in changed.values():
+            item.updated_at = now
+        if changed:
+            queryset.model._base_manager.using(queryset.db).bulk_update(changed.values(), [*sorted(fields), 'updated_at'])
+            by_project = {}
+            for item in changed.values():
+                by_project.setdefault(item.item_project_id, []).append(item)
+            for project_id, project_items in by_project.items():
+                Activity.objects.using(queryset.db).create(
+                    project_id=project_id,
+                    type='update',
+                    entity='roadmap_item',
+                    entity_id=project_items[0].id if len(project_items) == 1 else None,
+                    description=(
+                        f"Item '{project_items[0].title}' links updated" if len(project_items) == 1
+                        else f"Links updated on {len(project_items)} items"
+                    ),
+                )
+    return [items[link['id']] for link in links]
+
+
+def clone_roadmap(roadmap, project, name=None, shift_days=0, reset_status=False):
+    """Deep-copy `roadmap` with its phases and items into `project` and return the copy.
+
+    Dates move by `shift_days`; `reset_status` starts everything over as
+    when instantiating a template. Links to backlog entries are only kept
+    within the same project. The copy is one INSERT each for the roadmap,
+    its phases, its items and the Activity, however big the roadmap is.
+    """
+    shift = timedelta(days=shift_days)
+
+    def moved(day):
+        return day + shift if day else day
+
+    def status(obj):
+        return obj._meta.get_field('status').default if reset_status else obj.status
+
+    with transaction.atomic():
+        phases = list(roadmap.phases.all())
+        copy = Roadmap.objects.create(
+            project=project, name=name or f'{roadmap.name} (copy)', description=roadmap.description,
+            status=status(roadmap),
+        )
+        new_phases = RoadmapPhase.objects.bulk_create(
+            RoadmapPhase(
+                roadmap=copy, name=phase.name, order=phase.order, target_date=moved(phase.target_date),
+                estimated_work_time=phase.estimated_work_time, deadline=moved(phase.deadline), status=status(phase),
+            )
+            for phase in phases
+        )
+        keep_links = project.id == roadmap.project_id
+        items = RoadmapItem.objects.bulk_create(
+            RoadmapItem(
+                roadmap_phase=new_phase, title=item.title, description=item.description, status=status(item),
+                priority=item.priority, estimated_work_time=item.estimated_work_time, deadline=moved(item.deadline),
+                **{field: getattr(item, field) if keep_links else None for field in LINK_FIELDS},
+            )
+            for phase, new_phase in zip(phases, new_phases)
+            for item in phase.items.all()
+        )
+        Activity.objects.create(
+            project=project,
+            type="create",
+            entity="roadmap",
+            entity_id=copy.id,
+            description=f"Roadmap '{copy.name}' cloned from '{roadmap.name}' with {len(new_phases)} phases and {len(items)} items"
+        )
+    return copy
@@ -0,0 +1,34 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Replica alias the current request may read from; None means the primary.
+read_database = ContextVar('read_database', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+def choose_replica():
+    """Pick a replica alias for a request, or None when none are configured."""
+    aliases = replica_aliases()
+    return random.choice(aliases) if aliases else None
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen by ReplicaRoutingMiddleware, everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return read_database.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,117 @@
+"""Per-user change events, pushed to clients over /api/events/.
+
+Every committed Activity is published to its project owner's channel (see
+projects.signals). The broker is picked by EVENTS_BROKER: InMemoryBroker
+only reaches subscribers in the same process, so deployments with more than
+one worker use RedisBroker.
+"""
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def activity_event(activity):
+    """The payload clients receive; enough to invalidate the affected queries."""
+    return {
+        'id': activity.id,
+        'type': activity.type,
+        'entity': activity.entity,
+        'entityId': activity.entity_id,
+        'projectId': activity.project_id,
+        'createdAt': activity.created_at.isoformat(),
+    }
+
+
+class InMemoryBroker:
+    """Fans events out to subscribers of this process. Used in tests and single-worker setups."""
+
+    def __init__(self):
+        self.subscribers = {}  # user id -> set of (loop, queue)
+        self.lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        with self.lock:
+            targets = list(self.subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscriber)
+        try:
+            yield InMemorySubscription(subscriber[1])
+        finally:
+            with self.lock:
+                self.subscribers[user_id].discard(subscriber)
+                if not self.subscribers[user_id]:
+                    del self.subscribers[user_id]
+
+
+class InMemorySubscription:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        """Return the next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBroker:
+    """Publishes through Redis pub/sub so every worker's subscribers see every event."""
+
+    def __init__(self, url=None):
+        import redis
+
+        self.url = url or settings.REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    @staticmethod
+    def channel(user_id):
+        return f'events:user:{user_id}'
+
+    def publish(self, user_id, event):
+        self.client.publish(self.channel(user_id), json.dumps(event))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        from redis import asyncio as redis_asyncio
+
+        client = redis_asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel(user_id))
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.EVENTS_BROKER)()
+        return _broker
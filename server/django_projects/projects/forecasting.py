@@ -0,0 +1,139 @@
+"""Monte Carlo completion forecasts for roadmaps.
+
+Each simulation scales every open item's estimate by an estimate-vs-actual
+ratio drawn from the owner's completed roadmap items, then runs the phases
+back to back at the given weekly capacity like projects.scheduling does.
+Percentiles of the simulated finish dates give P50/P85/P95 per phase.
+
+Runs are simulated in chunks of at most SIMULATION_CHUNK_CELLS item draws,
+so memory doesn't grow with simulations x items; only the per-phase finish
+days of every run are kept, up to MAX_RESULT_CELLS of them.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+
+from .models import Activity, RoadmapItem, RoadmapPhase
+from .scheduling import LAST_WORKDAY, WORKDAYS_PER_WEEK, hours, workday_date, workday_number
+
+DEFAULT_SIMULATIONS = 5000
+MAX_SIMULATIONS = 20000
+SIMULATION_CHUNK_CELLS = 1_000_000
+MAX_RESULT_CELLS = 5_000_000
+PERCENTILES = (50, 85, 95)
+# Completed items used to learn how estimates compare with reality.
+HISTORY_LIMIT = 500
+MIN_HISTORY = 5
+# Focused hours in a working day, to turn elapsed time into effort.
+FOCUS_HOURS_PER_DAY = 8
+RATIO_BOUNDS = (0.25, 10.0)
+# Spread used when there isn't enough history: lognormal around the estimate.
+DEFAULT_SIGMA = 0.5
+
+
+class ForecastTooLarge(ValueError):
+    pass
+
+
+def historical_ratios(user):
+    """Actual/estimated effort of the user's completed roadmap items, most recent first.
+
+    An item's work starts at its first status change (or its creation when it
+    went straight to completed) and ends at its last one.
+    """
+    changes = Activity.live.filter(
+        entity='roadmap_item', type='status_change', entity_id=OuterRef('id'), project__user=user
+    )
+    items = RoadmapItem.live.filter(
+        roadmap_phase__roadmap__project__user=user, status='completed', estimated_work_time__gt=timedelta(0)
+    ).annotate(
+        first_change=Subquery(changes.order_by('created_at').values('created_at')[:1]),
+        last_change=Subquery(changes.order_by('-created_at').values('created_at')[:1]),
+    ).filter(last_change__isnull=False).order_by('-last_change').values_list(
+        'created_at', 'first_change', 'last_change', 'estimated_work_time'
+    )[:HISTORY_LIMIT]
+    ratios = []
+    for created_at, first_change, last_change, estimate in items:
+        started = first_change if first_change < last_change else created_at
+        workdays = max(workday_number(last_change.date()) - workday_number(started.date()), 0) + 1
+        ratios.append(workdays * FOCUS_HOURS_PER_DAY / hours(estimate))
+    return np.clip(np.array(ratios, dtype=float), *RATIO_BOUNDS)
+
+
+def forecast_phases(phases, ratios, capacity_hours, start, simulations=DEFAULT_SIMULATIONS, seed=None):
+    """Simulate `phases` (with prefetched items) and return percentile finish dates per phase."""
+    rng = np.random.default_rng(seed)
+    phases = sorted(phases, key=lambda phase: (phase.order, phase.id))
+
+    # One column per unit of open work, grouped by phase.
+    estimates, bounds = [], []
+    for phase in phases:
+        open_items = [] if phase.status == 'completed' else [
+            item for item in phase.items.all() if item.status != 'completed'
+        ]
+        known = [hours(item.estimated_work_time) for item in open_items if item.estimated_work_time]
+        # Unestimated items count as a typical item of the same phase.
+        fill = float(np.median(known)) if known else 0.0
+        work = [hours(item.estimated_work_time) or fill for item in open_items]
+        if not known and phase.status != 'completed':
+            work = [hours(phase.estimated_work_time)]
+        bounds.append(len(estimates))
+        estimates.extend(work or [0.0])
+    # float32 and in-place operations keep thousands of items x thousands of runs well under a second.
+    estimates = np.array(estimates, dtype=np.float32)
+    if simulations * len(phases) > MAX_RESULT_CELLS:
+        raise ForecastTooLarge(f'{simulations} simulations of {len(phases)} phases is too many; '
+                         f'keep simulations x phases under {MAX_RESULT_CELLS}.')
+
+    basis = 'history' if len(ratios) >= MIN_HISTORY else 'default'
+    ratios = np.asarray(ratios, dtype=np.float32)
+    first_day = workday_number(start)
+    daily_capacity = capacity_hours / WORKDAYS_PER_WEEK
+    finish_numbers = np.empty((simulations, len(phases)), dtype=np.int64)
+    chunk = max(SIMULATION_CHUNK_CELLS // max(len(estimates), 1), 1)
+    for begin in range(0, simulations, chunk):
+        shape = (min(chunk, simulations - begin), len(estimates))
+        if basis == 'history':
+            work = ratios[rng.integers(0, len(ratios), size=shape, dtype=np.int32)]
+        else:
+            work = rng.standard_normal(size=shape, dtype=np.float32)
+            work *= DEFAULT_SIGMA
+            np.exp(work, out=work)
+        work *= estimates
+        phase_hours = np.add.reduceat(work, bounds, axis=1) if bounds else np.zeros((shape[0], 0))
+        finish_days = np.cumsum(phase_hours, axis=1, dtype=np.float64) / daily_capacity
+        # Work ending exactly at a day boundary finishes on that day, not the next. Runs past the
+        # last representable day are kept just after it, so only percentiles landing there overflow.
+        finish_days = first_day + np.maximum(np.ceil(finish_days - 1e-9) - 1, 0)
+        finish_numbers[begin:begin + shape[0]] = np.minimum(finish_days, LAST_WORKDAY + 1)
+
+    results = []
+    for index, phase in enumerate(phases):
+        column = finish_numbers[:, index]
+        percentiles = np.percentile(column, PERCENTILES, method='higher')
+        result = {
+            'id': phase.id,
+            'name': phase.name,
+            'order': phase.order,
+            **{f'p{p}': workday_date(int(value)) for p, value in zip(PERCENTILES, percentiles)},
+            'deadline': phase.deadline,
+            'onTimeProbability': None,
+        }
+        if phase.deadline:
+            result['onTimeProbability'] = round(float(np.mean(column <= workday_number(phase.deadline))), 3)
+        results.append(result)
+    return {
+        'capacityHours': capacity_hours,
+        'start': start,
+        'simulations': simulations,
+        'basis': basis,
+        'historySize': len(ratios),
+        'phases': results,
+    }
+
+
+def forecast_roadmap(roadmap, capacity_hours, start, simulations=DEFAULT_SIMULATIONS, seed=None):
+    phases = RoadmapPhase.objects.filter(roadmap=roadmap).prefetch_related('items')
+    ratios = historical_ratios(roadmap.project.user_id)
+    return {'roadmapId': roadmap.id, **forecast_phases(phases, ratios, capacity_hours, start, simulations, seed)}
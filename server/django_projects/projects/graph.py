@@ -0,0 +1,209 @@
+"""Nested queries over the workspace graph (POST /api/query/).
+
+A query is a JSON selection, e.g.
+
+    {"projects": {"filter": {"id": 1}, "fields": ["id", "name"],
+                  "roadmaps": {"phases": {"items": {"linkedFeature": {"fields": ["id", "status"]}}}}}}
+
+Top-level keys are ROOTS. In a selection, `fields` lists the scalar fields
+to render (the same names as the REST serializers; all of them by default),
+`filter` maps scalar fields to a value or a list of values, `limit` caps the
+rows of a root selection, and every other key selects a relation of the
+node (see NODES) with its own selection. A whole query loads at most
+QUERY_ROW_LIMIT rows; past that it's rejected and has to be narrowed.
+
+Relations are resolved a level at a time: all the rows a relation needs,
+for every parent at once, come from one `__in` query. A query therefore
+costs one database query per selection in it, whatever the number of rows.
+"""
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+
+from .models import Project, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from .serializers import (
+    ProjectSerializer, FeatureSerializer, BugSerializer, ImprovementSerializer, ActivitySerializer, RoadmapSerializer,
+    RoadmapPhaseSerializer, RoadmapItemSerializer,
+)
+
+QUERY_MAX_DEPTH = 8
+QUERY_ROOT_LIMIT = 100
+QUERY_ROW_LIMIT = 5000
+RESERVED_KEYS = ('fields', 'filter', 'limit')
+
+# `many`: the target rows whose `column` holds the parent's id.
+# `one`: the target row whose id is in the parent's `column`.
+Relation = namedtuple('Relation', 'node kind column')
+Node = namedtuple('Node', 'model serializer owner relations')
+
+
+def backlog_node(model, serializer, link_column):
+    return Node(model, serializer, 'project__user', {
+        'project': Relation('project', 'one', 'project_id'),
+        'roadmapItems': Relation('roadmap_item', 'many', link_column),
+    })
+
+
+NODES = {
+    'project': Node(Project, ProjectSerializer, 'user', {
+        'features': Relation('feature', 'many', 'project_id'),
+        'bugs': Relation('bug', 'many', 'project_id'),
+        'improvements': Relation('improvement', 'many', 'project_id'),
+        'roadmaps': Relation('roadmap', 'many', 'project_id'),
+        'activities': Relation('activity', 'many', 'project_id'),
+    }),
+    'feature': backlog_node(Feature, FeatureSerializer, 'linked_feature_id'),
+    'bug': backlog_node(Bug, BugSerializer, 'linked_bug_id'),
+    'improvement': backlog_node(Improvement, ImprovementSerializer, 'linked_improvement_id'),
+    'activity': Node(Activity, ActivitySerializer, 'project__user', {
+        'project': Relation('project', 'one', 'project_id'),
+    }),
+    'roadmap': Node(Roadmap, RoadmapSerializer, 'project__user', {
+        'project': Relation('project', 'one', 'project_id'),
+        'phases': Relation('roadmap_phase', 'many', 'roadmap_id'),
+    }),
+    'roadmap_phase': Node(RoadmapPhase, RoadmapPhaseSerializer, 'roadmap__project__user', {
+        'roadmap': Relation('roadmap', 'one', 'roadmap_id'),
+        'items': Relation('roadmap_item', 'many', 'roadmap_phase_id'),
+    }),
+    'roadmap_item': Node(RoadmapItem, RoadmapItemSerializer, 'roadmap_phase__roadmap__project__user', {
+        'phase': Relation('roadmap_phase', 'one', 'roadmap_phase_id'),
+        'linkedFeature': Relation('feature', 'one', 'linked_feature_id'),
+        'linkedBug': Relation('bug', 'one', 'linked_bug_id'),
+        'linkedImprovement': Relation('improvement', 'one', 'linked_improvement_id'),
+    }),
+}
+
+ROOTS = {
+    'projects': 'project',
+    'features': 'feature',
+    'bugs': 'bug',
+    'improvements': 'improvement',
+    'activities': 'activity',
+    'roadmaps': 'roadmap',
+    'roadmapPhases': 'roadmap_phase',
+    'roadmapItems': 'roadmap_item',
+}
+
+
+def query_error(path, message):
+    return ValidationError({'query': [f"{'.'.join(path)}: {message}"]})
+
+
+def scalar_fields(node):
+    """The node's serializer fields, less the nested ones; those are selected as relations here."""
+    meta = node.serializer.Meta
+    nested = {*node.relations, *getattr(meta, 'optional_fields', ()), *getattr(meta, 'field_prefetches', {})}
+    return [name for name in node.serializer().fields if name not in nested]
+
+
+def filter_lookups(node, filters, path):
+    """Turn `{api field: value or [values]}` into queryset lookups on the node's columns."""
+    if not isinstance(filters, dict):
+        raise query_error(path, '`filter` must be an object.')
+    serializer_fields = node.serializer().fields
+    lookups = {}
+    for name, value in filters.items():
+        field = serializer_fields.get(name)
+        source = field.source_attrs if field is not None and field.source != '*' else ()
+        try:
+            model_field = node.model._meta.get_field(source[0]) if len(source) == 1 else None
+        except FieldDoesNotExist:
+            model_field = None
+        if model_field is None or not model_field.concrete:
+            raise query_error(path, f"Can't filter on '{name}'.")
+        if isinstance(value, list):
+            lookups[f'{model_field.attname}__in'] = value
+        else:
+            lookups[model_field.attname] = value
+    return lookups
+
+
+class RowBudget:
+    """Rows a query may still load. Each level asks for one more row than is left, so going over
+    the budget is noticed without loading more than it."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.remaining = rows
+
+    def fetch(self, queryset, path):
+        objects = list(queryset[:self.remaining + 1])
+        if len(objects) > self.remaining:
+            raise query_error(path, f'The query selects more than {self.rows} rows; narrow it with `filter` or `limit`.')
+        self.remaining -= len(objects)
+        return objects
+
+
+def resolve(node_name, queryset, selection, path, user, budget):
+    """Fetch the rows of `queryset` for `selection`; returns `(objects, rendered rows)` in the same order."""
+    if not isinstance(selection, dict):
+        raise query_error(path, 'A selection must be an object.')
+    if len(path) > QUERY_MAX_DEPTH:
+        raise query_error(path, f'Queries can nest at most {QUERY_MAX_DEPTH} levels.')
+    node = NODES[node_name]
+    relations = {name: sub for name, sub in selection.items() if name not in RESERVED_KEYS}
+    unknown = set(relations) - set(node.relations)
+    if unknown:
+        raise query_error(path, f"Unknown relation(s): {', '.join(sorted(unknown))}.")
+
+    allowed = scalar_fields(node)
+    fields = selection.get('fields', allowed)
+    if not isinstance(fields, list) or set(fields) - set(allowed):
+        raise query_error(path, f"`fields` must be a list of: {', '.join(allowed)}.")
+    try:
+        queryset = queryset.filter(**{node.owner: user}, **filter_lookups(node, selection.get('filter', {}), path))
+    except (TypeError, ValueError, DjangoValidationError) as error:
+        raise query_error(path, f'Invalid filter: {error}')
+    queryset = node.serializer(fields=fields).sparse_queryset(queryset)
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+    if 'limit' in selection:
+        limit = selection['limit']
+        if len(path) > 1 or not isinstance(limit, int) or not 0 < limit <= QUERY_ROOT_LIMIT:
+            raise query_error(path, f'`limit` is only allowed at the top level, from 1 to {QUERY_ROOT_LIMIT}.')
+        queryset = queryset[:limit]
+    elif len(path) == 1:
+        queryset = queryset[:QUERY_ROOT_LIMIT]
+    objects = budget.fetch(queryset, path)
+    rows = node.serializer(objects, many=True, fields=fields).data
+
+    for name, sub in relations.items():
+        relation = node.relations[name]
+        target = NODES[relation.node]
+        sub_path = [*path, name]
+        if relation.kind == 'many':
+            ids = [obj.pk for obj in objects]
+            children, child_rows = resolve(
+                relation.node, target.model.objects.filter(**{f'{relation.column}__in': ids}), sub, sub_path, user, budget
+            )
+            grouped = {}
+            for child, child_row in zip(children, child_rows):
+                grouped.setdefault(getattr(child, relation.column), []).append(child_row)
+            for obj, row in zip(objects, rows):
+                row[name] = grouped.get(obj.pk, [])
+        else:
+            ids = {getattr(obj, relation.column) for obj in objects} - {None}
+            targets, target_rows = resolve(
+                relation.node, target.model.objects.filter(pk__in=ids), sub, sub_path, user, budget
+            )
+            by_id = {target_obj.pk: target_row for target_obj, target_row in zip(targets, target_rows)}
+            for obj, row in zip(objects, rows):
+                row[name] = by_id.get(getattr(obj, relation.column))
+    return objects, rows
+
+
+def run_query(user, query):
+    """Answer a nested query (see the module docstring) with `{root: [rows]}`."""
+    if not isinstance(query, dict) or not query:
+        raise ValidationError({'query': ['Send an object with at least one of: ' + ', '.join(ROOTS) + '.']})
+    unknown = set(query) - set(ROOTS)
+    if unknown:
+        raise ValidationError({'query': [f"Unknown root(s): {', '.join(sorted(unknown))}."]})
+    result = {}
+    budget = RowBudget(QUERY_ROW_LIMIT)
+    for root, selection in query.items():
+        model = NODES[ROOTS[root]].model
+        _, result[root] = resolve(ROOTS[root], getattr(model, 'live', model.objects).all(), selection, [root], user, budget)
+    return result
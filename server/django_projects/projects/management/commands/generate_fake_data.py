@@ -0,0 +1,166 @@
+import json
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.expressions import RawSQL
+
+from projects.models import (
+    CustomUser, Project, ProjectDetails, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+)
+
+WORDS = (
+    'api auth cache dashboard deploy docker endpoint export filter frontend index login migration '
+    'mobile notification onboarding pagination payment query queue report roadmap search settings '
+    'signup sync table theme timeout upload validation webhook'
+).split()
+TAGS = ['backend', 'frontend', 'infra', 'ux', 'perf', 'security', 'docs']
+PRIORITIES = ['low', 'medium', 'high', None]
+
+
+def sentence(rng, words=8):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def paragraph(rng, sentences):
+    return '. '.join(sentence(rng, rng.randint(6, 14)) for _ in range(sentences)) + '.'
+
+
+class Command(BaseCommand):
+    help = 'Generate a realistic synthetic dataset for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--projects', type=int, default=10, help='Projects per user')
+        parser.add_argument('--backlog', type=int, default=50, help='Features, bugs and improvements (each) per project')
+        parser.add_argument('--roadmaps', type=int, default=2, help='Roadmaps per project')
+        parser.add_argument('--phases', type=int, default=4, help='Phases per roadmap')
+        parser.add_argument('--items', type=int, default=10, help='Items per phase')
+        parser.add_argument('--activities', type=int, default=200, help='Activity rows per project')
+        parser.add_argument('--prefix', default='bench', help='Username prefix of the generated users')
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--flush', action='store_true', help='Delete users with this prefix (and their data) first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        existing = CustomUser.objects.filter(username__startswith=prefix)
+        if existing.exists():
+            if not options['flush']:
+                raise CommandError(f'Users starting with "{prefix}" already exist; pass --flush to replace them.')
+            existing.delete()
+
+        with transaction.atomic():
+            password = make_password(options['password'])
+            users = CustomUser.objects.bulk_create([
+                CustomUser(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password)
+                for i in range(options['users'])
+            ])
+            projects = Project.objects.bulk_create([
+                Project(
+                    user=user,
+                    name=f'{sentence(rng, 3)} {i}',
+                    description=paragraph(rng, 3),
+                    status=rng.choice(['POC', 'In Development', 'Deployed']),
+                    repo_link=[f'https://github.com/{prefix}/{user.id}-{i}'],
+                    setup_steps=[sentence(rng) for _ in range(6)],
+                )
+                for user in users
+                for i in range(options['projects'])
+            ])
+            ProjectDetails.objects.bulk_create([
+                ProjectDetails(
+                    project=project,
+                    development_notes=paragraph(rng, 20),
+                    frontend_details=paragraph(rng, 15),
+                    backend_details=paragraph(rng, 15),
+                    env_details=paragraph(rng, 8),
+                    test_user_details=paragraph(rng, 4),
+                    auth_details=paragraph(rng, 6),
+                )
+                for project in projects
+            ])
+
+            backlog = {}
+            for model, statuses in ((Feature, ['pending', 'completed']), (Bug, ['open', 'fixed']),
+                                    (Improvement, ['pending', 'completed'])):
+                backlog[model] = model.objects.bulk_create([
+                    model(
+                        project=project,
+                        description=sentence(rng, rng.randint(5, 20)),
+                        status=rng.choice(statuses),
+                        rank=rank,
+                        tags=json.dumps(rng.sample(TAGS, rng.randint(0, 3))),
+                        estimated_work_time=timedelta(hours=rng.randint(1, 40)) if rng.random() < 0.8 else None,
+                        priority=rng.choice(PRIORITIES),
+                        deadline=date.today() + timedelta(days=rng.randint(-30, 180)) if rng.random() < 0.5 else None,
+                    )
+                    for project in projects
+                    for rank in range(options['backlog'])
+                ], batch_size=5000)
+            features_by_project = {}
+            for feature in backlog[Feature]:
+                features_by_project.setdefault(feature.project_id, []).append(feature)
+
+            roadmaps = Roadmap.objects.bulk_create([
+                Roadmap(project=project, name=f'Roadmap {i}', description=paragraph(rng, 2),
+                        status=rng.choice(['draft', 'active', 'archived']))
+                for project in projects
+                for i in range(options['roadmaps'])
+            ])
+            phases = RoadmapPhase.objects.bulk_create([
+                RoadmapPhase(
+                    roadmap=roadmap, name=f'Phase {order + 1}', order=order,
+                    target_date=date.today() + timedelta(weeks=2 * (order + 1)),
+                    estimated_work_time=timedelta(hours=rng.randint(20, 160)),
+                    deadline=date.today() + timedelta(weeks=2 * (order + 1) + 1),
+                    status=rng.choice(['not_started', 'in_progress', 'completed']),
+                )
+                for roadmap in roadmaps
+                for order in range(options['phases'])
+            ], batch_size=5000)
+            project_of_roadmap = {roadmap.id: roadmap.project_id for roadmap in roadmaps}
+            items = []
+            for phase in phases:
+                features = features_by_project.get(project_of_roadmap[phase.roadmap_id], [])
+                for i in range(options['items']):
+                    items.append(RoadmapItem(
+                        roadmap_phase=phase,
+                        title=sentence(rng, 4),
+                        description=paragraph(rng, 2),
+                        status=rng.choice(['planned', 'in_progress', 'completed', 'blocked']),
+                        priority=rng.choice(PRIORITIES),
+                        estimated_work_time=timedelta(hours=rng.randint(1, 24)),
+                        deadline=phase.deadline,
+                        linked_feature=rng.choice(features) if features and rng.random() < 0.3 else None,
+                    ))
+            RoadmapItem.objects.bulk_create(items, batch_size=5000)
+
+            entity_ids = {project.id: [('project', project.id)] for project in projects}
+            for model, entity in ((Feature, 'feature'), (Bug, 'bug'), (Improvement, 'improvement')):
+                for obj in backlog[model]:
+                    entity_ids[obj.project_id].append((entity, obj.id))
+            activities = []
+            for project in projects:
+                for _ in range(options['activities']):
+                    entity, entity_id = rng.choice(entity_ids[project.id])
+                    activity_type = rng.choice(['create', 'update', 'update', 'status_change'])
+                    activities.append(Activity(
+                        project=project, type=activity_type, entity=entity, entity_id=entity_id,
+                        description=f"{entity.capitalize()} {entity_id} {activity_type.replace('_', ' ')}: {sentence(rng)}",
+                    ))
+            Activity.objects.bulk_create(activities, batch_size=5000)
+            # created_at is auto_now_add; spread the history over the last year afterwards.
+            Activity.objects.filter(project__in=projects).update(
+                created_at=RawSQL("now() - random() * interval '365 days'", [])
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users, {len(projects)} projects, '
+            f'{sum(len(rows) for rows in backlog.values())} backlog items, {len(roadmaps)} roadmaps, '
+            f'{len(phases)} phases, {len(items)} roadmap items and {len(activities)} activities.'
+        ))
+        self.stdout.write(f'Log in as {prefix}0 / {options["password"]}')
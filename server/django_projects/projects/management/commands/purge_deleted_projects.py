@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from projects.bulk import LINK_FIELDS, unlink_roadmap_items
+from projects.models import Project, RoadmapItem
+
+
+class Command(BaseCommand):
+    help = 'Permanently remove soft-deleted projects. Run it periodically (e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=0, metavar='MINUTES',
+                            help='Only purge projects deleted at least this long ago')
+        parser.add_argument('--limit', type=int, default=100, help='Most projects to purge in one run')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        project_ids = list(
+            Project.all_objects.filter(deleted_at__lte=cutoff).order_by('deleted_at').values_list('id', flat=True)
+            [:options['limit']]
+        )
+        # One DELETE per project: the database cascades it to every child row
+        # (see migration 0009) without Django loading any of them, and each
+        # project commits on its own so a big one doesn't hold up the rest.
+        table = connection.ops.quote_name(Project._meta.db_table)
+        for project_id in project_ids:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Other projects' items linking into this backlog, stamped so syncs re-send them.
+                unlink_roadmap_items(
+                    {field: model._base_manager.filter(project_id=project_id).values('id')
+                     for field, (model, _) in LINK_FIELDS.items()},
+                    items=RoadmapItem.objects.exclude(roadmap_phase__roadmap__project_id=project_id),
+                )
+                cursor.execute(f'DELETE FROM {table} WHERE id = %s AND deleted_at IS NOT NULL', [project_id])
+        self.stdout.write(f'Purged {len(project_ids)} deleted projects.')
@@ -0,0 +1,183 @@
+import json
+import statistics
+import subprocess
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from projects.models import CustomUser, Project, Activity, Roadmap, RoadmapItem
+from projects.urls import router
+
+LIST_METHODS = {'list': 'GET', 'create': 'POST'}
+DETAIL_METHODS = {'retrieve': 'GET', 'update': 'PUT', 'partial_update': 'PATCH', 'destroy': 'DELETE'}
+
+
+def sample_ids(user):
+    """Ids of the user's largest project and one object of every routed type inside it."""
+    project = Project.objects.filter(user=user).annotate(size=Count('feature')).order_by('-size').first()
+    if project is None:
+        raise CommandError(f'{user} has no projects; run generate_fake_data first.')
+    roadmap = Roadmap.objects.filter(project=project).annotate(size=Count('phases__items')).order_by('-size').first()
+    phase = roadmap.phases.first() if roadmap else None
+    item = RoadmapItem.objects.filter(roadmap_phase=phase).first() if phase else None
+    return {
+        'project': project.id,
+        'feature': project.feature_set.values_list('id', flat=True).first(),
+        'bug': project.bug_set.values_list('id', flat=True).first(),
+        'improvement': project.improvement_set.values_list('id', flat=True).first(),
+        'activity': Activity.objects.filter(project=project).values_list('id', flat=True).first(),
+        'user': user.id,
+        'roadmap': roadmap and roadmap.id,
+        'roadmap-phase': phase and phase.id,
+        'roadmap-item': item and item.id,
+    }
+
+
+def payloads(ids):
+    """Request bodies for the write endpoints, keyed by (url name, method)."""
+    return {
+        ('project-list', 'POST'): {'name': 'Benchmark project'},
+        ('project-detail', 'PUT'): {'name': 'Benchmark project', 'status': 'POC'},
+        ('project-detail', 'PATCH'): {'description': 'Benchmark description'},
+        ('project-roadmaps', 'POST'): {'name': 'Benchmark roadmap'},
+        ('feature-list', 'POST'): {'projectId': ids['project'], 'description': 'Benchmark feature'},
+        ('feature-detail', 'PUT'): {'description': 'Benchmark feature', 'status': 'completed'},
+        ('feature-detail', 'PATCH'): {'priority': 'high'},
+        ('feature-update-status', 'PUT'): {'status': 'completed'},
+        ('bug-list', 'POST'): {'projectId': ids['project'], 'description': 'Benchmark bug'},
+        ('bug-detail', 'PUT'): {'description': 'Benchmark bug', 'status': 'fixed'},
+        ('bug-detail', 'PATCH'): {'priority': 'high'},
+        ('bug-update-status', 'PUT'): {'status': 'fixed'},
+        ('improvement-list', 'POST'): {'projectId': ids['project'], 'description': 'Benchmark improvement'},
+        ('improvement-detail', 'PUT'): {'description': 'Benchmark improvement', 'status': 'completed'},
+        ('improvement-detail', 'PATCH'): {'priority': 'high'},
+        ('improvement-update-status', 'PUT'): {'status': 'completed'},
+        ('roadmap-list', 'POST'): {'projectId': ids['project'], 'name': 'Benchmark roadmap'},
+        ('roadmap-detail', 'PUT'): {'name': 'Benchmark roadmap', 'status': 'active'},
+        ('roadmap-detail', 'PATCH'): {'status': 'active'},
+        ('roadmap-phases', 'POST'): {'name': 'Benchmark phase', 'order': 99},
+        ('roadmap-phase-list', 'POST'): {'roadmapId': ids['roadmap'], 'name': 'Benchmark phase', 'order': 99},
+        ('roadmap-phase-detail', 'PUT'): {'name': 'Benchmark phase', 'order': 1},
+        ('roadmap-phase-detail', 'PATCH'): {'status': 'in_progress'},
+        ('roadmap-phase-items', 'POST'): {'title': 'Benchmark item'},
+        ('roadmap-phase-update-status', 'PUT'): {'status': 'in_progress'},
+        ('roadmap-item-list', 'POST'): {'roadmapPhaseId': ids['roadmap-phase'], 'title': 'Benchmark item'},
+        ('roadmap-item-detail', 'PUT'): {'title': 'Benchmark item', 'status': 'in_progress'},
+        ('roadmap-item-detail', 'PATCH'): {'priority': 'high'},
+        ('roadmap-item-update-status', 'PATCH'): {'status': 'completed'},
+        ('roadmap-item-link', 'PATCH'): {'linkedFeatureId': ids['feature']},
+        ('roadmap-item-unlink', 'PATCH'): {'link_type': 'feature'},
+    }
+
+
+def router_endpoints():
+    """Yield `(url name, method, basename, detail)` for every route of the API router."""
+    for _, viewset, basename in router.registry:
+        for action, method in LIST_METHODS.items():
+            if hasattr(viewset, action):
+                yield f'{basename}-list', method, basename, False
+        for action, method in DETAIL_METHODS.items():
+            if hasattr(viewset, action):
+                yield f'{basename}-detail', method, basename, True
+        for extra in viewset.get_extra_actions():
+            for method in extra.mapping:
+                yield f'{basename}-{extra.url_name}', method.upper(), basename, extra.detail
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API router endpoint: p50/p95 latency, queries per request and payload size.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='bench0', help='User to run the requests as')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--only', help='Only run endpoints whose url name contains this string')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--compare', help='JSON file from an earlier run to compare against')
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f'User {options["username"]} not found; run generate_fake_data first.')
+        ids = sample_ids(user)
+        bodies = payloads(ids)
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}', raise_request_exception=False)
+
+        results = {}
+        for url_name, method, basename, detail in router_endpoints():
+            if options['only'] and options['only'] not in url_name:
+                continue
+            if detail and ids.get(basename) is None:
+                self.stderr.write(f'Skipping {method} {url_name}: no {basename} to target')
+                continue
+            path = reverse(url_name, kwargs={'pk': ids[basename]} if detail else None)
+            body = bodies.get((url_name, method), {})
+            results[f'{method} {url_name}'] = self.measure(client, method, path, body, options['repeat'])
+
+        self.report(results, self.load(options['compare']))
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'commit': self.commit(), 'results': results}, fh, indent=2)
+
+    def measure(self, client, method, path, body, repeat):
+        timings, queries, sizes, statuses = [], [], [], set()
+        for run in range(repeat + 1):
+            # Writes are rolled back so every run (and the next endpoint) sees the same data.
+            with transaction.atomic(), ExitStack() as stack:
+                captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+                start = perf_counter()
+                response = getattr(client, method.lower())(path, body, content_type='application/json') \
+                    if method != 'GET' else client.get(path)
+                elapsed = perf_counter() - start
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                transaction.set_rollback(True)
+            if run == 0:
+                continue  # warm-up
+            timings.append(elapsed * 1000)
+            queries.append(sum(len(capture) for capture in captures))
+            sizes.append(len(content))
+            statuses.add(response.status_code)
+        return {
+            'path': path,
+            'status': sorted(statuses),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'queries': statistics.median(queries),
+            'bytes': statistics.median(sizes),
+        }
+
+    def load(self, path):
+        if not path:
+            return {}
+        with open(path) as fh:
+            return json.load(fh)['results']
+
+    def commit(self):
+        try:
+            return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def report(self, results, baseline):
+        header = f'{"endpoint":44} {"status":>8} {"p50 ms":>9} {"p95 ms":>9} {"queries":>8} {"bytes":>10}'
+        if baseline:
+            header += f' {"p50 vs base":>12}'
+        self.stdout.write(header)
+        for name, stats in results.items():
+            line = (f'{name:44} {",".join(map(str, stats["status"])):>8} {stats["p50_ms"]:9.2f} '
+                    f'{stats["p95_ms"]:9.2f} {stats["queries"]:8g} {stats["bytes"]:10g}')
+            if name in baseline and baseline[name]['p50_ms']:
+                change = (stats['p50_ms'] - baseline[name]['p50_ms']) / baseline[name]['p50_ms'] * 100
+                line += f' {change:+11.1f}%'
+            self.stdout.write(line)
@@ -0,0 +1,188 @@
+"""Process-level metrics exposed in Prometheus text format on /api/metrics/."""
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000)
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        key = tuple(labels.items())
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for key, value in self.series.items():
+                lines.append(f'{self.name}{format_labels(dict(key))} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        key = tuple(labels.items())
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for key, series in self.series.items():
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{format_labels({**labels, "le": bound})} {cumulative}')
+                lines.append(f'{self.name}_sum{format_labels(labels)} {series[-1]}')
+                lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+REQUESTS = Counter('http_requests_total', 'Requests handled, by route, action and status.')
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Time spent handling the request.', LATENCY_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', 'Database queries run per request.', QUERY_COUNT_BUCKETS)
+DB_TIME = Histogram('http_request_db_duration_seconds', 'Time spent in database queries per request.', LATENCY_BUCKETS)
+SERIALIZER_TIME = Histogram(
+    'http_request_serializer_duration_seconds', 'Time spent in serializer to_representation per request.', LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Response body size.', SIZE_BUCKETS)
+COALESCED_REQUESTS = Counter(
+    'http_requests_coalesced_total', 'GET requests answered with the data of an identical in-flight request.'
+)
+REQUEST_METRICS = [REQUESTS, REQUEST_LATENCY, DB_QUERIES, DB_TIME, SERIALIZER_TIME, RESPONSE_SIZE, COALESCED_REQUESTS]
+
+
+class RequestMetrics:
+    """Per-request accumulator filled by the DB wrapper and serializer timer."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook.
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+
+
+current_request_metrics = ContextVar('current_request_metrics', default=None)
+
+
+@contextmanager
+def serializer_timer():
+    """Time serialization for the current request, counting nested serializers once.
+
+    Includes any queries serialization triggers itself (e.g. unprefetched relations).
+    """
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        if not metrics.serializer_depth:
+            metrics.serializer_time += perf_counter() - start
+
+
+def record_request(labels, status_code, duration, metrics, response_size=None):
+    REQUESTS.inc({**labels, 'status': status_code})
+    REQUEST_LATENCY.observe(labels, duration)
+    DB_QUERIES.observe(labels, metrics.queries)
+    DB_TIME.observe(labels, metrics.db_time)
+    SERIALIZER_TIME.observe(labels, metrics.serializer_time)
+    if response_size is not None:
+        RESPONSE_SIZE.observe(labels, response_size)
+
+
+# (metric name, type, help, psycopg_pool stats key or callable on the stats dict)
+POOL_METRICS = [
+    ('db_pool_min_size', 'gauge', 'Configured minimum pool size.', 'pool_min'),
+    ('db_pool_max_size', 'gauge', 'Configured maximum pool size.', 'pool_max'),
+    ('db_pool_connections', 'gauge', 'Connections currently open in the pool.', 'pool_size'),
+    ('db_pool_connections_idle', 'gauge', 'Open connections waiting to be checked out.', 'pool_available'),
+    ('db_pool_connections_in_use', 'gauge', 'Connections currently checked out.',
+     lambda stats: stats.get('pool_size', 0) - stats.get('pool_available', 0)),
+    ('db_pool_requests_waiting', 'gauge', 'Requests currently queued for a connection.', 'requests_waiting'),
+    ('db_pool_requests_total', 'counter', 'Connection checkouts requested.', 'requests_num'),
+    ('db_pool_requests_queued_total', 'counter', 'Checkouts that had to wait for a connection.', 'requests_queued'),
+    ('db_pool_checkout_wait_seconds_total', 'counter', 'Total time spent waiting for a connection.',
+     lambda stats: stats.get('requests_wait_ms', 0) / 1000),
+    ('db_pool_requests_errors_total', 'counter', 'Checkouts that failed, e.g. timed out.', 'requests_errors'),
+    ('db_pool_returns_bad_total', 'counter', 'Connections returned to the pool in a bad state.', 'returns_bad'),
+    ('db_pool_connections_opened_total', 'counter', 'Connections opened by the pool.', 'connections_num'),
+    ('db_pool_connections_errors_total', 'counter', 'Failed connection attempts.', 'connections_errors'),
+    ('db_pool_connections_lost_total', 'counter', 'Connections found broken by the health check.', 'connections_lost'),
+]
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+def pool_stats():
+    """Return `{alias: stats}` for every database alias served by a psycopg pool."""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def render_pool_metrics():
+    lines = []
+    stats_by_alias = pool_stats()
+    for name, metric_type, help_text, source in POOL_METRICS:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for alias, stats in stats_by_alias.items():
+            value = source(stats) if callable(source) else stats.get(source, 0)
+            lines.append(f'{name}{format_labels({"alias": alias})} {value}')
+    return lines
+
+
+def render_metrics():
+    """Return every metric in Prometheus text exposition format."""
+    lines = []
+    for metric in REQUEST_METRICS:
+        lines.extend(metric.render())
+    lines.extend(render_pool_metrics())
+    return '\n'.join(lines) + '\n'
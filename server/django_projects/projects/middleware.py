@@ -0,0 +1,135 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .db_routers import choose_replica, read_database
+from .metrics import RequestMetrics, current_request_metrics, record_request
+from .utils import get_token_user_id
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def primary_pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route reads of safe API requests to a read replica.
+
+    After a user's write, their reads stay on the primary for
+    REPLICA_PIN_SECONDS so they never read their own edits back stale.
+    Users are identified from the JWT claim, without a database lookup.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def routes(self, request):
+        return request.path.startswith('/api/')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.routes(request):
+            return self.get_response(request)
+
+        user_id = get_token_user_id(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if user_id is not None:
+                cache.set(primary_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+            return response
+
+        pinned = user_id is not None and cache.get(primary_pin_key(user_id))
+        token = read_database.set(None if pinned else choose_replica())
+        try:
+            return self.get_response(request)
+        finally:
+            read_database.reset(token)
+
+    async def __acall__(self, request):
+        if not self.routes(request):
+            return await self.get_response(request)
+
+        user_id = get_token_user_id(request)
+        if request.method not in SAFE_METHODS:
+            response = await self.get_response(request)
+            if user_id is not None:
+                await cache.aset(primary_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+            return response
+
+        pinned = user_id is not None and await cache.aget(primary_pin_key(user_id))
+        token = read_database.set(None if pinned else choose_replica())
+        try:
+            return await self.get_response(request)
+        finally:
+            read_database.reset(token)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-route latency, query count, DB time, serializer time and
+    response size for /api/metrics/.
+
+    Routes are labelled with their URL name (e.g. `project-list`,
+    `roadmap-item-update-status`) and HTTP method.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def wrap_connections(self, metrics):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(metrics))
+        return stack
+
+    def record(self, request, response, metrics, duration):
+        match = request.resolver_match
+        labels = {
+            'route': match.url_name if match and match.url_name else 'unmatched',
+            'method': request.method,
+        }
+        size = None if response.streaming else len(response.content)
+        record_request(labels, response.status_code, duration, metrics, size)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            with self.wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.record(request, response, metrics, perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        start = perf_counter()
+        # The ORM runs in the request's thread-sensitive executor; wrap its connections.
+        stack = await sync_to_async(self.wrap_connections)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current_request_metrics.reset(token)
+        self.record(request, response, metrics, perf_counter() - start)
+        return response
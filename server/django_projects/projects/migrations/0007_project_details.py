@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+DETAIL_FIELDS = (
+    'development_notes', 'frontend_details', 'backend_details', 'env_details', 'test_user_details', 'auth_details',
+)
+BATCH_SIZE = 1000
+
+
+def move_details(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectDetails = apps.get_model('projects', 'ProjectDetails')
+    rows = Project.objects.values_list('id', *DETAIL_FIELDS).iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for project_id, *values in rows:
+        batch.append(ProjectDetails(project_id=project_id, **dict(zip(DETAIL_FIELDS, values))))
+        if len(batch) == BATCH_SIZE:
+            ProjectDetails.objects.bulk_create(batch)
+            batch = []
+    ProjectDetails.objects.bulk_create(batch)
+
+
+def restore_details(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectDetails = apps.get_model('projects', 'ProjectDetails')
+    batch = []
+    for details in ProjectDetails.objects.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Project(id=details.project_id, **{field: getattr(details, field) for field in DETAIL_FIELDS}))
+        if len(batch) == BATCH_SIZE:
+            Project.objects.bulk_update(batch, DETAIL_FIELDS)
+            batch = []
+    Project.objects.bulk_update(batch, DETAIL_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_add_estimated_time_priority_deadline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDetails',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='details', serialize=False, to='projects.project')),
+                ('development_notes', models.TextField(blank=True, null=True)),
+                ('frontend_details', models.TextField(blank=True, null=True)),
+                ('backend_details', models.TextField(blank=True, null=True)),
+                ('env_details', models.TextField(blank=True, null=True)),
+                ('test_user_details', models.TextField(blank=True, null=True)),
+                ('auth_details', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'project details',
+            },
+        ),
+        migrations.RunPython(move_details, restore_details),
+        migrations.RemoveField(
+            model_name='project',
+            name='auth_details',
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='backend_details',
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='development_notes',
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='env_details',
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='frontend_details',
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='test_user_details',
+        ),
+    ]
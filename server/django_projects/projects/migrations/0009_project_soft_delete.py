@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+# (table, column, referenced table, ON DELETE action) for every foreign key a
+# project purge has to follow. Django emulates on_delete in Python, so the
+# constraints it creates have no ON DELETE clause of their own.
+FOREIGN_KEYS = [
+    ('projects_projectdetails', 'project_id', 'projects_project', 'CASCADE'),
+    ('projects_feature', 'project_id', 'projects_project', 'CASCADE'),
+    ('projects_bug', 'project_id', 'projects_project', 'CASCADE'),
+    ('projects_improvement', 'project_id', 'projects_project', 'CASCADE'),
+    ('projects_activity', 'project_id', 'projects_project', 'CASCADE'),
+    ('projects_roadmap', 'project_id', 'projects_project', 'CASCADE'),
+    ('projects_roadmapphase', 'roadmap_id', 'projects_roadmap', 'CASCADE'),
+    ('projects_roadmapitem', 'roadmap_phase_id', 'projects_roadmapphase', 'CASCADE'),
+    ('projects_roadmapitem', 'linked_feature_id', 'projects_feature', 'SET NULL'),
+    ('projects_roadmapitem', 'linked_bug_id', 'projects_bug', 'SET NULL'),
+    ('projects_roadmapitem', 'linked_improvement_id', 'projects_improvement', 'SET NULL'),
+]
+
+
+def set_on_delete(table, column, referenced, action):
+    """Recreate the foreign key on `table.column` (whatever Django named it) with ON DELETE `action`."""
+    on_delete = f'ON DELETE {action} ' if action else ''
+    return f"""
+        DO $$
+        DECLARE name text;
+        BEGIN
+            SELECT conname INTO STRICT name FROM pg_constraint
+            WHERE contype = 'f' AND conrelid = '{table}'::regclass
+              AND conkey = ARRAY[(SELECT attnum FROM pg_attribute WHERE attrelid = '{table}'::regclass AND attname = '{column}')];
+            EXECUTE format(
+                'ALTER TABLE {table} DROP CONSTRAINT %1$I, ADD CONSTRAINT %1$I FOREIGN KEY ({column}) '
+                'REFERENCES {referenced} (id) {on_delete}DEFERRABLE INITIALLY DEFERRED', name
+            );
+        END $$;
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_updated_at_stamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='project_deleted_at_idx'),
+        ),
+        migrations.RunSQL(
+            [set_on_delete(*foreign_key) for foreign_key in FOREIGN_KEYS],
+            [set_on_delete(table, column, referenced, None) for table, column, referenced, _ in FOREIGN_KEYS],
+        ),
+    ]
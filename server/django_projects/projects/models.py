@@ -11,8 +11,41 @@ class CustomUser(AbstractUser):
         return self.email or self.username
 
 
+class LiveManager(models.Manager):
+    """Manager that hides soft-deleted projects and everything in them.
+
+    It is Project's default manager. Child models keep a plain default
+    manager, so related managers and prefetches (project.feature_set,
+    phases__items) don't join up to the project, and offer this one as
+    `live` for queries that don't start from a live project. `project_path`
+    is the lookup from the model to its project.
+    """
+    project_path = ''
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{f'{self.project_path}deleted_at__isnull': True})
+
+
+class LiveProjectChildManager(LiveManager):
+    project_path = 'project__'
+
+
+class LiveRoadmapPhaseManager(LiveManager):
+    project_path = 'roadmap__project__'
+
+
+class LiveRoadmapItemManager(LiveManager):
+    project_path = 'roadmap_phase__roadmap__project__'
+
+
 class Project(models.Model):
-    """Project model."""
+    """Project model.
+
+    Deleting a project only sets `deleted_at`; `purge_deleted_projects` removes
+    the rows later with a single DELETE that the database cascades to the
+    project's children (the ON DELETE clauses are set in migration 0009, and
+    are lost if a later migration alters those foreign keys).
+    """
     STATUS_CHOICES = [
         ('POC', 'POC'),
         ('In Development', 'In Development'),
@@ -24,7 +57,6 @@ class Project(models.Model):
     name = models.TextField()
     description = models.TextField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Deployed')
-    development_notes = models.TextField(null=True, blank=True)
     production_link = models.TextField(null=True, blank=True)
     repo_link = ArrayField(
         base_field=models.TextField(null=True, blank=True),
@@ -33,16 +65,39 @@ class Project(models.Model):
     )
     frontend_link = models.TextField(null=True, blank=True)
     backend_link = models.TextField(null=True, blank=True)
+    setup_steps = models.JSONField(default=list, blank=True) # JSON string instead of ArrayField
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Only deleted projects are looked up by deleted_at (by the purge).
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='project_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ProjectDetails(models.Model):
+    """Long free-text notes of a project, kept out of the project table so its rows stay narrow."""
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='details')
+    development_notes = models.TextField(null=True, blank=True)
     frontend_details = models.TextField(null=True, blank=True)
     backend_details = models.TextField(null=True, blank=True)
     env_details = models.TextField(null=True, blank=True)
     test_user_details = models.TextField(null=True, blank=True)
     auth_details = models.TextField(null=True, blank=True)
-    setup_steps = models.JSONField(default=list, blank=True) # JSON string instead of ArrayField
-    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'project details'
 
     def __str__(self):
-        return self.name
+        return f"Details of {self.project_id}"
 
 
 class Feature(models.Model):
@@ -63,6 +118,10 @@ class Feature(models.Model):
     priority = models.CharField(max_length=10, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], null=True, blank=True)
     deadline = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+    live = LiveProjectChildManager()
 
     def __str__(self):
         return f"{self.project.name} - {self.description[:50]}"
@@ -86,6 +145,10 @@ class Bug(models.Model):
     priority = models.CharField(max_length=10, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], null=True, blank=True)
     deadline = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+    live = LiveProjectChildManager()
 
     def __str__(self):
         return f"{self.project.name} - {self.description[:50]}"
@@ -109,6 +172,10 @@ class Improvement(models.Model):
     priority = models.CharField(max_length=10, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], null=True, blank=True)
     deadline = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+    live = LiveProjectChildManager()
 
     def __str__(self):
         return f"{self.project.name} - {self.description[:50]}"
@@ -141,6 +208,9 @@ class Activity(models.Model):
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager()
+    live = LiveProjectChildManager()
+
     def __str__(self):
         return f"{self.type} - {self.entity} at {self.created_at}"
 
@@ -159,7 +229,10 @@ class Roadmap(models.Model):
     description = models.TextField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+    live = LiveProjectChildManager()
 
     def __str__(self):
         return f"{self.project.name} - {self.name}"
@@ -183,7 +256,10 @@ class RoadmapPhase(models.Model):
     deadline = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='not_started')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+    live = LiveRoadmapPhaseManager()
 
     class Meta:
         ordering = ['order']
@@ -219,7 +295,10 @@ class RoadmapItem(models.Model):
     linked_bug = models.ForeignKey(Bug, on_delete=models.SET_NULL, null=True, blank=True, related_name='roadmap_items')
     linked_improvement = models.ForeignKey(Improvement, on_delete=models.SET_NULL, null=True, blank=True, related_name='roadmap_items')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+    live = LiveRoadmapItemManager()
 
     def __str__(self):
         return f"{self.roadmap_phase.roadmap.name} - {self.title}"
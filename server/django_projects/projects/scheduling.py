@@ -0,0 +1,146 @@
+"""Schedule projection for roadmaps.
+
+Phases run one after another in `order`. Inside a phase, open items are
+worked through by priority, then deadline, at a fixed weekly capacity spread
+over Monday to Friday. Each phase and item gets a projected start and
+finish, plus flags where that lands after its deadline or target date.
+"""
+import math
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import RoadmapPhase
+
+DEFAULT_WEEKLY_CAPACITY = 40
+MIN_WEEKLY_CAPACITY = 0.1
+WORKDAYS_PER_WEEK = 5
+EPOCH_MONDAY = date(2000, 1, 3)
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+SCHEDULE_CACHE_SECONDS = 24 * 3600
+
+
+def workday_number(day):
+    """Index of `day` counted in working days; weekends map to the following Monday."""
+    weeks, weekday = divmod((day - EPOCH_MONDAY).days, 7)
+    if weekday >= WORKDAYS_PER_WEEK:
+        return (weeks + 1) * WORKDAYS_PER_WEEK
+    return weeks * WORKDAYS_PER_WEEK + weekday
+
+
+def workday_date(number):
+    if number > LAST_WORKDAY:
+        raise OverflowError(f'Projected past {date.max}.')
+    weeks, weekday = divmod(number, WORKDAYS_PER_WEEK)
+    return EPOCH_MONDAY + timedelta(weeks=weeks, days=weekday)
+
+
+LAST_WORKDAY = workday_number(date.max)
+
+
+def hours(duration):
+    return duration.total_seconds() / 3600 if duration else 0.0
+
+
+def item_sort_key(item):
+    return (PRIORITY_RANK.get(item.priority, len(PRIORITY_RANK)), item.deadline is None, item.deadline or date.min, item.id)
+
+
+class Timeline:
+    """Packs work end to end, `hours_per_day` at a time, from a start date."""
+
+    def __init__(self, start, hours_per_day):
+        self.position = float(workday_number(start))
+        self.hours_per_day = hours_per_day
+
+    def book(self, work_hours):
+        """Reserve `work_hours` and return the (start, finish) dates of that work."""
+        begin = self.position
+        self.position += work_hours / self.hours_per_day
+        first_day = math.floor(begin + 1e-9)
+        last_day = max(math.ceil(self.position - 1e-9) - 1, first_day)
+        return workday_date(first_day), workday_date(last_day)
+
+
+def project_schedule(phases, capacity_hours, start):
+    """Project `phases` (with prefetched items) at `capacity_hours` a week from `start`."""
+    timeline = Timeline(start, capacity_hours / WORKDAYS_PER_WEEK)
+    projected_phases = []
+    unestimated = 0
+    for phase in sorted(phases, key=lambda phase: (phase.order, phase.id)):
+        open_items = [] if phase.status == 'completed' else [
+            item for item in phase.items.all() if item.status != 'completed'
+        ]
+        unestimated += sum(1 for item in open_items if not item.estimated_work_time)
+        phase_start = workday_date(math.floor(timeline.position + 1e-9))
+        projected_items = []
+        if any(item.estimated_work_time for item in open_items):
+            for item in sorted(open_items, key=item_sort_key):
+                item_hours = hours(item.estimated_work_time)
+                # Unestimated items can't be placed; they're listed without dates.
+                item_start, item_finish = timeline.book(item_hours) if item_hours else (None, None)
+                projected_items.append({
+                    'id': item.id,
+                    'title': item.title,
+                    'remainingHours': item_hours,
+                    'start': item_start,
+                    'finish': item_finish,
+                    'deadline': item.deadline,
+                    'overDeadline': bool(item.deadline and item_finish and item_finish > item.deadline),
+                })
+            phase_hours = sum(item['remainingHours'] for item in projected_items)
+            phase_finish = max(item['finish'] for item in projected_items if item['finish'])
+        else:
+            # No item estimates to pack: fall back to the phase's own estimate.
+            phase_hours = 0.0 if phase.status == 'completed' else hours(phase.estimated_work_time)
+            phase_start, phase_finish = timeline.book(phase_hours)
+        projected_phases.append({
+            'id': phase.id,
+            'name': phase.name,
+            'order': phase.order,
+            'remainingHours': phase_hours,
+            'start': phase_start,
+            'finish': phase_finish,
+            'deadline': phase.deadline,
+            'targetDate': phase.target_date,
+            'overDeadline': bool(phase.deadline and phase_finish > phase.deadline),
+            'missesTarget': bool(phase.target_date and phase_finish > phase.target_date),
+            'items': projected_items,
+        })
+
+    return {
+        'capacityHours': capacity_hours,
+        'start': start,
+        'finish': max((phase['finish'] for phase in projected_phases), default=start),
+        'achievable': not any(
+            phase['overDeadline'] or any(item['overDeadline'] for item in phase['items']) for phase in projected_phases
+        ),
+        'unestimatedItems': unestimated,
+        'phases': projected_phases,
+    }
+
+
+def roadmap_version(roadmap):
+    """Fingerprint that changes whenever the roadmap, one of its phases or items is edited, added or removed."""
+    stats = RoadmapPhase.objects.filter(roadmap=roadmap).aggregate(
+        phase_count=Count('id', distinct=True),
+        phases_updated=Max('updated_at'),
+        item_count=Count('items'),
+        items_updated=Max('items__updated_at'),
+    )
+    stamps = [roadmap.updated_at, stats['phases_updated'], stats['items_updated']]
+    return ':'.join(
+        [str(stats['phase_count']), str(stats['item_count'])] + [str(stamp.timestamp()) if stamp else '-' for stamp in stamps]
+    )
+
+
+def get_roadmap_schedule(roadmap, capacity_hours, start):
+    """Return the roadmap's projection, memoized per roadmap version, capacity and start date."""
+    key = f'roadmap-schedule:{roadmap.id}:{roadmap_version(roadmap)}:{capacity_hours}:{start.isoformat()}'
+    schedule = cache.get(key)
+    if schedule is None:
+        phases = RoadmapPhase.objects.filter(roadmap=roadmap).prefetch_related('items')
+        schedule = {'roadmapId': roadmap.id, **project_schedule(phases, capacity_hours, start)}
+        cache.set(key, schedule, SCHEDULE_CACHE_SECONDS)
+    return schedule
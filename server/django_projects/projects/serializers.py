@@ -1,11 +1,104 @@
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
 
-from .utils import get_changed_data
-from .models import CustomUser, Project, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from .batch import BATCH_LIMIT
+from .bulk import LINK_FIELDS, link_target_errors
+from .metrics import serializer_timer
+from .utils import describe_changes, get_changed_data
+from .models import CustomUser, Project, ProjectDetails, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
 import json
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+class BaseModelSerializer(serializers.ModelSerializer):
+    """Base for the API's model serializers.
+
+    Pass `fields` and/or `exclude` (lists of field names) to render a sparse
+    fieldset; `sparse_queryset()` then narrows a queryset to what those fields
+    read. `Meta.field_prefetches` maps relation fields to their prefetch lookup
+    and `Meta.method_field_columns` maps SerializerMethodFields to the columns
+    they read. Fields in `Meta.optional_fields` are only rendered when named
+    in `include` or `fields`.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, include=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        optional = set(getattr(self.Meta, 'optional_fields', ()))
+        unknown_include = set(include or ()) - optional
+        if unknown_include:
+            raise serializers.ValidationError({'include': [f"Unknown field(s): {', '.join(sorted(unknown_include))}."]})
+        self.sparse = fields is not None or bool(exclude) or bool(include)
+        unknown = (set(fields or ()) | set(exclude or ())) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        requested = set(include or ()) | set(fields or ())
+        for name in list(self.fields):
+            if (
+                (fields is not None and name not in fields) or name in (exclude or ())
+                or (name in optional and name not in requested)
+            ):
+                self.fields.pop(name)
+
+    def save_changes(self, instance, validated_data):
+        """Write only the columns whose value changed.
+
+        Returns `{attr: (old_value, new_value)}`; when it's empty nothing was
+        written, so callers skip their Activity row too.
+        """
+        changed_data = get_changed_data(instance, validated_data)
+        if changed_data:
+            for attr, (old_value, new_value) in changed_data.items():
+                setattr(instance, attr, new_value)
+            auto_now = [field.attname for field in instance._meta.concrete_fields if getattr(field, 'auto_now', False)]
+            instance.save(update_fields=[*changed_data, *auto_now])
+        return changed_data
+
+    def sparse_queryset(self, queryset):
+        """Defer the columns and drop the prefetches of fields this serializer won't render."""
+        if not self.sparse:
+            return queryset
+        opts = queryset.model._meta
+        meta = self.Meta
+        field_prefetches = getattr(meta, 'field_prefetches', {})
+        method_field_columns = getattr(meta, 'method_field_columns', {})
+        # Foreign keys stay loaded: permission checks and activity logging read them.
+        columns = {opts.pk.name} | {field.name for field in opts.concrete_fields if field.is_relation}
+        prefetches = []
+        select_related = set()
+        unmapped_relation = False
+        for name, field in self.fields.items():
+            if name in field_prefetches:
+                prefetches.append(field_prefetches[name])
+            elif name in method_field_columns:
+                columns.update(method_field_columns[name])
+            elif field.source == '*':
+                return queryset  # can't tell which columns an unmapped method field reads
+            else:
+                try:
+                    model_field = opts.get_field(field.source_attrs[0])
+                except FieldDoesNotExist:
+                    return queryset
+                if model_field.concrete:
+                    columns.add(model_field.name)
+                elif model_field.one_to_one and len(field.source_attrs) > 1:
+                    # e.g. source='details.env_details' on a reverse one-to-one.
+                    select_related.add(model_field.name)
+                    columns.add('__'.join(field.source_attrs[:2]))
+                else:
+                    unmapped_relation = True
+        if not unmapped_relation:
+            queryset = queryset.prefetch_related(None).prefetch_related(*prefetches)
+        queryset = queryset.select_related(None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.only(*columns)
+
+    def to_representation(self, instance):
+        # Counted towards the request's serializer time on /api/metrics/.
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
     @classmethod
@@ -23,25 +116,52 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return token
 
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(BaseModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'profile_image_url')
         read_only_fields = ('id',)
 
 
-class FeatureSerializer(serializers.ModelSerializer):
-    projectId = serializers.IntegerField(source='project.id', read_only=True)
+class LinkedRoadmapItemSerializer(serializers.ModelSerializer):
+    roadmapPhaseId = serializers.IntegerField(source='roadmap_phase_id', read_only=True)
+
+    class Meta:
+        model = RoadmapItem
+        fields = ('id', 'title', 'status', 'roadmapPhaseId')
+        read_only_fields = fields
+
+
+class BacklogSerializer(BaseModelSerializer):
+    """Base of the feature, bug and improvement serializers.
+
+    `?include=roadmapItems` adds the roadmap items linking to the entry, with
+    one prefetch query per page. Subclasses end their `Meta.fields` with
+    `*BacklogSerializer.Meta.fields` and inherit the rest of this Meta.
+    """
+    roadmapItems = LinkedRoadmapItemSerializer(source='roadmap_items', many=True, read_only=True)
+
+    class Meta:
+        fields = ('roadmapItems',)
+        optional_fields = ('roadmapItems',)
+        field_prefetches = {'roadmapItems': 'roadmap_items'}
+
+
+class FeatureSerializer(BacklogSerializer):
+    projectId = serializers.IntegerField(source='project_id', read_only=True)
     tags = serializers.SerializerMethodField()
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     estimatedWorkTime = serializers.DurationField(source='estimated_work_time', required=False, allow_null=True)
     priority = serializers.CharField(required=False, allow_null=True)
     deadline = serializers.DateField(required=False, allow_null=True)
 
-    class Meta:
+    class Meta(BacklogSerializer.Meta):
         model = Feature
-        fields = ('id', 'projectId', 'description', 'status', 'rank', 'tags', 'estimatedWorkTime', 'priority', 'deadline', 'createdAt')
-        read_only_fields = ('id', 'createdAt', 'projectId')
+        fields = ('id', 'projectId', 'description', 'status', 'rank', 'tags', 'estimatedWorkTime', 'priority', 'deadline', 'createdAt', 'updatedAt',
+                  *BacklogSerializer.Meta.fields)
+        read_only_fields = ('id', 'createdAt', 'updatedAt', 'projectId')
+        method_field_columns = {'tags': ('tags',)}
 
     def get_tags(self, obj):
         try:
@@ -65,32 +185,26 @@ class FeatureSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         if 'tags' in validated_data:
             validated_data['tags'] = json.dumps(validated_data['tags'])
-        changed_data = get_changed_data(instance, validated_data)
-        for attr, (old_value, new_value) in changed_data.items():
-            setattr(instance, attr, new_value)
-        instance = super().update(instance, validated_data)
-        project_instance = instance.project
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
-                project=project_instance,
+        changed_data = self.save_changes(instance, validated_data)
+        if changed_data:
+            Activity.objects.create(
+                project=instance.project,
                 type="update",
                 entity="feature",
                 entity_id=instance.id,
-                description=f"Feature '{instance.description}' updated with {', '.join(activity_description)}"
+                description=f"Feature '{instance.description}' updated with {describe_changes(changed_data)}"
             )
         return instance
 
 
-class FeatureStatusUpdateSerializer(serializers.ModelSerializer):
+class FeatureStatusUpdateSerializer(BaseModelSerializer):
     class Meta:
         model = Feature
         fields = ("status",)
     
     def update(self, instance, validated_data):
-        instance = super().update(instance, validated_data)
-        Activity.objects.create(
+        if self.save_changes(instance, validated_data):
+            Activity.objects.create(
                 project=instance.project,
                 type="status_change",
                 entity="feature",
@@ -100,14 +214,14 @@ class FeatureStatusUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class BugStatusUpdateSerializer(serializers.ModelSerializer):
+class BugStatusUpdateSerializer(BaseModelSerializer):
     class Meta:
         model = Bug
         fields = ("status",)
     
     def update(self, instance, validated_data):
-        instance = super().update(instance, validated_data)
-        Activity.objects.create(
+        if self.save_changes(instance, validated_data):
+            Activity.objects.create(
                 project=instance.project,
                 type="status_change",
                 entity="bug",
@@ -117,14 +231,14 @@ class BugStatusUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class ImprovementStatusUpdateSerializer(serializers.ModelSerializer):
+class ImprovementStatusUpdateSerializer(BaseModelSerializer):
     class Meta:
         model = Improvement
         fields = ("status",)
         
     def update(self, instance, validated_data):
-        instance = super().update(instance, validated_data)
-        Activity.objects.create(
+        if self.save_changes(instance, validated_data):
+            Activity.objects.create(
                 project=instance.project,
                 type="status_change",
                 entity="improvement",
@@ -134,18 +248,21 @@ class ImprovementStatusUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class BugSerializer(serializers.ModelSerializer):
-    projectId = serializers.IntegerField(source='project.id', read_only=True)
+class BugSerializer(BacklogSerializer):
+    projectId = serializers.IntegerField(source='project_id', read_only=True)
     tags = serializers.SerializerMethodField()
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     estimatedWorkTime = serializers.DurationField(source='estimated_work_time', required=False, allow_null=True)
     priority = serializers.CharField(required=False, allow_null=True)
     deadline = serializers.DateField(required=False, allow_null=True)
 
-    class Meta:
+    class Meta(BacklogSerializer.Meta):
         model = Bug
-        fields = ('id', 'projectId', 'description', 'status', 'rank', 'tags', 'estimatedWorkTime', 'priority', 'deadline', 'createdAt')
-        read_only_fields = ('id', 'createdAt', 'projectId')
+        fields = ('id', 'projectId', 'description', 'status', 'rank', 'tags', 'estimatedWorkTime', 'priority', 'deadline', 'createdAt', 'updatedAt',
+                  *BacklogSerializer.Meta.fields)
+        read_only_fields = ('id', 'createdAt', 'updatedAt', 'projectId')
+        method_field_columns = {'tags': ('tags',)}
 
     def get_tags(self, obj):
         try:
@@ -168,35 +285,33 @@ class BugSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         if 'tags' in validated_data:
             validated_data['tags'] = json.dumps(validated_data['tags'])
-        changed_data = get_changed_data(instance, validated_data)
-        for attr, (old_value, new_value) in changed_data.items():
-            setattr(instance, attr, new_value)
-        instance = super().update(instance, validated_data)
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
+        changed_data = self.save_changes(instance, validated_data)
+        if changed_data:
+            Activity.objects.create(
                 project=instance.project,
                 type="update",
                 entity="bug",
                 entity_id=instance.id,
-                description=f"Bug '{instance.description}' updated with {', '.join(activity_description)}"
+                description=f"Bug '{instance.description}' updated with {describe_changes(changed_data)}"
             )
         return instance
 
 
-class ImprovementSerializer(serializers.ModelSerializer):
-    projectId = serializers.IntegerField(source='project.id', read_only=True)
+class ImprovementSerializer(BacklogSerializer):
+    projectId = serializers.IntegerField(source='project_id', read_only=True)
     tags = serializers.SerializerMethodField()
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     estimatedWorkTime = serializers.DurationField(source='estimated_work_time', required=False, allow_null=True)
     priority = serializers.CharField(required=False, allow_null=True)
     deadline = serializers.DateField(required=False, allow_null=True)
 
-    class Meta:
+    class Meta(BacklogSerializer.Meta):
         model = Improvement
-        fields = ('id', 'projectId', 'description', 'status', 'rank', 'tags', 'estimatedWorkTime', 'priority', 'deadline', 'createdAt')
-        read_only_fields = ('id', 'createdAt', 'projectId')
+        fields = ('id', 'projectId', 'description', 'status', 'rank', 'tags', 'estimatedWorkTime', 'priority', 'deadline', 'createdAt', 'updatedAt',
+                  *BacklogSerializer.Meta.fields)
+        read_only_fields = ('id', 'createdAt', 'updatedAt', 'projectId')
+        method_field_columns = {'tags': ('tags',)}
 
     def get_tags(self, obj):
         try:
@@ -219,25 +334,20 @@ class ImprovementSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         if 'tags' in validated_data:
             validated_data['tags'] = json.dumps(validated_data['tags'])
-        changed_data = get_changed_data(instance, validated_data)
-        for attr, (old_value, new_value) in changed_data.items():
-            setattr(instance, attr, new_value)
-        instance = super().update(instance, validated_data)
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
+        changed_data = self.save_changes(instance, validated_data)
+        if changed_data:
+            Activity.objects.create(
                 project=instance.project,
                 type="update",
                 entity="improvement",
                 entity_id=instance.id,
-                description=f"Improvement '{instance.description}' updated with {', '.join(activity_description)}"
+                description=f"Improvement '{instance.description}' updated with {describe_changes(changed_data)}"
             )
         return instance
 
 
-class ActivitySerializer(serializers.ModelSerializer):
-    projectId = serializers.IntegerField(source='project.id', read_only=True)
+class ActivitySerializer(BaseModelSerializer):
+    projectId = serializers.IntegerField(source='project_id', read_only=True)
     entityId = serializers.IntegerField(source='entity_id', read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
 
@@ -247,48 +357,50 @@ class ActivitySerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'createdAt', 'projectId')
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(BaseModelSerializer):
     features = serializers.SerializerMethodField()
     bugs = serializers.SerializerMethodField()
     improvements = serializers.SerializerMethodField()
-    userId = serializers.IntegerField(source='user.id', read_only=True)
+    userId = serializers.IntegerField(source='user_id', read_only=True)
     productionLink = serializers.CharField(source='production_link', required=False, allow_blank=True, allow_null=True)
     repoLink = serializers.ListField(source='repo_link', required=False, allow_null=True, allow_empty=True)
     frontendLink = serializers.CharField(source='frontend_link', required=False, allow_blank=True, allow_null=True)
     backendLink = serializers.CharField(source='backend_link', required=False, allow_blank=True, allow_null=True)
-    frontendDetails = serializers.CharField(source='frontend_details', required=False, allow_blank=True, allow_null=True)
-    backendDetails = serializers.CharField(source='backend_details', required=False, allow_blank=True, allow_null=True)
-    envDetails = serializers.CharField(source='env_details', required=False, allow_blank=True, allow_null=True)
-    testUserDetails = serializers.CharField(source='test_user_details', required=False, allow_blank=True, allow_null=True)
-    authDetails = serializers.CharField(source='auth_details', required=False, allow_blank=True, allow_null=True)
-    development_notes = serializers.CharField( required=False, allow_blank=True, allow_null=True)
+    frontendDetails = serializers.CharField(source='details.frontend_details', required=False, allow_blank=True, allow_null=True)
+    backendDetails = serializers.CharField(source='details.backend_details', required=False, allow_blank=True, allow_null=True)
+    envDetails = serializers.CharField(source='details.env_details', required=False, allow_blank=True, allow_null=True)
+    testUserDetails = serializers.CharField(source='details.test_user_details', required=False, allow_blank=True, allow_null=True)
+    authDetails = serializers.CharField(source='details.auth_details', required=False, allow_blank=True, allow_null=True)
+    development_notes = serializers.CharField(source='details.development_notes', required=False, allow_blank=True, allow_null=True)
     setupSteps = serializers.JSONField(
         source="setup_steps",
         required=False
     )
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
 
     class Meta:
         model = Project
         fields = (
             'id', 'userId', 'name', 'description', 'status', 'development_notes', 'productionLink', 'repoLink',
             'frontendLink', 'backendLink', 'frontendDetails', 'backendDetails',
-            'envDetails', 'testUserDetails', 'authDetails', 'setupSteps', 'createdAt',
+            'envDetails', 'testUserDetails', 'authDetails', 'setupSteps', 'createdAt', 'updatedAt',
             'features', 'bugs', 'improvements'
         )
-        read_only_fields = ('id', 'createdAt', 'userId', 'features', 'bugs', 'improvements')
+        read_only_fields = ('id', 'createdAt', 'updatedAt', 'userId', 'features', 'bugs', 'improvements')
+        field_prefetches = {'features': 'feature_set', 'bugs': 'bug_set', 'improvements': 'improvement_set'}
+        # Stored in ProjectDetails; list responses leave them out unless asked for with ?fields=.
+        detail_fields = ('development_notes', 'frontendDetails', 'backendDetails', 'envDetails', 'testUserDetails', 'authDetails')
 
+    # Read through the related managers so the viewset's prefetch_related is used.
     def get_features(self, obj):
-        features = Feature.objects.filter(project=obj)
-        return FeatureSerializer(features, many=True).data
+        return FeatureSerializer(obj.feature_set.all(), many=True).data
 
     def get_bugs(self, obj):
-        bugs = Bug.objects.filter(project=obj)
-        return BugSerializer(bugs, many=True).data
+        return BugSerializer(obj.bug_set.all(), many=True).data
 
     def get_improvements(self, obj):
-        improvements = Improvement.objects.filter(project=obj)
-        return ImprovementSerializer(improvements, many=True).data
+        return ImprovementSerializer(obj.improvement_set.all(), many=True).data
 
     def create(self, validated_data):
         user_id = self.context['request'].user.id
@@ -296,8 +408,10 @@ class ProjectSerializer(serializers.ModelSerializer):
         if setup_steps:
             validated_data['setup_steps'] = json.dumps(setup_steps)
         
+        details = validated_data.pop('details', {})
         instance = Project.objects.create(user_id=user_id, **validated_data)
-        
+        instance.details = ProjectDetails.objects.create(project=instance, **details)
+
         Activity.objects.create(
                 project=instance,
                 type="create",
@@ -310,33 +424,37 @@ class ProjectSerializer(serializers.ModelSerializer):
    
 
     def update(self, instance, validated_data):
-        changed_data = get_changed_data(instance, validated_data)
-        for attr, (old_value, new_value) in changed_data.items():
-            setattr(instance, attr, new_value)
-        instance.save()
-        print(validated_data)
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
+        details_data = validated_data.pop('details', {})
+        changed_data = self.save_changes(instance, validated_data)
+        if details_data:
+            try:
+                details = instance.details
+            except ProjectDetails.DoesNotExist:
+                details = instance.details = ProjectDetails.objects.create(project=instance)
+            details_changes = self.save_changes(details, details_data)
+            if details_changes and not changed_data:
+                instance.save(update_fields=['updated_at'])  # keeps delta sync aware of the change
+            changed_data.update(details_changes)
+        if changed_data:
+            Activity.objects.create(
                 project=instance,
                 type="update",
                 entity="project",
                 entity_id=instance.id,
-                description=f"Project '{instance.name}' updated with {', '.join(activity_description)}"
+                description=f"Project '{instance.name}' updated with {describe_changes(changed_data)}"
             )
         return instance
 
 
-class RoadmapItemSerializer(serializers.ModelSerializer):
-    roadmapPhaseId = serializers.IntegerField(source='roadmap_phase.id', read_only=True)
-    linkedFeatureId = serializers.IntegerField(source='linked_feature.id', allow_null=True, required=False, read_only=False)
-    linkedBugId = serializers.IntegerField(source='linked_bug.id', allow_null=True, required=False, read_only=False)
-    linkedImprovementId = serializers.IntegerField(source='linked_improvement.id', allow_null=True, required=False, read_only=False)
+class RoadmapItemSerializer(BaseModelSerializer):
+    roadmapPhaseId = serializers.IntegerField(source='roadmap_phase_id', read_only=True)
+    linkedFeatureId = serializers.IntegerField(source='linked_feature_id', allow_null=True, required=False, read_only=False)
+    linkedBugId = serializers.IntegerField(source='linked_bug_id', allow_null=True, required=False, read_only=False)
+    linkedImprovementId = serializers.IntegerField(source='linked_improvement_id', allow_null=True, required=False, read_only=False)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     estimatedWorkTime = serializers.DurationField(source='estimated_work_time', required=False, allow_null=True)
-    deadline = serializers.DateField(source='deadline', required=False, allow_null=True)
+    deadline = serializers.DateField(required=False, allow_null=True)
 
     class Meta:
         model = RoadmapItem
@@ -344,7 +462,23 @@ class RoadmapItemSerializer(serializers.ModelSerializer):
                  'linkedFeatureId', 'linkedBugId', 'linkedImprovementId', 'createdAt', 'updatedAt')
         read_only_fields = ('id', 'createdAt', 'updatedAt', 'roadmapPhaseId')
 
+    @staticmethod
+    def check_links(project_id, data):
+        """Linked backlog entries have to belong to the item's project."""
+        links = {field: data[field] for field in LINK_FIELDS if data.get(field) is not None}
+        if links:
+            errors = link_target_errors([(project_id, links)])[0]
+            if errors:
+                raise serializers.ValidationError(errors)
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            self.check_links(self.instance.roadmap_phase.roadmap.project_id, attrs)
+        return attrs
+
     def create(self, validated_data):
+        # The phase is only known here: views pass it to save().
+        self.check_links(validated_data['roadmap_phase'].roadmap.project_id, validated_data)
         instance = super().create(validated_data)
         Activity.objects.create(
             project=instance.roadmap_phase.roadmap.project,
@@ -356,34 +490,60 @@ class RoadmapItemSerializer(serializers.ModelSerializer):
         return instance
 
     def update(self, instance, validated_data):
-        changed_data = get_changed_data(instance, validated_data)
-        instance = super().update(instance, validated_data)
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
-            project=instance.roadmap_phase.roadmap.project,
-            type="update",
-            entity="roadmap_item",
-            entity_id=instance.id,
-            description=f"Item '{instance.title}' updated: {', '.join(activity_description)}"
-        )
+        changed_data = self.save_changes(instance, validated_data)
+        if changed_data:
+            Activity.objects.create(
+                project=instance.roadmap_phase.roadmap.project,
+                type="update",
+                entity="roadmap_item",
+                entity_id=instance.id,
+                description=f"Item '{instance.title}' updated: {describe_changes(changed_data)}"
+            )
         return instance
 
 
-class RoadmapPhaseSerializer(serializers.ModelSerializer):
-    roadmapId = serializers.IntegerField(source='roadmap.id', read_only=True)
+class RoadmapItemLinkSerializer(serializers.Serializer):
+    """One entry of a bulk link request; null unlinks, a left out field is kept."""
+    itemId = serializers.IntegerField(source='id')
+    linkedFeatureId = serializers.IntegerField(source='linked_feature_id', allow_null=True, required=False)
+    linkedBugId = serializers.IntegerField(source='linked_bug_id', allow_null=True, required=False)
+    linkedImprovementId = serializers.IntegerField(source='linked_improvement_id', allow_null=True, required=False)
+
+
+class RoadmapCloneSerializer(serializers.Serializer):
+    """Options for copying a roadmap; by default into the same project with the same dates."""
+    projectId = serializers.IntegerField(source='project_id', required=False)
+    name = serializers.CharField(max_length=255, required=False)
+    shiftDays = serializers.IntegerField(source='shift_days', default=0, min_value=-36500, max_value=36500)
+    resetStatus = serializers.BooleanField(source='reset_status', default=False)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """One sub-request of /api/batch/; `path` includes any query string."""
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.RegexField(r'^/api/', max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = serializers.ListField(child=BatchRequestSerializer(), allow_empty=False, max_length=BATCH_LIMIT)
+    atomic = serializers.BooleanField(default=False)
+
+
+class RoadmapPhaseSerializer(BaseModelSerializer):
+    roadmapId = serializers.IntegerField(source='roadmap_id', read_only=True)
     items = RoadmapItemSerializer(many=True, read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     targetDate = serializers.DateField(source='target_date', required=False, allow_null=True)
     estimatedWorkTime = serializers.DurationField(source='estimated_work_time', required=False, allow_null=True)
-    deadline = serializers.DateField(source='deadline', required=False, allow_null=True)
+    deadline = serializers.DateField(required=False, allow_null=True)
 
     class Meta:
         model = RoadmapPhase
         fields = ('id', 'roadmapId', 'name', 'order', 'targetDate', 'estimatedWorkTime', 'deadline', 'status', 'items', 'createdAt', 'updatedAt')
         read_only_fields = ('id', 'roadmapId', 'items', 'createdAt', 'updatedAt')
+        field_prefetches = {'items': 'items'}
 
     def create(self, validated_data):
         instance = super().create(validated_data)
@@ -397,23 +557,20 @@ class RoadmapPhaseSerializer(serializers.ModelSerializer):
         return instance
 
     def update(self, instance, validated_data):
-        changed_data = get_changed_data(instance, validated_data)
-        instance = super().update(instance, validated_data)
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
-            project=instance.roadmap.project,
-            type="update",
-            entity="roadmap_phase",
-            entity_id=instance.id,
-            description=f"Phase '{instance.name}' updated: {', '.join(activity_description)}"
-        )
+        changed_data = self.save_changes(instance, validated_data)
+        if changed_data:
+            Activity.objects.create(
+                project=instance.roadmap.project,
+                type="update",
+                entity="roadmap_phase",
+                entity_id=instance.id,
+                description=f"Phase '{instance.name}' updated: {describe_changes(changed_data)}"
+            )
         return instance
 
 
-class RoadmapSerializer(serializers.ModelSerializer):
-    projectId = serializers.IntegerField(source='project.id', read_only=True)
+class RoadmapSerializer(BaseModelSerializer):
+    projectId = serializers.IntegerField(source='project_id', read_only=True)
     phases = RoadmapPhaseSerializer(many=True, read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
@@ -422,6 +579,7 @@ class RoadmapSerializer(serializers.ModelSerializer):
         model = Roadmap
         fields = ('id', 'projectId', 'name', 'description', 'status', 'phases', 'createdAt', 'updatedAt')
         read_only_fields = ('id', 'projectId', 'phases', 'createdAt', 'updatedAt')
+        field_prefetches = {'phases': 'phases__items'}
 
     def create(self, validated_data):
         instance = super().create(validated_data)
@@ -435,16 +593,13 @@ class RoadmapSerializer(serializers.ModelSerializer):
         return instance
 
     def update(self, instance, validated_data):
-        changed_data = get_changed_data(instance, validated_data)
-        instance = super().update(instance, validated_data)
-        activity_description = []
-        for attr, (old_value, new_value) in changed_data.items():
-            activity_description.append(f"Field '{attr}' changed from '{old_value}' to '{new_value}'")
-        Activity.objects.create(
-            project=instance.project,
-            type="update",
-            entity="roadmap",
-            entity_id=instance.id,
-            description=f"Roadmap '{instance.name}' updated: {', '.join(activity_description)}"
-        )
+        changed_data = self.save_changes(instance, validated_data)
+        if changed_data:
+            Activity.objects.create(
+                project=instance.project,
+                type="update",
+                entity="roadmap",
+                entity_id=instance.id,
+                description=f"Roadmap '{instance.name}' updated: {describe_changes(changed_data)}"
+            )
         return instance
@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .events import activity_event, get_broker
+from .models import Activity, Project
+from .utils import bump_data_version
+
+
+@receiver(post_save, sender=Activity)
+def publish_activity(sender, instance, created, **kwargs):
+    """Push new activities to the project owner's event stream once they're committed.
+
+    Every API write logs an Activity, so this is also where per-user cached
+    results (see utils.get_data_version) are invalidated. The callbacks are
+    robust: the write is already committed, so a cache or broker outage only
+    gets logged instead of failing the request.
+    """
+    if not created:
+        return
+    if Activity.project.is_cached(instance):
+        user_id = instance.project.user_id
+    else:
+        # Just the owner; loading the whole project would cost every write a wide row.
+        user_id = Project.all_objects.using(kwargs.get('using')).filter(pk=instance.project_id).values_list(
+            'user_id', flat=True
+        ).first()
+    event = activity_event(instance)
+    using = kwargs.get('using')
+    transaction.on_commit(lambda: bump_data_version(user_id), using=using, robust=True)
+    transaction.on_commit(lambda: get_broker().publish(user_id, event), using=using, robust=True)
+
+
+def publish_activities(activities, using=None):
+    """`publish_activity` for rows saved with bulk_create, which sends no post_save."""
+    project_ids = {activity.project_id for activity in activities}
+    owners = dict(Project.all_objects.using(using).filter(id__in=project_ids).values_list('id', 'user_id'))
+    events = [(owners[activity.project_id], activity_event(activity)) for activity in activities]
+
+    def bump_versions():
+        for user_id in {user_id for user_id, _ in events}:
+            bump_data_version(user_id)
+
+    def publish():
+        broker = get_broker()
+        for user_id, event in events:
+            broker.publish(user_id, event)
+    transaction.on_commit(bump_versions, using=using, robust=True)
+    transaction.on_commit(publish, using=using, robust=True)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    # Deleting a project cascades its Activity rows away, so it can't rely on the handler above.
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_data_version(user_id), using=kwargs.get('using'), robust=True)
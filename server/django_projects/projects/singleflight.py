@@ -0,0 +1,55 @@
+"""Request coalescing: concurrent identical calls share one execution.
+
+Only calls running at the same time in the same process are coalesced; a
+call that starts after the shared one has finished runs on its own, so
+nothing is cached.
+"""
+import threading
+
+
+class InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time and hands its result to the callers that wait for it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, timeout=None):
+        """Return `(fn(), shared)`, with `shared` true when the result came from another caller's call.
+
+        If the shared call raises, or takes more than `timeout` seconds, the
+        waiting callers run `fn` themselves.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = InFlightCall()
+            else:
+                call.waiters += 1
+        if not leader:
+            if call.done.wait(timeout) and not call.failed:
+                return call.result, True
+            return fn(), False
+        try:
+            call.result = fn()
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+# Shared by every view of the process (see viewsets.SingleFlightMixin).
+requests = SingleFlight()
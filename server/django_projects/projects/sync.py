@@ -0,0 +1,137 @@
+"""Delta sync: everything a user's client needs to catch up since its last sync.
+
+A sync walks a fixed list of sources (projects, backlog, roadmaps, then
+delete Activities as tombstones) in `(stamp, id)` order within a time window
+ending when the sync started. Pages stop after SYNC_PAGE_SIZE rows and the
+opaque cursor records where to resume, so one sync may span several requests.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Project, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from .serializers import (
+    ProjectSerializer, FeatureSerializer, BugSerializer, ImprovementSerializer,
+    RoadmapSerializer, RoadmapPhaseSerializer, RoadmapItemSerializer,
+)
+
+SYNC_PAGE_SIZE = 500
+# Rows are stamped before their transaction commits, so a row stamped just
+# before a sync can become visible after it. Each sync re-reads this much of
+# the previous window; clients upsert by id, so repeats are harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+SyncSource = namedtuple('SyncSource', 'key queryset stamp serialize')
+
+
+def serializer(serializer_class, **kwargs):
+    return lambda rows: serializer_class(rows, many=True, **kwargs).data
+
+
+def tombstones(rows):
+    return [{'entity': row.entity, 'id': row.entity_id} for row in rows]
+
+
+def project_tombstones(rows):
+    return [{'entity': 'project', 'id': row.id} for row in rows]
+
+
+def sync_sources(user):
+    """Return the sources a sync walks, in order.
+
+    Nested collections are left out of each record; they sync as their own
+    source. Deleted projects are tombstoned until they are purged; their
+    children just stop syncing.
+    """
+    return [
+        SyncSource('projects', Project.objects.filter(user=user).select_related('details'), 'updated_at',
+                   serializer(ProjectSerializer, exclude=('features', 'bugs', 'improvements'))),
+        SyncSource('features', Feature.live.filter(project__user=user), 'updated_at', serializer(FeatureSerializer)),
+        SyncSource('bugs', Bug.live.filter(project__user=user), 'updated_at', serializer(BugSerializer)),
+        SyncSource('improvements', Improvement.live.filter(project__user=user), 'updated_at',
+                   serializer(ImprovementSerializer)),
+        SyncSource('roadmaps', Roadmap.live.filter(project__user=user), 'updated_at',
+                   serializer(RoadmapSerializer, exclude=('phases',))),
+        SyncSource('roadmapPhases', RoadmapPhase.live.filter(roadmap__project__user=user), 'updated_at',
+                   serializer(RoadmapPhaseSerializer, exclude=('items',))),
+        SyncSource('roadmapItems', RoadmapItem.live.filter(roadmap_phase__roadmap__project__user=user), 'updated_at',
+                   serializer(RoadmapItemSerializer)),
+        SyncSource('deleted', Activity.live.filter(project__user=user, type='delete').only('entity', 'entity_id', 'created_at'),
+                   'created_at', tombstones),
+        SyncSource('deleted', Project.all_objects.filter(user=user, deleted_at__isnull=False).only('id', 'deleted_at'),
+                   'deleted_at', project_tombstones),
+    ]
+
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the cursor's state dict; an empty cursor starts a full sync."""
+    if not cursor:
+        return {}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        for key in ('since', 'until'):
+            if key in state:
+                datetime.fromisoformat(state[key])
+        if 'after' in state:
+            datetime.fromisoformat(state['after'][0])
+            int(state['after'][1])
+        return state
+    except (binascii.Error, ValueError, TypeError, KeyError, IndexError, UnicodeDecodeError):
+        raise ValidationError({'since': ['Invalid sync cursor.']})
+
+
+def sync_page(user, cursor, page_size=SYNC_PAGE_SIZE):
+    """Return one page of changes for `user` after the position in `cursor`.
+
+    `hasMore` tells the client to request again with `cursor`. On the last
+    page `cursor` is the one to store for the next sync, and `projectIds`
+    lists every project the user still has (a purged project leaves no
+    tombstone).
+    """
+    state = decode_cursor(cursor)
+    since = datetime.fromisoformat(state['since']) if 'since' in state else None
+    until = datetime.fromisoformat(state['until']) if 'until' in state else timezone.now()
+    position = state.get('source', 0)
+    after = state.get('after')
+
+    sources = sync_sources(user)
+    data = {source.key: [] for source in sources}
+    remaining = page_size
+    for index in range(position, len(sources)):
+        source = sources[index]
+        queryset = source.queryset.filter(**{f'{source.stamp}__lte': until})
+        if since is not None:
+            queryset = queryset.filter(**{f'{source.stamp}__gt': since - SYNC_OVERLAP})
+        if after and index == position:
+            stamp = datetime.fromisoformat(after[0])
+            queryset = queryset.filter(Q(**{f'{source.stamp}__gt': stamp}) | Q(**{source.stamp: stamp, 'id__gt': after[1]}))
+        rows = list(queryset.order_by(source.stamp, 'id')[:remaining + 1])
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            data[source.key] += source.serialize(rows)
+            next_state = {'until': until.isoformat(), 'source': index}
+            if rows:
+                next_state['after'] = [getattr(rows[-1], source.stamp).isoformat(), rows[-1].id]
+            if since is not None:
+                next_state['since'] = since.isoformat()
+            data.update(cursor=encode_cursor(next_state), hasMore=True)
+            return data
+        data[source.key] += source.serialize(rows)
+        remaining -= len(rows)
+
+    data.update(
+        cursor=encode_cursor({'since': until.isoformat()}),
+        hasMore=False,
+        projectIds=list(Project.objects.filter(user=user).order_by('id').values_list('id', flat=True)),
+    )
+    return data
@@ -1,22 +1,58 @@
-from django.test import TestCase
+import gzip
+from importlib import import_module
+import io
+from asgiref.sync import async_to_sync, sync_to_async
+import json
+import threading
+import uuid
+from urllib.parse import urlencode
+from unittest import skipUnless
+from unittest.mock import patch
+from decimal import Decimal
+from time import sleep
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.test import AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from .models import Project, Feature, Bug, Improvement, RoadmapPhase, RoadmapItem
-from datetime import timedelta, date
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from . import async_views, batch, events, metrics, singleflight, views
+from .archive import export_archive
+from .db_routers import ReplicaRouter, replica_aliases
+from .middleware import ReplicaRoutingMiddleware
+from .models import CustomUser, Project, ProjectDetails, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from .paginators import EstimatedCountPaginator
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+from .serializers import FeatureSerializer
+from .singleflight import SingleFlight
+from .sync import sync_page
+from .utils import get_data_version
+from .viewsets import ProjectViewSet
+from datetime import timedelta, date, datetime, time, timezone as dt_timezone
 
 class ProjectModelTest(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(username='testuser', password='testpass')
 
-    def test_project_creation_with_status_and_deployment_plan(self):
+    def test_project_creation_with_status_and_development_notes(self):
         project = Project.objects.create(
             user=self.user,
             name='Test POC Project',
             description='A test project',
             status='POC',
-            deployment_plan='Deploy to Heroku'
         )
+        ProjectDetails.objects.create(project=project, development_notes='Deploy to Heroku')
+        project.refresh_from_db()
         self.assertEqual(project.status, 'POC')
-        self.assertEqual(project.deployment_plan, 'Deploy to Heroku')
+        self.assertEqual(project.details.development_notes, 'Deploy to Heroku')
 
     def test_project_default_status(self):
         project = Project.objects.create(
@@ -30,7 +66,8 @@ class BacklogAndPhaseFieldsTest(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(username='backloguser', password='testpass')
         self.project = Project.objects.create(user=self.user, name='Backlog Project')
-        self.phase = RoadmapPhase.objects.create(roadmap=None, name='Phase 1', order=1)
+        self.roadmap = Roadmap.objects.create(project=self.project, name='Backlog Roadmap')
+        self.phase = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Phase 1', order=1)
 
     def test_feature_fields(self):
         feature = Feature.objects.create(
@@ -70,7 +107,7 @@ class BacklogAndPhaseFieldsTest(TestCase):
 
     def test_roadmap_phase_fields(self):
         phase = RoadmapPhase.objects.create(
-            roadmap=None,
+            roadmap=self.roadmap,
             name='Phase 2',
             order=2,
             estimated_work_time=timedelta(hours=8),
@@ -80,7 +117,7 @@ class BacklogAndPhaseFieldsTest(TestCase):
         self.assertEqual(phase.deadline, date(2026, 4, 20))
 
     def test_roadmap_item_fields(self):
-        phase = RoadmapPhase.objects.create(roadmap=None, name='Phase 3', order=3)
+        phase = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Phase 3', order=3)
         item = RoadmapItem.objects.create(
             roadmap_phase=phase,
             title='Item 1',
@@ -88,4 +125,1644 @@ class BacklogAndPhaseFieldsTest(TestCase):
             deadline=date(2026, 4, 25)
         )
         self.assertEqual(item.estimated_work_time, timedelta(hours=4))
-        self.assertEqual(item.deadline, date(2026, 4, 25))
\ No newline at end of file
+        self.assertEqual(item.deadline, date(2026, 4, 25))
+
+class ORJSONRendererParityTest(SimpleTestCase):
+    """ORJSONRenderer must produce exactly what DRF's JSONRenderer does."""
+
+    def assertSameRender(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        actual = ORJSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(actual, expected)
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_scalar_types(self):
+        self.assertSameRender({
+            'int': 1, 'float': 1.5, 'bool': True, 'null': None, 'str': 'héllo ✓',
+            'list': [1, 'a', None], 'nested': {'a': {'b': [1, 2]}},
+        })
+
+    def test_dates_and_times(self):
+        self.assertSameRender({
+            'utc': datetime(2026, 3, 1, 12, 30, tzinfo=dt_timezone.utc),
+            'utc_micro': datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2026, 3, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=2))),
+            'naive': datetime(2026, 3, 1, 12, 30),
+            'date': date(2026, 4, 10),
+            'time': time(9, 15),
+        })
+
+    def test_timedelta_decimal_uuid(self):
+        self.assertSameRender({
+            'estimatedWorkTime': timedelta(hours=5, minutes=30),
+            'negative': timedelta(days=-1, seconds=5),
+            'decimal': Decimal('12.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        })
+
+    def test_lazy_strings_and_line_separators(self):
+        self.assertSameRender({'lazy': gettext_lazy('Pending'), 'js': 'a\u2028b\u2029c'})
+
+    def test_indented_output(self):
+        self.assertSameRender({'a': [1, 2], 'b': {'c': None}}, 'application/json; indent=4')
+
+    def test_serializer_output(self):
+        project = Project(id=7, name='Parity')
+        features = [
+            Feature(
+                id=i, project=project, description=f'Feature {i}', tags='["a"]',
+                estimated_work_time=timedelta(hours=i), priority='high', deadline=date(2026, 4, 10),
+                created_at=datetime(2026, 3, 1, 12, i, tzinfo=dt_timezone.utc),
+            )
+            for i in range(3)
+        ]
+        self.assertSameRender(FeatureSerializer(features, many=True).data)
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def test_parses_utf8(self):
+        data = ORJSONParser().parse(io.BytesIO('{"name": "héllo", "ids": [1, 2]}'.encode()))
+        self.assertEqual(data, {'name': 'héllo', 'ids': [1, 2]})
+
+    def test_parses_other_charsets(self):
+        stream = io.BytesIO('{"name": "héllo"}'.encode('latin-1'))
+        data = ORJSONParser().parse(stream, parser_context={'encoding': 'latin-1'})
+        self.assertEqual(data, {'name': 'héllo'})
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
+
+
+class StreamingListViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='streamuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Streaming Project')
+        self.features = [
+            Feature.objects.create(project=self.project, description=f'Feature {i}', estimated_work_time=timedelta(hours=i))
+            for i in range(5)
+        ]
+        self.factory = RequestFactory()
+
+    def get(self, view, **params):
+        request = self.factory.get('/', params)
+        request.session = {'claims': {'sub': self.user.id}}
+        return view(request, self.project.id)
+
+    def read(self, response):
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_streams_same_rows_as_json_response(self):
+        response = self.get(views.feature_list)
+        self.assertTrue(response.streaming)
+        expected = json.loads(JsonResponse(list(Feature.objects.filter(project=self.project).order_by('id').values()), safe=False).content)
+        self.assertEqual(self.read(response), expected)
+
+    def test_limit_and_cursor(self):
+        first = self.read(self.get(views.feature_list, limit=2))
+        self.assertEqual([row['id'] for row in first], [f.id for f in self.features[:2]])
+        rest = self.read(self.get(views.feature_list, cursor=first[-1]['id']))
+        self.assertEqual([row['id'] for row in rest], [f.id for f in self.features[2:]])
+
+    def test_empty_list(self):
+        self.assertEqual(self.read(self.get(views.bug_list)), [])
+
+    def test_invalid_limit(self):
+        self.assertEqual(self.get(views.activity_list, limit='abc').status_code, 400)
+
+    async def test_streams_asynchronously_under_asgi(self):
+        request = AsyncRequestFactory().get('/', {'limit': 3})
+        request.session = {'claims': {'sub': self.user.id}}
+        response = await sync_to_async(views.feature_list)(request, self.project.id)
+        self.assertTrue(response.is_async)
+        rows = json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+        self.assertEqual([row['id'] for row in rows], [f.id for f in self.features[:3]])
+
+
+class AsyncReadViewTest(TestCase):
+    """The async endpoints must answer exactly like their DRF counterparts."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='asyncuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Async Project', repo_link=['https://example.com'])
+        Feature.objects.create(project=self.project, description='Feature', estimated_work_time=timedelta(hours=2))
+        Bug.objects.create(project=self.project, description='Bug')
+        self.roadmap = Roadmap.objects.create(project=self.project, name='Roadmap')
+        phase = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Phase', order=1)
+        RoadmapItem.objects.create(roadmap_phase=phase, title='Item', deadline=date(2026, 5, 1))
+        Activity.objects.create(project=self.project, type='create', entity='project', entity_id=self.project.id, description='created')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+    def assertSameResponse(self, sync_path, async_path):
+        expected = self.client.get(sync_path)
+        actual = self.client.get(async_path)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.json(), expected.json())
+
+    def test_project_list(self):
+        self.assertSameResponse('/api/projects/', '/api/async/projects/')
+
+    def test_project_detail(self):
+        self.assertSameResponse(f'/api/projects/{self.project.id}/', f'/api/async/projects/{self.project.id}/')
+
+    def test_activity_list(self):
+        self.assertSameResponse('/api/activities/', '/api/async/activities/')
+
+    def test_roadmap_detail(self):
+        self.assertSameResponse(f'/api/roadmaps/{self.roadmap.id}/', f'/api/async/roadmaps/{self.roadmap.id}/')
+
+    def test_user_me(self):
+        self.assertSameResponse('/api/users/me/', '/api/async/users/me/')
+
+    def test_fieldsets_and_pages(self):
+        self.assertSameResponse('/api/projects/?fields=id,name', '/api/async/projects/?fields=id,name')
+        self.assertSameResponse(f'/api/projects/{self.project.id}/?exclude=features',
+                                f'/api/async/projects/{self.project.id}/?exclude=features')
+        self.assertSameResponse('/api/projects/?fields=secret', '/api/async/projects/?fields=secret')
+        self.assertSameResponse('/api/activities/?page=2', '/api/async/activities/?page=2')
+
+    async def test_served_asynchronously(self):
+        response = await self.async_client.get('/api/async/projects/?fields=id,name',
+                                               headers={'Authorization': self.client.defaults['HTTP_AUTHORIZATION']})
+        self.assertEqual(response.json()['results'], [{'id': self.project.id, 'name': 'Async Project'}])
+
+    def test_requires_authentication(self):
+        del self.client.defaults['HTTP_AUTHORIZATION']
+        self.assertEqual(self.client.get('/api/async/projects/').status_code, 401)
+
+    def test_other_users_project_not_found(self):
+        other = get_user_model().objects.create_user(username='other', password='testpass')
+        project = Project.objects.create(user=other, name='Hidden')
+        self.assertEqual(self.client.get(f'/api/async/projects/{project.id}/').status_code, 404)
+
+
+class MetricsEndpointTest(TestCase):
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE db_pool_connections_in_use gauge', response.content.decode())
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_hidden_without_token_in_production(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+    def test_pool_metrics_format(self):
+        stats = {'default': {'pool_size': 5, 'pool_available': 2, 'requests_num': 10, 'requests_wait_ms': 1500}}
+        with patch('projects.metrics.pool_stats', return_value=stats):
+            lines = metrics.render_pool_metrics()
+        self.assertIn('db_pool_connections_in_use{alias="default"} 3', lines)
+        self.assertIn('db_pool_checkout_wait_seconds_total{alias="default"} 1.5', lines)
+        self.assertIn('db_pool_requests_errors_total{alias="default"} 0', lines)
+
+
+@override_settings(REPLICA_PIN_SECONDS=30)
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.token = f'Bearer {AccessToken.for_user(CustomUser(id=42))}'
+        patcher = patch('projects.db_routers.replica_aliases', return_value=['replica_0'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+
+    def request(self, method, path='/api/projects/', **headers):
+        seen = {}
+
+        def view(request):
+            seen['read'] = self.router.db_for_read(Project)
+            seen['write'] = self.router.db_for_write(Project)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        middleware(getattr(self.factory, method)(path, **headers))
+        return seen
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.request('get'), {'read': 'replica_0', 'write': 'default'})
+
+    def test_unsafe_requests_use_primary(self):
+        self.assertEqual(self.request('post')['read'], 'default')
+
+    def test_reads_pinned_to_primary_after_write(self):
+        self.request('patch', HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(self.request('get', HTTP_AUTHORIZATION=self.token)['read'], 'default')
+        # Other users are unaffected.
+        self.assertEqual(self.request('get')['read'], 'replica_0')
+
+    def test_pin_expires(self):
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            self.request('patch', HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(self.request('get', HTTP_AUTHORIZATION=self.token)['read'], 'replica_0')
+
+    def test_non_api_paths_use_primary(self):
+        self.assertEqual(self.request('get', path='/admin/')['read'], 'default')
+
+    def test_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Project), 'default')
+        self.assertTrue(self.router.allow_migrate('default', 'projects'))
+        self.assertFalse(self.router.allow_migrate('replica_0', 'projects'))
+
+
+@skipUnless(replica_aliases(), 'set DATABASE_REPLICA_URLS (it may equal DATABASE_URL) to run')
+class ReplicaIntegrationTest(TransactionTestCase):
+    """Run with e.g. DATABASE_REPLICA_URLS=$DATABASE_URL manage.py test projects.tests.ReplicaIntegrationTest"""
+    databases = '__all__'
+
+    @classmethod
+    def tearDownClass(cls):
+        # Mirrors aren't torn down by the runner; release their pooled connections
+        # so the test database can be dropped.
+        for alias in replica_aliases():
+            connections[alias].close_pool()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='replicauser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Replica Project')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+        self.replica = replica_aliases()[0]
+        self.addCleanup(cache.clear)
+
+    def test_reads_go_to_replica_until_user_writes(self):
+        with patch('projects.db_routers.choose_replica', return_value=self.replica), \
+                CaptureQueriesContext(connections[self.replica]) as replica_queries:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.json()['count'], 1)
+        self.assertTrue(replica_queries.captured_queries)
+
+        self.client.patch(f'/api/projects/{self.project.id}/', {'name': 'Renamed'}, content_type='application/json')
+        with CaptureQueriesContext(connections[self.replica]) as replica_queries:
+            response = self.client.get(f'/api/projects/{self.project.id}/')
+        self.assertEqual(response.json()['name'], 'Renamed')
+        self.assertFalse(replica_queries.captured_queries)
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='metricsuser', password='testpass')
+        project = Project.objects.create(user=self.user, name='Metrics Project')
+        Feature.objects.create(project=project, description='Feature')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def series(self, histogram, route, method='GET'):
+        return histogram.series.get((('route', route), ('method', method)))
+
+    def test_records_route_metrics(self):
+        before = (self.series(metrics.DB_QUERIES, 'project-list') or [0])[-1]
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+
+        queries = self.series(metrics.DB_QUERIES, 'project-list')
+        self.assertGreater(queries[-1] - before, 0)
+        self.assertIsNotNone(self.series(metrics.SERIALIZER_TIME, 'project-list'))
+        self.assertIsNotNone(self.series(metrics.RESPONSE_SIZE, 'project-list'))
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="project-list",method="GET",le="+Inf"}',
+            metrics.render_metrics(),
+        )
+
+    def test_action_routes_are_labelled(self):
+        feature = Feature.objects.get()
+        self.client.put(f'/api/features/{feature.id}/update-status/', {'status': 'completed'}, content_type='application/json')
+        self.assertIsNotNone(self.series(metrics.REQUEST_LATENCY, 'feature-update-status', 'PUT'))
+
+    def test_nested_serializers_counted_once(self):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request_metrics.set(request_metrics)
+        try:
+            with metrics.serializer_timer():
+                with metrics.serializer_timer():
+                    pass
+                self.assertEqual(request_metrics.serializer_time, 0)
+        finally:
+            metrics.current_request_metrics.reset(token)
+        self.assertGreater(request_metrics.serializer_time, 0)
+
+
+class BenchmarkCommandsTest(TestCase):
+    def test_generate_and_benchmark(self):
+        call_command(
+            'generate_fake_data', users=1, projects=1, backlog=3, roadmaps=1, phases=2, items=2, activities=5,
+            prefix='benchtest', stdout=io.StringIO(),
+        )
+        self.assertEqual(Feature.objects.filter(project__user__username='benchtest0').count(), 3)
+
+        out = io.StringIO()
+        call_command('run_benchmark', username='benchtest0', repeat=1, only='feature', stdout=out)
+        self.assertIn('GET feature-list', out.getvalue())
+        self.assertIn('PUT feature-update-status', out.getvalue())
+        # Writes are rolled back.
+        self.assertEqual(Feature.objects.filter(project__user__username='benchtest0').count(), 3)
+
+
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='sparseuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Sparse Project')
+        ProjectDetails.objects.create(project=self.project, frontend_details='x' * 1000, development_notes='notes')
+        Feature.objects.create(project=self.project, description='Feature', tags='["api"]')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def get(self, url):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(url)
+        return response, ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_fields_limit_response_and_columns(self):
+        response, sql = self.get('/api/projects/?fields=id,name')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'id': self.project.id, 'name': 'Sparse Project'}])
+        self.assertNotIn('frontend_details', sql)
+        self.assertNotIn('projects_feature', sql)
+
+    def test_exclude_keeps_other_fields(self):
+        response, sql = self.get(f'/api/projects/{self.project.id}/?exclude=frontendDetails,bugs,improvements')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertNotIn('frontendDetails', data)
+        self.assertNotIn('bugs', data)
+        self.assertEqual(data['development_notes'], 'notes')
+        self.assertEqual(len(data['features']), 1)
+        self.assertNotIn('frontend_details', sql)
+        self.assertNotIn('projects_bug', sql)
+
+    def test_method_field_columns_are_loaded(self):
+        response, sql = self.get('/api/features/?fields=id,tags')
+        self.assertEqual(response.json()['results'][0], {'id': Feature.objects.get().id, 'tags': ['api']})
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/projects/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['fields'][0])
+
+    def test_extra_actions_use_their_own_serializer(self):
+        Activity.objects.create(project=self.project, type='create', entity='project', description='created')
+        response, sql = self.get(f'/api/projects/{self.project.id}/activities/?fields=type')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'type': 'create'}])
+        self.assertNotIn('projects_feature', sql)  # the project is only looked up
+        self.assertNotIn('"projects_activity"."description"', sql)
+        # Actions that render no serializer ignore fieldsets instead of checking the viewset's.
+        roadmap = Roadmap.objects.create(project=self.project, name='Roadmap')
+        self.assertEqual(self.client.get(f'/api/roadmaps/{roadmap.id}/schedule/?fields=type').status_code, 200)
+
+    def test_writes_ignore_fieldsets(self):
+        response = self.client.patch(
+            f'/api/projects/{self.project.id}/?fields=id', {'name': 'Renamed'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Renamed')
+
+
+class ProjectDetailsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='detailsuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Details Project')
+        ProjectDetails.objects.create(project=self.project, env_details='DEBUG=1', development_notes='notes')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def test_list_leaves_details_out(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get('/api/projects/')
+        result = response.json()['results'][0]
+        self.assertNotIn('envDetails', result)
+        self.assertNotIn('development_notes', result)
+        self.assertIn('setupSteps', result)
+        self.assertFalse(any('projectdetails' in query['sql'] for query in queries.captured_queries))
+
+    def test_list_returns_details_when_requested(self):
+        response = self.client.get('/api/projects/?fields=id,envDetails')
+        self.assertEqual(response.json()['results'], [{'id': self.project.id, 'envDetails': 'DEBUG=1'}])
+
+    def test_detail_has_same_shape(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(f'/api/projects/{self.project.id}/')
+        data = response.json()
+        self.assertEqual(data['envDetails'], 'DEBUG=1')
+        self.assertEqual(data['development_notes'], 'notes')
+        self.assertIsNone(data['authDetails'])
+        # Token user, project and details in one query, and the three backlog prefetches.
+        self.assertEqual(len(queries), 5)
+
+    def test_create_and_update_details(self):
+        response = self.client.post(
+            '/api/projects/', {'name': 'New', 'authDetails': 'OAuth'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        project = Project.objects.get(pk=response.json()['id'])
+        self.assertEqual(project.details.auth_details, 'OAuth')
+
+        response = self.client.patch(
+            f'/api/projects/{project.id}/', {'authDetails': 'SAML', 'name': 'Renamed'}, content_type='application/json'
+        )
+        self.assertEqual(response.json()['authDetails'], 'SAML')
+        project.refresh_from_db()
+        self.assertEqual((project.name, project.details.auth_details), ('Renamed', 'SAML'))
+        self.assertIn("Field 'auth_details' changed from 'OAuth' to 'SAML'", Activity.objects.latest('id').description)
+
+    def test_update_creates_missing_details(self):
+        project = Project.objects.create(user=self.user, name='No details')
+        response = self.client.patch(f'/api/projects/{project.id}/', {'envDetails': 'X=1'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ProjectDetails.objects.get(project=project).env_details, 'X=1')
+
+
+class ChangedColumnsUpdateTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='updateuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Update Project')
+        self.feature = Feature.objects.create(project=self.project, description='Feature', priority='low')
+        self.roadmap = Roadmap.objects.create(project=self.project, name='Roadmap')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def patch(self, url, data):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.patch(url, data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+
+    def test_noop_update_skips_write_and_activity(self):
+        activities = Activity.objects.count()
+        updates = self.patch(f'/api/features/{self.feature.id}/', {'description': 'Feature', 'priority': 'low'})
+        self.assertEqual(updates, [])
+        self.assertEqual(Activity.objects.count(), activities)
+
+        updates = self.patch(f'/api/projects/{self.project.id}/', {'name': 'Update Project'})
+        self.assertEqual(updates, [])
+        self.assertEqual(Activity.objects.count(), activities)
+
+    def test_update_writes_changed_columns_only(self):
+        updates = self.patch(f'/api/features/{self.feature.id}/', {'description': 'Feature', 'priority': 'high'})
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"priority"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+        self.assertNotIn('"tags"', updates[0])
+        self.assertEqual(Activity.objects.latest('id').description,
+                         "Feature 'Feature' updated with Field 'priority' changed from 'low' to 'high'")
+
+    def test_auto_now_columns_are_kept_current(self):
+        before = self.roadmap.updated_at
+        updates = self.patch(f'/api/roadmaps/{self.roadmap.id}/', {'status': 'active'})
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"name"', updates[0])
+        self.roadmap.refresh_from_db()
+        self.assertGreater(self.roadmap.updated_at, before)
+
+    def test_status_action_noop(self):
+        activities = Activity.objects.count()
+        response = self.client.put(
+            f'/api/features/{self.feature.id}/update-status/', {'status': 'pending'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Activity.objects.count(), activities)
+
+
+class DeltaSyncTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='syncuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Sync Project')
+        self.features = [Feature.objects.create(project=self.project, description=f'Feature {i}') for i in range(3)]
+        self.bug = Bug.objects.create(project=self.project, description='Bug')
+        roadmap = Roadmap.objects.create(project=self.project, name='Roadmap')
+        phase = RoadmapPhase.objects.create(roadmap=roadmap, name='Phase', order=1)
+        RoadmapItem.objects.create(roadmap_phase=phase, title='Item')
+        other = get_user_model().objects.create_user(username='othersync', password='testpass')
+        Feature.objects.create(project=Project.objects.create(user=other, name='Other'), description='Hidden')
+        # Pretend everything was written an hour ago.
+        an_hour_ago = datetime.now(dt_timezone.utc) - timedelta(hours=1)
+        for model in (Project, Feature, Bug, Roadmap, RoadmapPhase, RoadmapItem):
+            model.objects.update(updated_at=an_hour_ago)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def sync(self, cursor=''):
+        response = self.client.get('/api/sync/', {'since': cursor})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_then_delta_sync(self):
+        full = self.sync()
+        self.assertFalse(full['hasMore'])
+        self.assertEqual([p['id'] for p in full['projects']], [self.project.id])
+        self.assertNotIn('features', full['projects'][0])
+        self.assertEqual(len(full['features']), 3)
+        self.assertEqual((len(full['bugs']), len(full['roadmapPhases']), len(full['roadmapItems'])), (1, 1, 1))
+        self.assertNotIn('items', full['roadmapPhases'][0])
+        self.assertEqual(full['projectIds'], [self.project.id])
+
+        empty = self.sync(full['cursor'])
+        self.assertEqual(sum(len(empty[key]) for key in ('projects', 'features', 'bugs', 'deleted')), 0)
+
+        self.client.patch(f'/api/features/{self.features[1].id}/', {'priority': 'high'}, content_type='application/json')
+        self.client.delete(f'/api/bugs/{self.bug.id}/')
+        delta = self.sync(empty['cursor'])
+        self.assertEqual([f['id'] for f in delta['features']], [self.features[1].id])
+        self.assertEqual(delta['features'][0]['priority'], 'high')
+        self.assertEqual(delta['deleted'], [{'entity': 'bug', 'id': self.bug.id}])
+        self.assertEqual(delta['projects'], [])
+
+    def test_deleting_a_linked_feature_resends_the_item(self):
+        item = RoadmapItem.objects.get(title='Item')
+        RoadmapItem.objects.filter(id=item.id).update(linked_feature=self.features[0])  # keeps the old updated_at
+        cursor = self.sync()['cursor']
+        self.assertEqual(self.client.delete(f'/api/features/{self.features[0].id}/').status_code, 204)
+        delta = self.sync(cursor)
+        self.assertEqual([(i['id'], i['linkedFeatureId']) for i in delta['roadmapItems']], [(item.id, None)])
+        self.assertEqual(delta['deleted'], [{'entity': 'feature', 'id': self.features[0].id}])
+
+    def test_details_change_marks_project(self):
+        cursor = self.sync()['cursor']
+        self.client.patch(f'/api/projects/{self.project.id}/', {'envDetails': 'X=1'}, content_type='application/json')
+        delta = self.sync(cursor)
+        self.assertEqual(delta['projects'][0]['envDetails'], 'X=1')
+
+    def test_pages_cover_every_row_once(self):
+        seen, cursor, pages = [], '', 0
+        while True:
+            page = sync_page(self.user, cursor, page_size=2)
+            pages += 1
+            seen += [(key, row['id']) for key in ('projects', 'features', 'bugs', 'roadmaps', 'roadmapPhases', 'roadmapItems')
+                     for row in page[key]]
+            cursor = page['cursor']
+            if not page['hasMore']:
+                break
+        self.assertEqual(len(seen), 8)
+        self.assertEqual(len(set(seen)), 8)
+        self.assertGreaterEqual(pages, 4)
+        self.assertIn('projectIds', page)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/sync/', {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ChangeEventsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='eventsuser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Events Project')
+        self.token = str(AccessToken.for_user(self.user))
+        self.broker = events.InMemoryBroker()
+        patcher = patch.object(events, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_committed_activity_is_published(self):
+        published = []
+        self.broker.publish = lambda user_id, event: published.append((user_id, event))
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = Activity.objects.create(project=self.project, type='create', entity='project',
+                                               entity_id=self.project.id, description='created')
+        self.assertEqual(published, [(self.user.id, events.activity_event(activity))])
+        self.assertEqual(published[0][1]['projectId'], self.project.id)
+
+    def test_publishing_looks_up_only_the_owner(self):
+        published = []
+        self.broker.publish = lambda user_id, event: published.append(user_id)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connections['default']) as queries:
+            Activity.objects.create(project=self.project, type='create', entity='project', description='cached')
+        self.assertEqual(len(queries), 1)  # the INSERT; the project instance gives the owner
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connections['default']) as queries:
+            Activity.objects.create(project_id=self.project.id, type='create', entity='project', description='by id')
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[1]['sql'].startswith('SELECT "projects_project"."user_id" AS "user_id" FROM'))
+        self.assertEqual(published, [self.user.id, self.user.id])
+
+    async def test_stream_response(self):
+        request = AsyncRequestFactory().get('/api/events/', {'token': self.token})
+        response = await async_views.events(request)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue((await anext(aiter(response.streaming_content))).startswith(b'retry:'))
+
+    async def test_stream_delivers_events(self):
+        stream = async_views.event_stream(self.user.id)
+        self.assertTrue((await anext(stream)).startswith('retry:'))
+
+        event = {'id': 7, 'type': 'update', 'entity': 'feature', 'entityId': 3, 'projectId': self.project.id,
+                 'createdAt': '2026-01-01T00:00:00+00:00'}
+        self.broker.publish(self.user.id, event)
+        chunk = await anext(stream)
+        self.assertTrue(chunk.startswith('id: 7\nevent: change\ndata: '))
+        self.assertEqual(json.loads(chunk.split('data: ', 1)[1]), event)
+
+        await stream.aclose()
+        self.assertEqual(self.broker.subscribers, {})
+
+    async def test_stream_replays_after_last_event_id(self):
+        first = await Activity.objects.acreate(project=self.project, type='create', entity='project', description='a')
+        second = await Activity.objects.acreate(project=self.project, type='update', entity='project', description='b')
+        request = AsyncRequestFactory().get(
+            '/api/events/', headers={'Authorization': f'Bearer {self.token}', 'Last-Event-ID': str(first.id)}
+        )
+        stream = aiter((await async_views.events(request)).streaming_content)
+        await anext(stream)
+        self.assertIn(f'id: {second.id}\n', (await anext(stream)).decode())
+        await stream.aclose()
+
+    async def test_stream_requires_token(self):
+        response = await async_views.events(AsyncRequestFactory().get('/api/events/', {'token': 'bad'}))
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_needs_asgi(self):
+        request = RequestFactory().get('/api/events/', {'token': self.token})
+        self.assertEqual(async_to_sync(async_views.events)(request).status_code, 501)
+
+
+class ChangeEventsOutageTest(TransactionTestCase):
+    """Writes are committed before the events go out, so an outage must not fail them."""
+
+    def test_write_succeeds_when_broker_and_cache_fail(self):
+        user = get_user_model().objects.create_user(username='outage', password='testpass')
+        project = Project.objects.create(user=user, name='Outage')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(user)}'
+        with patch.object(events, '_broker', events.InMemoryBroker()), \
+                patch.object(events.InMemoryBroker, 'publish', side_effect=ConnectionError('broker down')), \
+                patch('projects.signals.bump_data_version', side_effect=ConnectionError('cache down')), \
+                self.assertLogs('django.db.backends.base', 'ERROR') as logs:
+            response = self.client.post('/api/features/', {'projectId': project.id, 'description': 'Saved'},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Feature.objects.filter(project=project, description='Saved').exists())
+        self.assertEqual(len(logs.records), 2)  # the version bump and the publish, each logged
+
+
+class WorkloadAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='workloaduser', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Workload Project')
+        monday = date(2026, 3, 2)
+        Feature.objects.create(project=self.project, description='a', priority='high',
+                               estimated_work_time=timedelta(hours=2), deadline=monday + timedelta(days=2))
+        Feature.objects.create(project=self.project, description='b', priority='high',
+                               estimated_work_time=timedelta(hours=3), deadline=monday + timedelta(days=4))
+        Bug.objects.create(project=self.project, description='c', status='open')
+        phase = RoadmapPhase.objects.create(roadmap=Roadmap.objects.create(project=self.project, name='R'), name='P', order=1)
+        RoadmapItem.objects.create(roadmap_phase=phase, title='i', priority='low',
+                                   estimated_work_time=timedelta(hours=1), deadline=monday)
+        other = get_user_model().objects.create_user(username='otherworkload', password='testpass')
+        Feature.objects.create(project=Project.objects.create(user=other, name='Other'), description='x',
+                               estimated_work_time=timedelta(hours=50))
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def test_buckets(self):
+        buckets = self.client.get('/api/analytics/workload/').json()['buckets']
+        self.assertEqual(buckets, [
+            {'kind': 'feature', 'priority': 'high', 'status': 'pending', 'week': '2026-03-02', 'count': 2,
+             'estimatedSeconds': 5 * 3600},
+            {'kind': 'roadmap_item', 'priority': 'low', 'status': 'planned', 'week': '2026-03-02', 'count': 1,
+             'estimatedSeconds': 3600},
+            {'kind': 'bug', 'priority': None, 'status': 'open', 'week': None, 'count': 1, 'estimatedSeconds': 0},
+        ])
+
+    def test_cached_until_next_write(self):
+        self.client.get('/api/analytics/workload/')
+        with CaptureQueriesContext(connections['default']) as queries:
+            self.client.get('/api/analytics/workload/')
+        self.assertEqual(len(queries), 1)  # just the token user
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/bugs/', {'projectId': self.project.id, 'description': 'd'}, content_type='application/json')
+        buckets = self.client.get('/api/analytics/workload/').json()['buckets']
+        self.assertEqual(buckets[-1]['count'], 2)
+
+
+class RoadmapScheduleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='scheduser', password='testpass')
+        project = Project.objects.create(user=self.user, name='Schedule Project')
+        self.roadmap = Roadmap.objects.create(project=project, name='Roadmap')
+        self.design = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Design', order=1,
+                                                  deadline=date(2026, 3, 6))
+        self.build = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Build', order=2,
+                                                 estimated_work_time=timedelta(hours=40), target_date=date(2026, 3, 10))
+        self.wireframes = RoadmapItem.objects.create(roadmap_phase=self.design, title='Wireframes', priority='low',
+                                                     estimated_work_time=timedelta(hours=16))
+        self.spec = RoadmapItem.objects.create(roadmap_phase=self.design, title='Spec', priority='high',
+                                               estimated_work_time=timedelta(hours=8), deadline=date(2026, 3, 2))
+        RoadmapItem.objects.create(roadmap_phase=self.design, title='Done', status='completed',
+                                   estimated_work_time=timedelta(hours=100))
+        RoadmapItem.objects.create(roadmap_phase=self.design, title='Unknown')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def schedule(self, **params):
+        response = self.client.get(f'/api/roadmaps/{self.roadmap.id}/schedule/', {'start': '2026-03-02', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_projection(self):
+        data = self.schedule()  # 40h/week = 8h a day from Monday 2 March
+        design, build = data['phases']
+        self.assertEqual([item['title'] for item in design['items']], ['Spec', 'Wireframes', 'Unknown'])
+        self.assertEqual((design['items'][0]['start'], design['items'][0]['finish']), ('2026-03-02', '2026-03-02'))
+        self.assertEqual(design['items'][1]['finish'], '2026-03-04')
+        self.assertEqual((design['remainingHours'], design['finish'], design['overDeadline']), (24, '2026-03-04', False))
+        # Build has no item estimates, so its own 40h runs Thursday to the next Wednesday, past its target.
+        self.assertEqual((build['start'], build['finish']), ('2026-03-05', '2026-03-11'))
+        self.assertTrue(build['missesTarget'])
+        self.assertTrue(data['achievable'])
+        self.assertEqual(data['unestimatedItems'], 1)
+
+    def test_lower_capacity_overruns_deadlines(self):
+        data = self.schedule(capacity=10)  # 2h a day
+        design = data['phases'][0]
+        self.assertEqual(design['items'][0]['finish'], '2026-03-05')
+        self.assertTrue(design['items'][0]['overDeadline'])
+        self.assertTrue(design['overDeadline'])
+        self.assertFalse(data['achievable'])
+
+    def test_memoized_per_roadmap_version(self):
+        self.schedule()
+        with CaptureQueriesContext(connections['default']) as queries:
+            self.schedule()
+        self.assertEqual(len(queries), 3)  # token user, roadmap, version fingerprint
+
+        self.spec.delete()
+        self.assertEqual([item['title'] for item in self.schedule()['phases'][0]['items']], ['Wireframes', 'Unknown'])
+        self.client.patch(f'/api/roadmap-items/{self.wireframes.id}/', {'status': 'completed'}, content_type='application/json')
+        self.assertEqual(self.schedule()['phases'][0]['remainingHours'], 0)
+
+    def test_invalid_params(self):
+        url = f'/api/roadmaps/{self.roadmap.id}/schedule/'
+        self.assertEqual(self.client.get(url, {'capacity': '0'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'capacity': 'nan'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '03/02/2026'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'capacity': '1e-9'}).status_code, 400)
+
+    def test_projection_past_the_last_date(self):
+        self.build.estimated_work_time = timedelta(days=10 ** 8)
+        self.build.save()
+        for path in ('schedule', 'forecast'):
+            response = self.client.get(f'/api/roadmaps/{self.roadmap.id}/{path}/', {'capacity': '0.1'})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('year 9999', response.json()['capacity'][0])
+
+
+class RoadmapForecastTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='forecaster', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Forecast Project')
+        self.roadmap = Roadmap.objects.create(project=self.project, name='Roadmap')
+        self.design = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Design', order=1,
+                                                  deadline=date(2026, 3, 13))
+        self.build = RoadmapPhase.objects.create(roadmap=self.roadmap, name='Build', order=2,
+                                                 estimated_work_time=timedelta(hours=40))
+        for title, estimate in (('Wireframes', 16), ('Spec', 8), ('Unknown', None)):
+            RoadmapItem.objects.create(roadmap_phase=self.design, title=title,
+                                       estimated_work_time=estimate and timedelta(hours=estimate))
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def forecast(self, **params):
+        response = self.client.get(f'/api/roadmaps/{self.roadmap.id}/forecast/',
+                                   {'start': '2026-03-02', 'seed': 7, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def complete_history(self, count, workdays):
+        """Completed 8h items that each took `workdays` working days, started on a Monday."""
+        earlier = Roadmap.objects.create(project=self.project, name='Earlier')
+        history = RoadmapPhase.objects.create(roadmap=earlier, name='History', order=1, status='completed')
+        for index in range(count):
+            item = RoadmapItem.objects.create(roadmap_phase=history, title=f'Done {index}', status='completed',
+                                              estimated_work_time=timedelta(hours=8))
+            started = datetime(2026, 1, 5, 9, tzinfo=dt_timezone.utc)
+            for moment in (started, started + timedelta(days=workdays - 1)):
+                activity = Activity.objects.create(project=self.project, type='status_change',
+                                                   entity='roadmap_item', entity_id=item.id)
+                Activity.objects.filter(id=activity.id).update(created_at=moment)
+
+    def test_percentiles_per_phase(self):
+        data = self.forecast()
+        self.assertEqual((data['basis'], data['historySize'], data['simulations']), ('default', 0, 5000))
+        design, build = data['phases']
+        for phase in (design, build):
+            self.assertLessEqual(phase['p50'], phase['p85'])
+            self.assertLessEqual(phase['p85'], phase['p95'])
+        self.assertLess(design['p50'], build['p50'])
+        self.assertGreater(design['onTimeProbability'], 0.5)
+        self.assertIsNone(build['onTimeProbability'])
+        self.assertEqual(self.forecast(), data)  # same seed, same answer
+
+    def test_history_drives_the_ratios(self):
+        self.complete_history(5, workdays=3)  # 24h of elapsed work for each 8h estimate
+        data = self.forecast(simulations=200)
+        self.assertEqual((data['basis'], data['historySize']), ('history', 5))
+        design, build = data['phases']
+        # Every factor is exactly 3. Design's 36h (Unknown counts as the 12h median) becomes 108h,
+        # 13.5 days from 2 March; Build's 40h becomes 120h, 15 more days.
+        self.assertEqual(design['p50'], design['p95'])
+        self.assertEqual(design['p50'], '2026-03-19')
+        self.assertEqual(design['onTimeProbability'], 0)
+        self.assertEqual(build['p50'], '2026-04-09')
+
+    def test_thousands_of_items_vectorized(self):
+        RoadmapItem.objects.bulk_create(
+            RoadmapItem(roadmap_phase=self.build, title=f'Task {index}', estimated_work_time=timedelta(hours=4))
+            for index in range(3000)
+        )
+        with CaptureQueriesContext(connections['default']) as queries:
+            data = self.forecast(simulations=2000)
+        self.assertLessEqual(len(queries), 6)  # token user, roadmap, history, phases, items
+        self.assertLessEqual(data['phases'][1]['p50'], data['phases'][1]['p95'])
+
+    def test_runs_are_simulated_in_chunks(self):
+        data = self.forecast(simulations=300)
+        with patch('projects.forecasting.SIMULATION_CHUNK_CELLS', 8):  # two runs of four items at a time
+            self.assertEqual(self.forecast(simulations=300), data)
+        with patch('projects.forecasting.MAX_RESULT_CELLS', 100):
+            response = self.client.get(f'/api/roadmaps/{self.roadmap.id}/forecast/', {'simulations': 51})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('simulations x phases', response.json()['simulations'][0])
+
+    def test_invalid_params(self):
+        url = f'/api/roadmaps/{self.roadmap.id}/forecast/'
+        self.assertEqual(self.client.get(url, {'simulations': '0'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'simulations': '1000000'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'seed': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'capacity': '-5'}).status_code, 400)
+
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(username='admin', password='testpass')
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        project = Project.objects.create(user=self.admin, name=f'Admin Project {Project.objects.count()}')
+        phase = RoadmapPhase.objects.create(roadmap=Roadmap.objects.create(project=project, name='Roadmap'), name='Phase', order=1)
+        for index in range(count):
+            Feature.objects.create(project=project, description=f'Feature {index}')
+            RoadmapItem.objects.create(roadmap_phase=phase, title=f'Item {index}')
+            Activity.objects.create(project=project, type='create', entity='feature', entity_id=index)
+
+    def changelist_queries(self, model):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(f'/admin/projects/{model}/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.add_rows(2)
+        counts = {model: self.changelist_queries(model) for model in ('feature', 'roadmapitem', 'activity', 'roadmapphase')}
+        for _ in range(3):
+            self.add_rows(5)
+        self.assertEqual({model: self.changelist_queries(model) for model in counts}, counts)
+
+    def test_autocomplete_renders_without_per_row_queries(self):
+        self.add_rows(5)
+        params = {'app_label': 'projects', 'model_name': 'roadmapitem', 'field_name': 'roadmap_phase'}
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get('/admin/autocomplete/', params)
+        self.assertEqual(response.json()['results'][0]['text'], 'Roadmap - Phase')
+        self.add_rows(5)
+        with CaptureQueriesContext(connections['default']) as more_queries:
+            self.client.get('/admin/autocomplete/', params)
+        self.assertEqual(len(more_queries), len(queries))
+
+    def test_estimated_count_paginator(self):
+        self.add_rows(30)
+        queryset = Activity.objects.order_by('-id')
+        self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 30)  # small results stay exact
+        Activity.objects.bulk_create(
+            Activity(project_id=queryset[0].project_id, type='create', entity='bug', entity_id=index)
+            for index in range(2000)
+        )
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'ANALYZE {Activity._meta.db_table}')
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.exact_count_threshold = 100
+        with CaptureQueriesContext(connections['default']) as queries:
+            count = paginator.count
+        self.assertTrue(queries[0]['sql'].startswith('EXPLAIN'))
+        self.assertAlmostEqual(count, 2030, delta=300)
+
+
+class BulkAdminActionsTest(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(username='triage', password='testpass')
+        self.client.force_login(self.admin)
+        self.project = Project.objects.create(user=self.admin, name='Triage Project')
+        self.broker = events.InMemoryBroker()
+        self.published = []
+        self.broker.publish = lambda user_id, event: self.published.append((user_id, event))
+        patcher = patch.object(events, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_action(self, model, action, rows, **data):
+        return self.client.post(f'/admin/projects/{model}/', {
+            'action': action, ACTION_CHECKBOX_NAME: [row.id for row in rows], **data,
+        })
+
+    def test_asks_for_the_value_first(self):
+        bugs = [Bug.objects.create(project=self.project, description='Crash')]
+        response = self.run_action('bug', 'set_status', bugs)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'name="apply"')
+        self.assertEqual(Bug.objects.get().status, 'open')
+
+    def test_single_update_and_activity_insert(self):
+        def triage(count):
+            bugs = [Bug.objects.create(project=self.project, description=f'Bug {index}') for index in range(count)]
+            with CaptureQueriesContext(connections['default']) as queries:
+                response = self.run_action('bug', 'set_status', bugs, status='fixed', apply='1')
+            self.assertEqual(response.status_code, 302)
+            return [query['sql'] for query in queries]
+
+        few, many = triage(3), triage(30)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(sum(sql.startswith('UPDATE "projects_bug"') for sql in many), 1)
+        self.assertEqual(sum(sql.startswith('INSERT INTO "projects_activity"') for sql in many), 1)
+        self.assertFalse(Bug.objects.exclude(status='fixed').exists())
+        activity = Activity.objects.filter(type='status_change', entity='bug').latest('id')
+        self.assertEqual(activity.description, "Bug 'Bug 29' status changed from 'open' to 'fixed'")
+
+    def test_skips_unchanged_rows_and_publishes(self):
+        phase = RoadmapPhase.objects.create(roadmap=Roadmap.objects.create(project=self.project, name='Roadmap'),
+                                            name='Phase', order=1)
+        items = [RoadmapItem.objects.create(roadmap_phase=phase, title=f'Item {index}', priority=priority)
+                 for index, priority in enumerate(('high', 'low', None))]
+        version = get_data_version(self.admin.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_action('roadmapitem', 'set_priority', items, priority='high', apply='1')
+        self.assertEqual(Activity.objects.filter(entity='roadmap_item').count(), 2)
+        self.assertEqual([event['entityId'] for _, event in self.published], [items[1].id, items[2].id])
+        self.assertNotEqual(get_data_version(self.admin.id), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_action('roadmapitem', 'set_priority', items, priority='', apply='1')
+        self.assertEqual(set(RoadmapItem.objects.values_list('priority', flat=True)), {None})
+        self.assertIn("Field 'priority' changed from 'high' to 'None'",
+                      Activity.objects.filter(entity='roadmap_item').latest('id').description)
+
+
+class ProjectSoftDeleteTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='deleter', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Doomed')
+        ProjectDetails.objects.create(project=self.project, development_notes='notes')
+        self.feature = Feature.objects.create(project=self.project, description='Feature')
+        Bug.objects.create(project=self.project, description='Bug')
+        phase = RoadmapPhase.objects.create(roadmap=Roadmap.objects.create(project=self.project, name='Roadmap'),
+                                            name='Phase', order=1)
+        RoadmapItem.objects.create(roadmap_phase=phase, title='Item', linked_feature=self.feature)
+        Activity.objects.bulk_create(
+            Activity(project=self.project, type='create', entity='feature', description='a') for _ in range(500)
+        )
+        self.survivor = Project.objects.create(user=self.user, name='Survivor')
+        survivor_phase = RoadmapPhase.objects.create(
+            roadmap=Roadmap.objects.create(project=self.survivor, name='Kept'), name='Phase', order=1
+        )
+        self.linked = RoadmapItem.objects.create(roadmap_phase=survivor_phase, title='Kept', linked_feature=self.feature)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def test_delete_hides_without_touching_children(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.delete(f'/api/projects/{self.project.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(any(query['sql'].startswith('DELETE') for query in queries))
+        self.assertEqual(len(queries), 3)  # token user, project, UPDATE
+
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/').status_code, 404)
+        self.assertEqual([p['id'] for p in self.client.get('/api/projects/').json()['results']], [self.survivor.id])
+        for url in ('/api/features/', '/api/bugs/', '/api/activities/', '/api/roadmaps/', '/api/roadmap-items/'):
+            results = self.client.get(url).json()
+            results = results['results'] if isinstance(results, dict) else results
+            self.assertTrue(all(row.get('project') != self.project.id for row in results), url)
+        self.assertEqual(RoadmapItem.live.get().title, 'Kept')
+        self.assertEqual(Activity.live.filter(project=self.project).count(), 0)
+        self.assertEqual(Activity.objects.filter(project=self.project).count(), 500)
+
+        page = sync_page(self.user, None)
+        self.assertIn({'entity': 'project', 'id': self.project.id}, page['deleted'])
+        self.assertEqual(page['projectIds'], [self.survivor.id])
+
+    def test_purge_cascades_in_the_database(self):
+        self.client.delete(f'/api/projects/{self.project.id}/')
+        out = io.StringIO()
+        call_command('purge_deleted_projects', '--older-than', '5', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Purged 0 deleted projects.')
+
+        Project.all_objects.filter(id=self.project.id).update(deleted_at=F('deleted_at') - timedelta(minutes=10))
+        RoadmapItem.objects.filter(id=self.linked.id).update(updated_at=F('updated_at') - timedelta(days=1))
+        cursor = sync_page(self.user, None)['cursor']
+        with CaptureQueriesContext(connections['default']) as queries:
+            call_command('purge_deleted_projects', '--older-than', '5', stdout=out)
+        statements = [query['sql'].split()[0] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(statements, ['SELECT', 'UPDATE', 'DELETE'])  # find the projects, then per project
+        self.assertFalse(Project.all_objects.filter(id=self.project.id).exists())
+        for model in (ProjectDetails, Feature, Bug, Activity, Roadmap, RoadmapPhase):
+            self.assertFalse(model._base_manager.filter(
+                **{'roadmap__project_id' if model is RoadmapPhase else 'project_id': self.project.id}
+            ).exists(), model)
+        self.assertEqual(RoadmapItem._base_manager.get().title, 'Kept')
+        self.linked.refresh_from_db()
+        self.assertIsNone(self.linked.linked_feature_id)
+        # The unlinked item is stamped, so delta syncs send it again without the link.
+        items = sync_page(self.user, cursor)['roadmapItems']
+        self.assertEqual([(item['id'], item['linkedFeatureId']) for item in items], [(self.linked.id, None)])
+
+    def test_foreign_keys_cascade_in_the_database(self):
+        # Migration 0009 sets these in raw SQL that Django's migration state doesn't know
+        # about; an AlterField on one of the foreign keys would silently drop them.
+        with connections['default'].cursor() as cursor:
+            cursor.execute(
+                "SELECT conrelid::regclass::text, a.attname, confdeltype FROM pg_constraint"
+                " JOIN pg_attribute a ON a.attrelid = conrelid AND a.attnum = conkey[1]"
+                " WHERE contype = 'f' AND conrelid::regclass::text LIKE 'projects_%%'"
+            )
+            actions = {(table, column): action for table, column, action in cursor.fetchall()}
+        for table, column, _, action in import_module('projects.migrations.0009_project_soft_delete').FOREIGN_KEYS:
+            self.assertEqual(actions[(table, column)], {'CASCADE': 'c', 'SET NULL': 'n'}[action], (table, column))
+
+
+class RoadmapItemLinkTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='linker', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Linked')
+        self.phase = RoadmapPhase.objects.create(roadmap=Roadmap.objects.create(project=self.project, name='Roadmap'),
+                                                 name='Phase', order=1)
+        self.other_project = Project.objects.create(user=self.user, name='Elsewhere')
+        self.foreign_bug = Bug.objects.create(project=self.other_project, description='Not here')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def make_items(self, count):
+        items = [RoadmapItem.objects.create(roadmap_phase=self.phase, title=f'Item {index}') for index in range(count)]
+        features = [Feature.objects.create(project=self.project, description=f'Feature {index}') for index in range(count)]
+        return items, features
+
+    def bulk_link(self, links):
+        return self.client.post('/api/roadmap-items/bulk-link/', {'links': links}, content_type='application/json')
+
+    def test_batched_validation_and_writes(self):
+        def link_all(count):
+            items, features = self.make_items(count)
+            links = [{'itemId': item.id, 'linkedFeatureId': feature.id} for item, feature in zip(items, features)]
+            with CaptureQueriesContext(connections['default']) as queries:
+                response = self.bulk_link(links)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['linkedFeatureId'] for row in response.json()], [feature.id for feature in features])
+            return [query['sql'] for query in queries]
+
+        few, many = link_all(2), link_all(25)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(sum(sql.startswith('UPDATE') for sql in many), 1)
+        self.assertEqual(sum(sql.startswith('INSERT INTO "projects_activity"') for sql in many), 1)
+        self.assertEqual(Activity.objects.latest('id').description, 'Links updated on 25 items')
+
+    def test_rejects_targets_outside_the_item_project(self):
+        items, features = self.make_items(2)
+        stranger = get_user_model().objects.create_user(username='stranger', password='testpass')
+        stranger_phase = RoadmapPhase.objects.create(
+            roadmap=Roadmap.objects.create(project=Project.objects.create(user=stranger, name='Theirs'), name='R'),
+            name='P', order=1,
+        )
+        theirs = RoadmapItem.objects.create(roadmap_phase=stranger_phase, title='Theirs')
+        response = self.bulk_link([
+            {'itemId': items[0].id, 'linkedFeatureId': features[0].id},
+            {'itemId': items[1].id, 'linkedBugId': self.foreign_bug.id},
+            {'itemId': theirs.id, 'linkedFeatureId': None},
+            {'itemId': items[0].id, 'linkedBugId': None},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['links']
+        self.assertEqual(errors[0], {})
+        self.assertIn('linkedBugId', errors[1])
+        self.assertIn('itemId', errors[2])
+        self.assertIn('more than once', errors[3]['itemId'][0])
+        self.assertFalse(RoadmapItem.objects.filter(linked_feature__isnull=False).exists())
+
+    def test_null_unlinks_and_noops_are_skipped(self):
+        items, features = self.make_items(2)
+        bug = Bug.objects.create(project=self.project, description='Bug')
+        RoadmapItem.objects.filter(id=items[0].id).update(linked_feature=features[0], linked_bug=bug)
+        response = self.bulk_link([
+            {'itemId': items[0].id, 'linkedFeatureId': None},
+            {'itemId': items[1].id},
+        ])
+        self.assertEqual(response.status_code, 200)
+        items[0].refresh_from_db()
+        self.assertEqual((items[0].linked_feature_id, items[0].linked_bug_id), (None, bug.id))
+        activity = Activity.objects.get()
+        self.assertEqual((activity.entity_id, activity.description), (items[0].id, "Item 'Item 0' links updated"))
+
+    def test_single_link_is_scoped_and_unlink_takes_several_types(self):
+        items, features = self.make_items(1)
+        url = f'/api/roadmap-items/{items[0].id}/'
+        response = self.client.patch(url + 'link/', {'linkedBugId': self.foreign_bug.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, {'linkedBugId': self.foreign_bug.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        bug = Bug.objects.create(project=self.project, description='Bug')
+        response = self.client.patch(url + 'link/', {'linkedFeatureId': features[0].id, 'linkedBugId': bug.id},
+                                     content_type='application/json')
+        self.assertEqual((response.json()['linkedFeatureId'], response.json()['linkedBugId']), (features[0].id, bug.id))
+        response = self.client.patch(url + 'unlink/', {'link_type': ['feature', 'bug']}, content_type='application/json')
+        self.assertEqual((response.json()['linkedFeatureId'], response.json()['linkedBugId']), (None, None))
+        for link_type in ('epic', 5, {'feature': True}, ['feature', 5], None):
+            response = self.client.patch(url + 'unlink/', {'link_type': link_type}, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.patch(url + 'unlink/', ['feature'], content_type='application/json').status_code, 400)
+
+
+    def test_item_creation_is_scoped_on_every_route(self):
+        stranger = get_user_model().objects.create_user(username='outsider', password='testpass')
+        theirs = Feature.objects.create(project=Project.objects.create(user=stranger, name='Theirs'), description='F')
+        mine = Feature.objects.create(project=self.project, description='Mine')
+        for url, data in ((f'/api/roadmaps/phases/{self.phase.id}/items/', {}),
+                          ('/api/roadmap-items/', {'roadmapPhaseId': self.phase.id})):
+            for target in (theirs, self.foreign_bug):
+                key = 'linkedFeatureId' if target is theirs else 'linkedBugId'
+                response = self.client.post(url, {'title': 'New', key: target.id, **data}, content_type='application/json')
+                self.assertEqual(response.status_code, 400, url)
+                self.assertIn(key, response.json())
+            response = self.client.post(url, {'title': 'New', 'linkedFeatureId': mine.id, **data},
+                                        content_type='application/json')
+            self.assertEqual((response.status_code, response.json()['linkedFeatureId']), (201, mine.id))
+        self.assertFalse(RoadmapItem.objects.filter(linked_feature=theirs).exists())
+        self.assertFalse(RoadmapItem.objects.filter(linked_bug=self.foreign_bug).exists())
+
+class RoadmapCoverageTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='coverage', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Coverage')
+        self.phase = RoadmapPhase.objects.create(roadmap=Roadmap.objects.create(project=self.project, name='Roadmap'),
+                                                 name='Phase', order=1)
+        self.bugs = [Bug.objects.create(project=self.project, description=f'Bug {index}') for index in range(4)]
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def link(self, bug, count=1):
+        return [RoadmapItem.objects.create(roadmap_phase=self.phase, title=f'Fix {bug.description}', linked_bug=bug)
+                for _ in range(count)]
+
+    def test_linked_items_are_opt_in_and_batched(self):
+        self.assertNotIn('roadmapItems', self.client.get('/api/bugs/').json()['results'][0])
+
+        items = self.link(self.bugs[0], 2)
+        with CaptureQueriesContext(connections['default']) as queries:
+            results = self.client.get('/api/bugs/', {'include': 'roadmapItems'}).json()['results']
+        by_id = {row['id']: row['roadmapItems'] for row in results}
+        self.assertEqual(sorted(item['id'] for item in by_id[self.bugs[0].id]), [item.id for item in items])
+        self.assertEqual(by_id[self.bugs[0].id][0]['roadmapPhaseId'], self.phase.id)
+        self.assertEqual(by_id[self.bugs[1].id], [])
+
+        for bug in self.bugs[1:]:
+            self.link(bug, 3)
+        with CaptureQueriesContext(connections['default']) as more_queries:
+            self.client.get('/api/bugs/', {'include': 'roadmapItems'})
+        self.assertEqual(len(more_queries), len(queries))
+
+        detail = self.client.get(f'/api/bugs/{self.bugs[1].id}/', {'include': 'roadmapItems'}).json()
+        self.assertEqual(len(detail['roadmapItems']), 3)
+        self.assertEqual(self.client.get('/api/bugs/', {'include': 'tags'}).status_code, 400)
+
+    def test_on_roadmap_filter(self):
+        self.link(self.bugs[0], 2)
+        self.link(self.bugs[2])
+
+        def ids(on_roadmap):
+            response = self.client.get('/api/bugs/', {'on_roadmap': on_roadmap})
+            self.assertEqual(response.status_code, 200)
+            return sorted(row['id'] for row in response.json()['results'])
+
+        self.assertEqual(ids('false'), [self.bugs[1].id, self.bugs[3].id])
+        self.assertEqual(ids('true'), [self.bugs[0].id, self.bugs[2].id])
+        self.assertEqual(self.client.get('/api/features/', {'on_roadmap': 'false'}).json()['results'], [])
+        self.assertEqual(self.client.get('/api/bugs/', {'on_roadmap': 'maybe'}).status_code, 400)
+
+
+class RoadmapCloneTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='cloner', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Source')
+        self.feature = Feature.objects.create(project=self.project, description='Feature')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def make_roadmap(self, phases, items):
+        roadmap = Roadmap.objects.create(project=self.project, name='Template', status='active')
+        for order in range(phases):
+            phase = RoadmapPhase.objects.create(roadmap=roadmap, name=f'Phase {order}', order=order, status='completed',
+                                                deadline=date(2026, 3, 2 + order))
+            RoadmapItem.objects.bulk_create(
+                RoadmapItem(roadmap_phase=phase, title=f'Item {order}.{index}', status='in_progress',
+                            deadline=date(2026, 3, 10), linked_feature=self.feature)
+                for index in range(items)
+            )
+        return roadmap
+
+    def clone(self, roadmap, **data):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.post(f'/api/roadmaps/{roadmap.id}/clone/', data, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_constant_statements(self):
+        small, small_queries = self.clone(self.make_roadmap(2, 3))
+        big, big_queries = self.clone(self.make_roadmap(6, 25))
+        self.assertEqual(len(small_queries), len(big_queries))
+        self.assertEqual(sum(sql.startswith('INSERT') for sql in big_queries), 4)  # roadmap, phases, items, activity
+        self.assertEqual((len(big['phases']), sum(len(phase['items']) for phase in big['phases'])), (6, 150))
+        self.assertEqual(big['name'], 'Template (copy)')
+        self.assertEqual(big['phases'][0]['items'][0]['linkedFeatureId'], self.feature.id)
+        self.assertEqual(Activity.objects.filter(entity='roadmap', entity_id=big['id']).count(), 1)
+
+    def test_template_into_another_project(self):
+        roadmap = self.make_roadmap(2, 2)
+        other = Project.objects.create(user=self.user, name='Target')
+        data, _ = self.clone(roadmap, projectId=other.id, name='Q3 plan', shiftDays=7, resetStatus=True)
+        self.assertEqual((data['projectId'], data['name'], data['status']), (other.id, 'Q3 plan', 'draft'))
+        phase = data['phases'][1]
+        self.assertEqual((phase['status'], phase['deadline']), ('not_started', '2026-03-10'))
+        item = phase['items'][0]
+        self.assertEqual((item['status'], item['deadline'], item['linkedFeatureId']), ('planned', '2026-03-17', None))
+        self.assertEqual(RoadmapItem.objects.filter(roadmap_phase__roadmap=roadmap, status='in_progress').count(), 4)
+
+        stranger = Project.objects.create(user=get_user_model().objects.create_user(username='x', password='y'), name='X')
+        response = self.client.post(f'/api/roadmaps/{roadmap.id}/clone/', {'projectId': stranger.id},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+
+class ProjectArchiveTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='archiver', password='testpass')
+        self.other = get_user_model().objects.create_user(username='receiver', password='testpass')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def make_project(self, size):
+        project = Project.objects.create(user=self.user, name='Source', repo_link=['https://example.com/repo'],
+                                         setup_steps=['install', 'run'])
+        ProjectDetails.objects.create(project=project, development_notes='Notes')
+        features = Feature.objects.bulk_create(
+            Feature(project=project, description=f'Feature {index}', estimated_work_time=timedelta(hours=index))
+            for index in range(size)
+        )
+        Bug.objects.create(project=project, description='Bug')
+        Improvement.objects.create(project=project, description='Improvement')
+        roadmap = Roadmap.objects.create(project=project, name='Plan')
+        phase = RoadmapPhase.objects.create(roadmap=roadmap, name='Phase', order=0)
+        RoadmapItem.objects.bulk_create(
+            RoadmapItem(roadmap_phase=phase, title=f'Item {index}', linked_feature=feature)
+            for index, feature in enumerate(features)
+        )
+        Activity.objects.create(project=project, type='create', entity='feature', entity_id=features[0].id,
+                                description='Feature created')
+        Activity.objects.filter(project=project).update(created_at=datetime(2025, 1, 2, tzinfo=dt_timezone.utc))
+        return project
+
+    def export(self, project):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(f'/api/projects/{project.id}/export/')
+            self.assertEqual(response.status_code, 200)
+            archive = b''.join(response.streaming_content)
+        return archive, len(queries)
+
+    def import_archive(self, archive, user=None, **params):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user or self.user)}'}
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.post(f'/api/projects/import/?{urlencode(params)}', archive,
+                                        content_type='application/gzip', **headers)
+        return response, len(queries)
+
+    def test_round_trip_to_another_account(self):
+        project = self.make_project(3)
+        archive, _ = self.export(project)
+        response, _ = self.import_archive(archive, user=self.other, name='Copy')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['counts'], {'project': 1, 'details': 1, 'feature': 3, 'bug': 1, 'improvement': 1,
+                                          'roadmap': 1, 'roadmap_phase': 1, 'roadmap_item': 3, 'activity': 1})
+
+        copy = Project.objects.get(id=data['id'])
+        self.assertEqual((copy.user, copy.name, copy.repo_link, copy.setup_steps),
+                         (self.other, 'Copy', ['https://example.com/repo'], ['install', 'run']))
+        self.assertEqual(copy.details.development_notes, 'Notes')
+        features = {feature.description: feature for feature in copy.feature_set.all()}
+        self.assertEqual(features['Feature 2'].estimated_work_time, timedelta(hours=2))
+        item = RoadmapItem.objects.get(roadmap_phase__roadmap__project=copy, title='Item 1')
+        self.assertEqual(item.linked_feature, features['Feature 1'])
+        activity = copy.activity_set.get(description='Feature created')
+        self.assertEqual((activity.entity_id, activity.created_at),
+                         (features['Feature 0'].id, datetime(2025, 1, 2, tzinfo=dt_timezone.utc)))
+        self.assertTrue(copy.activity_set.filter(description__startswith="Project 'Copy' imported").exists())
+        # The source is untouched.
+        self.assertEqual(Feature.objects.filter(project=project).count(), 3)
+
+    def test_constant_queries(self):
+        small_archive, small_export = self.export(self.make_project(2))
+        big_archive, big_export = self.export(self.make_project(40))
+        self.assertEqual(small_export, big_export)
+        small_response, small_import = self.import_archive(small_archive)
+        big_response, big_import = self.import_archive(big_archive)
+        self.assertEqual((small_response.status_code, big_response.status_code), (201, 201))
+        self.assertEqual(small_import, big_import)
+        self.assertEqual(big_response.json()['counts']['roadmap_item'], 40)
+
+    def test_other_users_and_bad_archives(self):
+        project = self.make_project(1)
+        archive, _ = self.export(project)
+        projects = Project.objects.count()
+        response, _ = self.import_archive(b'not an archive')
+        self.assertEqual(response.status_code, 400)
+        response, _ = self.import_archive(archive[:len(archive) // 2])
+        self.assertEqual(response.status_code, 400)
+        response, _ = self.import_archive(gzip.compress(b'{"format": "project-archive", "version": 1}\n'
+                                                        b'{"model": "feature", "row": {"project_id": 1}}\n'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Project.objects.count(), projects)
+
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.other)}'
+        self.assertEqual(self.client.get(f'/api/projects/{project.id}/export/').status_code, 404)
+
+    async def test_streams_asynchronously_under_asgi(self):
+        project = await sync_to_async(self.make_project)(3)
+        request = AsyncRequestFactory().get(f'/api/projects/{project.id}/export/',
+                                            headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'})
+        response = await sync_to_async(ProjectViewSet.as_view({'get': 'export'}))(request, pk=project.id)
+        self.assertTrue(response.is_async)
+        archive = b''.join([chunk async for chunk in response.streaming_content])
+        records = [json.loads(line) for line in gzip.decompress(archive).splitlines()[1:]]
+        self.assertEqual(sum(record['model'] == 'roadmap_item' for record in records), 3)
+
+    def test_import_caps_size_and_rows(self):
+        projects = Project.objects.count()
+        bomb = gzip.compress(b'{"format": "project-archive", "version": 1}\n' + b' ' * (2 * 1024 * 1024))
+        with patch('projects.archive.ARCHIVE_MAX_BYTES', 1024 * 1024):
+            response, _ = self.import_archive(bomb)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('uncompressed', response.json()['archive'][0])
+
+        archive, _ = self.export(self.make_project(3))
+        with patch('projects.archive.ARCHIVE_MAX_ROWS', 5):
+            response, _ = self.import_archive(archive)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('more than 5 rows', response.json()['archive'][0])
+        self.assertEqual(Project.objects.count(), projects + 1)
+
+
+class ProjectArchiveSnapshotTest(TransactionTestCase):
+    def test_export_reads_one_snapshot(self):
+        user = get_user_model().objects.create_user(username='snapshot', password='testpass')
+        project = Project.objects.create(user=user, name='Snapshot')
+        Feature.objects.create(project=project, description='Before')
+        chunks = export_archive(project)
+        output = [next(chunks), next(chunks)]  # the header, then the project row: the snapshot is taken
+
+        def write():
+            Feature.objects.create(project=project, description='During')
+            connections.close_all()
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join(5)
+
+        output += list(chunks)
+        self.assertEqual(Feature.objects.filter(project=project).count(), 2)
+        rows = [json.loads(line) for line in gzip.decompress(b''.join(output)).splitlines()[1:]]
+        self.assertEqual([row['row']['description'] for row in rows if row['model'] == 'feature'], ['Before'])
+
+
+class SingleFlightTest(SimpleTestCase):
+    def run_concurrently(self, flight, fn, callers):
+        """Run `fn` through `flight` from `callers` threads, the first holding the flight open until the rest wait."""
+        started, release, results = threading.Event(), threading.Event(), []
+
+        def first():
+            started.set()
+            release.wait(5)
+            return fn()
+
+        def call(target):
+            try:
+                results.append(flight.do('key', target))
+            except RuntimeError as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=call, args=(first,))]
+        threads[0].start()
+        started.wait(5)
+        threads += [threading.Thread(target=call, args=(fn,)) for _ in range(callers - 1)]
+        for thread in threads[1:]:
+            thread.start()
+        while flight.calls['key'].waiters < callers - 1:
+            sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(flight.calls, {})
+        return results
+
+    def test_waiting_callers_share_the_result(self):
+        calls = []
+        results = self.run_concurrently(SingleFlight(), lambda: calls.append(1) or len(calls), 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [(1, False), (1, True), (1, True), (1, True)])
+
+    def test_waiting_callers_retry_after_a_failure(self):
+        calls = []
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('boom')
+            return 'ok'
+        results = self.run_concurrently(SingleFlight(), fn, 3)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sum(isinstance(result, RuntimeError) for result in results), 1)
+        self.assertEqual([result for result in results if isinstance(result, tuple)], [('ok', False), ('ok', False)])
+
+
+class SingleFlightViewTest(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='tabs', password='testpass')
+        Project.objects.create(user=self.user, name='Coalesced')
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.addCleanup(cache.clear)
+
+    def test_identical_concurrent_gets_run_once(self):
+        get_queryset = ProjectViewSet.get_queryset
+        started, release, calls, responses = threading.Event(), threading.Event(), [], []
+
+        def slow_get_queryset(view):
+            calls.append(view.request.get_full_path())
+            started.set()
+            release.wait(5)
+            return get_queryset(view)
+
+        def get(path):
+            try:
+                responses.append(Client().get(path, **self.headers))
+            finally:
+                connections.close_all()
+
+        with patch.object(ProjectViewSet, 'get_queryset', slow_get_queryset):
+            threads = [threading.Thread(target=get, args=('/api/projects/?fields=id,name',))]
+            threads[0].start()
+            started.wait(5)
+            threads += [threading.Thread(target=get, args=('/api/projects/?fields=id,name',)) for _ in range(2)]
+            for thread in threads[1:]:
+                thread.start()
+            while sum(call.waiters for call in singleflight.requests.calls.values()) < 2:
+                sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+            self.assertEqual(len(calls), 1)
+            self.assertEqual({response.status_code for response in responses}, {200})
+            self.assertEqual(len({response.content for response in responses}), 1)
+            self.assertEqual(responses[0].json()['results'][0]['name'], 'Coalesced')
+
+            # Sequential requests aren't coalesced.
+            self.assertEqual(Client().get('/api/projects/?fields=id,name', **self.headers).status_code, 200)
+            self.assertEqual(len(calls), 2)
+
+
+class BatchEndpointTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='batcher', password='testpass')
+        self.project = Project.objects.create(user=self.user, name='Batched')
+        self.roadmap = Roadmap.objects.create(project=self.project, name='Plan')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def batch(self, requests, **options):
+        return self.client.post('/api/batch/', {'requests': requests, **options}, content_type='application/json')
+
+    def test_page_in_one_round_trip(self):
+        paths = [f'/api/projects/{self.project.id}/', f'/api/projects/{self.project.id}/activities/',
+                 f'/api/roadmaps/{self.roadmap.id}/', '/api/roadmaps/?fields=id,name']
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.batch([{'method': 'GET', 'path': path} for path in paths])
+        self.assertEqual(response.status_code, 200)
+        # The token's user is loaded once for the whole batch.
+        user_table = CustomUser._meta.db_table
+        self.assertEqual(sum(f'FROM "{user_table}"' in query['sql'] for query in queries.captured_queries), 1)
+        results = response.json()['responses']
+        self.assertEqual([result['status'] for result in results], [200] * 4)
+        for path, result in zip(paths, results):
+            self.assertEqual(result['body'], self.client.get(path).json())
+        self.assertEqual(results[3]['body']['results'], [{'id': self.roadmap.id, 'name': 'Plan'}])
+
+    def test_subrequest_is_built_from_the_batch_request(self):
+        request = RequestFactory().post('/api/batch/', b'{}', content_type='application/json',
+                                        HTTP_HOST='api.example.com', HTTP_X_FORWARDED_FOR='10.0.0.1', secure=True)
+        subrequest = batch.build_subrequest(request, 'PATCH', '/api/features/1/?fields=id', b'{"status": "done"}')
+        self.assertEqual((subrequest.method, subrequest.path, subrequest.GET['fields']), ('PATCH', '/api/features/1/', 'id'))
+        self.assertEqual(subrequest.build_absolute_uri(), 'https://api.example.com/api/features/1/?fields=id')
+        self.assertEqual(subrequest.headers['X-Forwarded-For'], '10.0.0.1')
+        self.assertEqual(json.loads(subrequest.body), {'status': 'done'})
+
+    def test_unbatchable_paths(self):
+        response = self.batch([
+            {'method': 'GET', 'path': '/api/nothing-here/'},
+            {'method': 'GET', 'path': '/api/metrics/'},
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}},
+            {'method': 'GET', 'path': f'/api/projects/{self.project.id}/export/'},
+        ])
+        self.assertEqual([result['status'] for result in response.json()['responses']], [404, 404, 404, 400])
+        self.assertEqual(self.batch([{'method': 'GET', 'path': '/admin/'}]).status_code, 400)
+        self.assertEqual(self.batch([{'method': 'GET', 'path': '/api/projects/'}] * 21).status_code, 400)
+        self.client.defaults.pop('HTTP_AUTHORIZATION')
+        self.assertEqual(self.batch([{'method': 'GET', 'path': '/api/projects/'}]).status_code, 401)
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        requests = [
+            {'method': 'POST', 'path': '/api/features/', 'body': {'projectId': self.project.id, 'description': 'New'}},
+            {'method': 'PATCH', 'path': f'/api/projects/{self.project.id}/', 'body': {'status': 'Unknown'}},
+            {'method': 'GET', 'path': '/api/features/'},
+        ]
+        data = self.batch(requests, atomic=True).json()
+        self.assertEqual([result['status'] for result in data['responses']], [201, 400, 424])
+        self.assertFalse(data['committed'])
+        self.assertFalse(Feature.objects.filter(project=self.project).exists())
+
+        data = self.batch(requests).json()
+        self.assertEqual([result['status'] for result in data['responses']], [201, 400, 200])
+        self.assertEqual(data['responses'][2]['body']['results'][0]['description'], 'New')
+        self.assertEqual(Feature.objects.filter(project=self.project).count(), 1)
+
+
+class NestedQueryTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='grapher', password='testpass')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def make_projects(self, count, size):
+        for index in range(count):
+            project = Project.objects.create(user=self.user, name=f'Project {index}')
+            features = Feature.objects.bulk_create(
+                Feature(project=project, description=f'Feature {index}.{number}', status='open') for number in range(size)
+            )
+            roadmap = Roadmap.objects.create(project=project, name=f'Roadmap {index}')
+            for order in range(size):
+                phase = RoadmapPhase.objects.create(roadmap=roadmap, name=f'Phase {order}', order=order)
+                RoadmapItem.objects.bulk_create(
+                    RoadmapItem(roadmap_phase=phase, title=f'Item {order}.{number}', linked_feature=feature)
+                    for number, feature in enumerate(features)
+                )
+
+    def query(self, query):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.post('/api/query/', query, content_type='application/json')
+        return response, len(queries)
+
+    QUERY = {'projects': {
+        'fields': ['id', 'name'],
+        'features': {'fields': ['description', 'status']},
+        'roadmaps': {'fields': ['name'], 'phases': {'fields': ['name'], 'items': {
+            'fields': ['title'], 'linkedFeature': {'fields': ['id', 'description'], 'project': {'fields': ['name']}},
+        }}},
+    }}
+
+    def test_query_count_follows_depth_not_size(self):
+        self.make_projects(1, 2)
+        small, small_queries = self.query(self.QUERY)
+        self.make_projects(4, 5)
+        big, big_queries = self.query(self.QUERY)
+        self.assertEqual((small.status_code, big.status_code), (200, 200))
+        self.assertEqual(small_queries, big_queries)
+
+        projects = big.json()['projects']
+        self.assertEqual(len(projects), 5)
+        project = projects[0]
+        self.assertEqual(set(project), {'id', 'name', 'features', 'roadmaps'})
+        self.assertEqual(project['features'], [{'description': 'Feature 0.0', 'status': 'open'},
+                                               {'description': 'Feature 0.1', 'status': 'open'}])
+        item = project['roadmaps'][0]['phases'][1]['items'][1]
+        self.assertEqual(item, {'title': 'Item 1.1', 'linkedFeature': {
+            'id': Feature.objects.filter(description='Feature 0.1').order_by('id')[0].id, 'description': 'Feature 0.1',
+            'project': {'name': 'Project 0'},
+        }})
+
+    def test_filters_scope_and_errors(self):
+        self.make_projects(2, 1)
+        stranger = get_user_model().objects.create_user(username='stranger', password='testpass')
+        Project.objects.create(user=stranger, name='Not mine')
+        response, _ = self.query({'projects': {'fields': ['name']}, 'roadmapItems': {
+            'filter': {'title': 'Item 0.0'}, 'limit': 1, 'fields': ['title'], 'phase': {'fields': ['name']},
+        }})
+        self.assertEqual(response.json(), {
+            'projects': [{'name': 'Project 0'}, {'name': 'Project 1'}],
+            'roadmapItems': [{'title': 'Item 0.0', 'phase': {'name': 'Phase 0'}}],
+        })
+        feature = Feature.objects.filter(project__name='Project 1').get()
+        response, _ = self.query({'features': {'filter': {'id': [feature.id]}, 'fields': ['id']}})
+        self.assertEqual(response.json(), {'features': [{'id': feature.id}]})
+
+        with patch('projects.graph.QUERY_ROW_LIMIT', 6):
+            response, queries = self.query({'projects': {'fields': ['id'], 'roadmaps': {'phases': {'items': {}}}}})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('projects.roadmaps.phases.items: The query selects more than 6 rows', response.json()['query'][0])
+            response, _ = self.query({'projects': {'fields': ['id'], 'roadmaps': {'phases': {}}}})
+            self.assertEqual(response.status_code, 200)
+
+        for query in ({'users': {}}, {'projects': {'owner': {}}}, {'projects': {'fields': ['secret']}},
+                      {'projects': {'filter': {'features': 1}}}, {'projects': {'filter': {'id': 'x'}}},
+                      {'projects': {'features': {'limit': 1}}}):
+            self.assertEqual(self.query(query)[0].status_code, 400, query)
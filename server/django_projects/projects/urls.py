@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import CustomTokenObtainPairView, GoogleAuthView
+from . import async_views
+from .views import BatchView, CustomTokenObtainPairView, GoogleAuthView, QueryView, SyncView, WorkloadAnalyticsView, metrics
 from .viewsets import (
     ProjectViewSet, FeatureViewSet, BugViewSet, ImprovementViewSet, 
     ActivityViewSet, UserViewSet, RoadmapViewSet, RoadmapPhaseViewSet, RoadmapItemViewSet
@@ -24,4 +25,16 @@ urlpatterns = [
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path("auth/google/", GoogleAuthView.as_view(), name="google_auth"),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics/', metrics, name='metrics'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('query/', QueryView.as_view(), name='query'),
+    path('analytics/workload/', WorkloadAnalyticsView.as_view(), name='analytics-workload'),
+    # The router GETs under their earlier async paths; see async_views.
+    path('async/projects/', async_views.project_list, name='async-project-list'),
+    path('async/projects/<int:pk>/', async_views.project_detail, name='async-project-detail'),
+    path('async/activities/', async_views.activity_list, name='async-activity-list'),
+    path('async/roadmaps/<int:pk>/', async_views.roadmap_detail, name='async-roadmap-detail'),
+    path('async/users/me/', async_views.user_me, name='async-user-me'),
+    path('events/', async_views.events, name='events'),
 ]
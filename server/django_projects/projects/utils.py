@@ -1,7 +1,93 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+jwt_authentication = JWTAuthentication()
+
+
 def get_changed_data( instance, validated_data):
         changed_data = {}
         for attr, value in validated_data.items():
             old_value = getattr(instance, attr)
             if old_value != value:
                 changed_data[attr] = (old_value, value)
-        return changed_data
\ No newline at end of file
+        return changed_data
+
+
+def describe_changes(changed_data):
+    """Render `get_changed_data` output for an Activity description."""
+    return ', '.join(
+        f"Field '{attr}' changed from '{old_value}' to '{new_value}'"
+        for attr, (old_value, new_value) in changed_data.items()
+    )
+
+
+def get_token_user_id(request):
+    """Return the user id claim of the request's JWT bearer token, or None.
+
+    Only validates the token; it doesn't touch the database.
+    """
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = jwt_authentication.get_raw_token(header)
+    except AuthenticationFailed:
+        return None
+    return get_raw_token_user_id(raw_token)
+
+
+def get_raw_token_user_id(raw_token):
+    """Return the user id claim of a raw access token, or None if it isn't valid."""
+    if not raw_token:
+        return None
+    try:
+        return jwt_authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (AuthenticationFailed, KeyError):
+        return None
+
+
+def data_version_key(user_id):
+    return f'data-version:{user_id}'
+
+
+def get_data_version(user_id):
+    """Token that changes whenever the user's data does; part of the key of per-user cached results."""
+    version = cache.get(data_version_key(user_id))
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(data_version_key(user_id), version, None)
+        version = cache.get(data_version_key(user_id), version)
+    return version
+
+
+def bump_data_version(user_id):
+    cache.set(data_version_key(user_id), uuid.uuid4().hex, None)
+
+
+async def iterate_in_thread(chunks):
+    """Async iterate a sync iterator, advancing it in the thread-sensitive thread.
+
+    That is the thread sync views run in under ASGI, so a server-side cursor
+    or transaction the iterator holds stays on its connection.
+    """
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def streaming_content(request, chunks):
+    """The content to give StreamingHttpResponse for a generator of chunks.
+
+    Under ASGI Django buffers a sync iterator whole before sending it, so
+    ASGI requests get it as an async iterator instead.
+    """
+    return iterate_in_thread(chunks) if isinstance(request, ASGIRequest) else chunks
@@ -1,14 +1,24 @@
-from django.http import JsonResponse
+import hmac
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 
 import requests
 from rest_framework.response import Response
 from rest_framework import permissions
 from rest_framework.views import APIView
+from .analytics import get_workload
+from .batch import run_batch
+from .graph import run_query
+from .metrics import render_metrics
 from .models import CustomUser, Project, Feature, Bug, Improvement, Activity
 
 from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import CustomTokenObtainPairSerializer
+from .serializers import BatchSerializer, CustomTokenObtainPairSerializer
+from .sync import sync_page
+from .utils import streaming_content
 from rest_framework_simplejwt.tokens import RefreshToken
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -22,6 +32,62 @@ def get_user_from_session(request):
         return None
     return claims.get('sub')
 
+
+STREAM_CHUNK_SIZE = 500
+
+
+def stream_json_list(request, queryset):
+    """Stream `queryset.values()` as a JSON array without buffering it.
+
+    Rows are ordered by id. `?cursor=<id>` resumes after the given id and
+    `?limit=<n>` caps the number of rows, so clients can page by passing the
+    id of the last row they received.
+
+    Under ASGI the chunks are served through an async iterator (see
+    utils.streaming_content), so the list isn't buffered there either.
+    """
+    try:
+        cursor = int(request.GET.get('cursor', 0))
+        limit = int(request.GET['limit']) if 'limit' in request.GET else None
+    except ValueError:
+        return JsonResponse({'message': 'cursor and limit must be integers'}, status=400)
+    if limit is not None and limit < 0:
+        return JsonResponse({'message': 'limit must not be negative'}, status=400)
+
+    queryset = queryset.filter(id__gt=cursor).order_by('id')
+    if limit is not None:
+        queryset = queryset[:limit]
+
+    def generate():
+        encoder = DjangoJSONEncoder()
+        separator = ''
+        chunk = []
+        yield '['
+        for row in queryset.values().iterator(chunk_size=STREAM_CHUNK_SIZE):
+            chunk.append(encoder.encode(row))
+            if len(chunk) == STREAM_CHUNK_SIZE:
+                yield separator + ', '.join(chunk)
+                separator = ', '
+                chunk = []
+        if chunk:
+            yield separator + ', '.join(chunk)
+        yield ']'
+
+    return StreamingHttpResponse(streaming_content(request, generate()), content_type='application/json')
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """Prometheus scrape endpoint. Needs METRICS_TOKEN as a bearer token; open only in DEBUG when unset."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=403)
+    elif not settings.DEBUG:
+        return HttpResponse(status=404)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class GoogleAuthView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -31,7 +97,8 @@ class GoogleAuthView(APIView):
         # Fetch user info from Google
         google_user = requests.get(
             "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"}
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=10,
         ).json()
 
         if "email" not in google_user:
@@ -53,6 +120,37 @@ class GoogleAuthView(APIView):
         })
 
 
+class WorkloadAnalyticsView(APIView):
+    """Estimated work by kind, priority, status and deadline week; see projects.analytics."""
+
+    def get(self, request):
+        return Response(get_workload(request.user))
+
+
+class BatchView(APIView):
+    """Run up to BATCH_LIMIT API requests in one round trip; see projects.batch."""
+    batchable = False
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(run_batch(request, serializer.validated_data['requests'], serializer.validated_data['atomic']))
+
+
+class QueryView(APIView):
+    """Nested query over projects, backlog, roadmaps and activities; see projects.graph."""
+
+    def post(self, request):
+        return Response(run_query(request.user, request.data))
+
+
+class SyncView(APIView):
+    """Changes to the user's workspace since `?since=<cursor>`; see projects.sync."""
+
+    def get(self, request):
+        return Response(sync_page(request.user, request.query_params.get('since')))
+
+
 @require_http_methods(["GET"])
 def project_detail(request, pk):
     user_id = get_user_from_session(request)
@@ -60,7 +158,8 @@ def project_detail(request, pk):
         return JsonResponse({'message': 'Unauthorized'}, status=401)
     
     try:
-        project = Project.objects.get(pk=pk, user_id=user_id)
+        project = Project.objects.select_related('details').get(pk=pk, user_id=user_id)
+        details = getattr(project, 'details', None)
         return JsonResponse({
             'id': project.id,
             'userId': project.user_id,
@@ -70,11 +169,11 @@ def project_detail(request, pk):
             'repoLink': project.repo_link,
             'frontendLink': project.frontend_link,
             'backendLink': project.backend_link,
-            'frontendDetails': project.frontend_details,
-            'backendDetails': project.backend_details,
-            'envDetails': project.env_details,
-            'testUserDetails': project.test_user_details,
-            'authDetails': project.auth_details,
+            'frontendDetails': details and details.frontend_details,
+            'backendDetails': details and details.backend_details,
+            'envDetails': details and details.env_details,
+            'testUserDetails': details and details.test_user_details,
+            'authDetails': details and details.auth_details,
             'setupSteps': project.setup_steps,
             'createdAt': project.created_at.isoformat(),
         })
@@ -90,8 +189,7 @@ def feature_list(request, project_id):
     
     try:
         project = Project.objects.get(pk=project_id, user_id=user_id)
-        features = Feature.objects.filter(project=project).values()
-        return JsonResponse(list(features), safe=False)
+        return stream_json_list(request, Feature.objects.filter(project=project))
     except Project.DoesNotExist:
         return JsonResponse({'message': 'Not found'}, status=404)
 
@@ -103,7 +201,7 @@ def feature_detail(request, pk):
         return JsonResponse({'message': 'Unauthorized'}, status=401)
     
     try:
-        feature = Feature.objects.select_related('project').get(pk=pk, project__user_id=user_id)
+        feature = Feature.live.select_related('project').get(pk=pk, project__user_id=user_id)
         return JsonResponse({
             'id': feature.id,
             'projectId': feature.project_id,
@@ -125,8 +223,7 @@ def bug_list(request, project_id):
     
     try:
         project = Project.objects.get(pk=project_id, user_id=user_id)
-        bugs = Bug.objects.filter(project=project).values()
-        return JsonResponse(list(bugs), safe=False)
+        return stream_json_list(request, Bug.objects.filter(project=project))
     except Project.DoesNotExist:
         return JsonResponse({'message': 'Not found'}, status=404)
 
@@ -138,7 +235,7 @@ def bug_detail(request, pk):
         return JsonResponse({'message': 'Unauthorized'}, status=401)
     
     try:
-        bug = Bug.objects.select_related('project').get(pk=pk, project__user_id=user_id)
+        bug = Bug.live.select_related('project').get(pk=pk, project__user_id=user_id)
         return JsonResponse({
             'id': bug.id,
             'projectId': bug.project_id,
@@ -160,8 +257,7 @@ def improvement_list(request, project_id):
     
     try:
         project = Project.objects.get(pk=project_id, user_id=user_id)
-        improvements = Improvement.objects.filter(project=project).values()
-        return JsonResponse(list(improvements), safe=False)
+        return stream_json_list(request, Improvement.objects.filter(project=project))
     except Project.DoesNotExist:
         return JsonResponse({'message': 'Not found'}, status=404)
 
@@ -173,7 +269,7 @@ def improvement_detail(request, pk):
         return JsonResponse({'message': 'Unauthorized'}, status=401)
     
     try:
-        improvement = Improvement.objects.select_related('project').get(pk=pk, project__user_id=user_id)
+        improvement = Improvement.live.select_related('project').get(pk=pk, project__user_id=user_id)
         return JsonResponse({
             'id': improvement.id,
             'projectId': improvement.project_id,
@@ -195,7 +291,6 @@ def activity_list(request, project_id):
     
     try:
         project = Project.objects.get(pk=project_id, user_id=user_id)
-        activities = Activity.objects.filter(project=project).values()
-        return JsonResponse(list(activities), safe=False)
+        return stream_json_list(request, Activity.objects.filter(project=project))
     except Project.DoesNotExist:
         return JsonResponse({'message': 'Not found'}, status=404)
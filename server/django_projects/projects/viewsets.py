@@ -1,55 +1,191 @@
+from datetime import date
+
 from rest_framework import viewsets, permissions
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from .models import CustomUser, Project, Feature, Bug, Improvement, Activity, Roadmap, RoadmapPhase, RoadmapItem
+from . import singleflight
+from .archive import export_archive, import_archive
+from .bulk import BULK_LINK_LIMIT, LINK_FIELDS, bulk_link, clone_roadmap, link_target_errors, unlink_roadmap_items
+from .forecasting import DEFAULT_SIMULATIONS, MAX_SIMULATIONS, ForecastTooLarge, forecast_roadmap
+from .metrics import COALESCED_REQUESTS
+from .scheduling import DEFAULT_WEEKLY_CAPACITY, MIN_WEEKLY_CAPACITY, get_roadmap_schedule
 from .serializers import (
     BugStatusUpdateSerializer, CustomUserSerializer, FeatureStatusUpdateSerializer, ImprovementStatusUpdateSerializer, ImprovementStatusUpdateSerializer, ProjectSerializer, FeatureSerializer,
-    BugSerializer, ImprovementSerializer, ActivitySerializer, RoadmapSerializer, RoadmapPhaseSerializer, RoadmapItemSerializer
+    BugSerializer, ImprovementSerializer, ActivitySerializer, RoadmapSerializer, RoadmapPhaseSerializer, RoadmapItemSerializer,
+    RoadmapItemLinkSerializer, RoadmapCloneSerializer,
 )
+from .utils import get_data_version, streaming_content
+
+def delete_with_activity(instance, entity, description, project=None):
+    """Delete `instance` and log it; delete Activities are the tombstones /api/sync/ serves."""
+    entity_id = instance.id  # delete() clears the pk
+    project = project or instance.project
+    link_fields = [field for field, (model, _) in LINK_FIELDS.items() if isinstance(instance, model)]
+    with transaction.atomic():
+        if link_fields:
+            # Unlink (and stamp) the roadmap items pointing here before SET_NULL does it silently.
+            unlink_roadmap_items({field: [entity_id] for field in link_fields})
+        instance.delete()
+        Activity.objects.create(
+            project=project,
+            type="delete",
+            entity=entity,
+            entity_id=entity_id,
+            description=description
+        )
+
 
 class IsOwner(permissions.BasePermission):
     """Custom permission to check if user owns the project."""
     def has_object_permission(self, request, view, obj):
         if isinstance(obj, Project):
-            return obj.user == request.user
+            return obj.user_id == request.user.id
         elif isinstance(obj, (Feature, Bug, Improvement, Activity)):
-            return obj.project.user == request.user
+            return obj.project.user_id == request.user.id
         elif isinstance(obj, Roadmap):
-            return obj.project.user == request.user
+            return obj.project.user_id == request.user.id
         elif isinstance(obj, RoadmapPhase):
-            return obj.roadmap.project.user == request.user
+            return obj.roadmap.project.user_id == request.user.id
         elif isinstance(obj, RoadmapItem):
-            return obj.roadmap_phase.roadmap.project.user == request.user
+            return obj.roadmap_phase.roadmap.project.user_id == request.user.id
         return False
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class SparseFieldsetMixin:
+    """Support `?fields=a,b`, `?exclude=a,b` and `?include=a,b` on GET requests.
+
+    The serializer renders only the requested fields (plus the optional ones
+    named in `include`) and the queryset skips the columns and prefetches the
+    others would have needed. That's done for the actions in
+    `sparse_fieldset_actions`; an extra action listed there names the
+    serializer it renders with `@action(serializer_class=...)`, renders through
+    get_serializer and trims its own queryset with `sparse_queryset`.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_sparse_fieldset(self):
+        if self.request.method not in permissions.SAFE_METHODS or self.action not in self.sparse_fieldset_actions:
+            return {}
+        params = self.request.query_params
+        return {
+            key: [name.strip() for name in params[key].split(',') if name.strip()]
+            for key in ('fields', 'exclude', 'include') if key in params
+        }
+
+    def get_serializer(self, *args, **kwargs):
+        for key, names in self.get_sparse_fieldset().items():
+            kwargs.setdefault(key, names)
+        return super().get_serializer(*args, **kwargs)
+
+    def sparse_queryset(self, queryset):
+        fieldset = self.get_sparse_fieldset()
+        if fieldset:
+            queryset = self.get_serializer_class()(**fieldset).sparse_queryset(queryset)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Extra actions look up the viewset's object here but render something else.
+        return self.sparse_queryset(queryset) if self.action in ('list', 'retrieve') else queryset
+
+
+class SingleFlightMixin:
+    """Coalesce identical concurrent GETs of the same user on list and retrieve.
+
+    Requests for the same path and query that arrive while one is being
+    computed wait for it and get its data instead of running the same
+    queries and nested serialization again. The key includes the user's
+    data version, so a request made after a write never gets data computed
+    before it. Each request still renders the shared data itself.
+    """
+    single_flight_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self.coalesce(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.coalesce(super().retrieve, request, *args, **kwargs)
+
+    def coalesce(self, handler, request, *args, **kwargs):
+        if request.method != 'GET' or self.action not in self.single_flight_actions or not request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            return response, dict(response.items())
+
+        key = (request.user.id, get_data_version(request.user.id), request.get_full_path())
+        (response, headers), shared = singleflight.requests.do(key, compute, timeout=settings.SINGLE_FLIGHT_TIMEOUT)
+        if not shared:
+            return response
+        COALESCED_REQUESTS.inc({'view': type(self).__name__, 'action': self.action})
+        return Response(response.data, status=response.status_code, headers=headers)
+
+
+class OnRoadmapFilterMixin:
+    """`?on_roadmap=true|false` keeps only backlog entries that are (or aren't) linked from a roadmap item.
+
+    Runs as an EXISTS / NOT EXISTS on the indexed roadmap item link column.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        on_roadmap = self.request.query_params.get('on_roadmap')
+        if on_roadmap is None:
+            return queryset
+        if on_roadmap not in ('true', 'false'):
+            raise ValidationError({'on_roadmap': ["Must be 'true' or 'false'."]})
+        link = queryset.model.roadmap_items.field.name
+        linked = Exists(RoadmapItem.objects.filter(**{link: OuterRef('pk')}))
+        return queryset.filter(linked if on_roadmap == 'true' else ~linked)
+
+
+class ProjectViewSet(SingleFlightMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    sparse_fieldset_actions = ('list', 'retrieve', 'activities', 'roadmaps')
 
     def get_queryset(self):
-        queryset = Project.objects.filter(user=self.request.user).prefetch_related(
-            'feature_set', 'bug_set', 'improvement_set'
-        ).order_by("-id")
+        queryset = Project.objects.filter(user=self.request.user).order_by("-id")
+        if self.action in ('destroy', 'export', 'activities', 'roadmaps'):
+            return queryset  # they don't render the project
+        queryset = queryset.prefetch_related('feature_set', 'bug_set', 'improvement_set')
+        if self.action != 'list':
+            queryset = queryset.select_related('details')
         status = self.request.query_params.get('status', None)
         if status:
             queryset = queryset.filter(status=status)
         return queryset
 
+    def get_sparse_fieldset(self):
+        fieldset = super().get_sparse_fieldset()
+        if self.action == 'list' and 'fields' not in fieldset:
+            fieldset['exclude'] = [*fieldset.get('exclude', ()), *ProjectSerializer.Meta.detail_fields]
+        return fieldset
+
     def perform_destroy(self, instance):
+        # Hidden right away; purge_deleted_projects removes the rows later.
         self.check_object_permissions(self.request, instance)
-        instance.delete()
+        instance.deleted_at = timezone.now()
+        instance.save(update_fields=['deleted_at', 'updated_at'])
 
 
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], serializer_class=ActivitySerializer)
     def activities(self, request, pk=None):
         project = self.get_object()
         activities = Activity.objects.filter(project=project).order_by('-created_at')
-        serializer = ActivitySerializer(activities, many=True)
+        serializer = self.get_serializer(self.sparse_queryset(activities), many=True)
         return Response(serializer.data)
 
-    @action(detail=True, methods=['get', 'post'])
+    @action(detail=True, methods=['get', 'post'], serializer_class=RoadmapSerializer)
     def roadmaps(self, request, pk=None):
         """Get all roadmaps or create new roadmap for this project."""
         project = self.get_object()
@@ -64,12 +200,38 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=201)
         
         roadmaps = Roadmap.objects.filter(project=project).prefetch_related('phases__items')
-        serializer = RoadmapSerializer(roadmaps, many=True)
+        serializer = self.get_serializer(self.sparse_queryset(roadmaps), many=True)
         return Response(serializer.data)
 
-
-
-class FeatureViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Download the project with its backlog, roadmaps and activities as a streamed archive."""
+        project = self.get_object()
+        # The Django request underneath DRF's tells ASGI from WSGI.
+        chunks = streaming_content(request._request, export_archive(project))
+        response = StreamingHttpResponse(chunks, content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="project-{project.id}.ndjson.gz"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_archive(self, request):
+        """Create a new project from an archive made by `export`.
+
+        The archive is either the raw request body or an `archive` multipart
+        upload; `?name=` renames the imported project.
+        """
+        if request.content_type.startswith('multipart/'):
+            stream = request.FILES.get('archive')
+        else:
+            stream = request.stream
+        if stream is None:
+            raise ValidationError({'archive': ['No archive was uploaded.']})
+        project, counts = import_archive(stream, request.user, name=request.query_params.get('name'))
+        return Response({'id': project.id, 'name': project.name, 'counts': counts}, status=201)
+
+
+
+class FeatureViewSet(OnRoadmapFilterMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = FeatureSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     
@@ -79,7 +241,7 @@ class FeatureViewSet(viewsets.ModelViewSet):
         return FeatureSerializer
 
     def get_queryset(self):
-        return Feature.objects.filter(project__user=self.request.user)
+        return Feature.live.filter(project__user=self.request.user)
 
     def perform_create(self, serializer):
         project_id = self.request.data.get('projectId') or self.kwargs.get('project_id')        
@@ -88,8 +250,8 @@ class FeatureViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         self.check_object_permissions(self.request, instance)
-        instance.delete()
-        
+        delete_with_activity(instance, "feature", f"Feature '{instance.description}' deleted")
+
     @action(detail=True, methods=["PUT"], url_path="update-status")
     def update_status(self, request, pk=None):
         feature = self.get_object()
@@ -103,7 +265,7 @@ class FeatureViewSet(viewsets.ModelViewSet):
 
 
 
-class BugViewSet(viewsets.ModelViewSet):
+class BugViewSet(OnRoadmapFilterMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = BugSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     
@@ -113,7 +275,7 @@ class BugViewSet(viewsets.ModelViewSet):
         return BugSerializer
 
     def get_queryset(self):
-        return Bug.objects.filter(project__user=self.request.user)
+        return Bug.live.filter(project__user=self.request.user)
 
     def perform_create(self, serializer):
         project_id = self.request.data.get('projectId') or self.kwargs.get('project_id')
@@ -122,8 +284,8 @@ class BugViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         self.check_object_permissions(self.request, instance)
-        instance.delete()
-    
+        delete_with_activity(instance, "bug", f"Bug '{instance.description}' deleted")
+
     @action(detail=True, methods=["PUT"], url_path="update-status")
     def update_status(self, request, pk=None):
         feature = self.get_object()
@@ -135,7 +297,7 @@ class BugViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ImprovementViewSet(viewsets.ModelViewSet):
+class ImprovementViewSet(OnRoadmapFilterMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ImprovementSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     
@@ -145,7 +307,7 @@ class ImprovementViewSet(viewsets.ModelViewSet):
         return ImprovementSerializer
 
     def get_queryset(self):
-        return Improvement.objects.filter(project__user=self.request.user)
+        return Improvement.live.filter(project__user=self.request.user)
 
     def perform_create(self, serializer):
         project_id = self.request.data.get('projectId') or self.kwargs.get('project_id')
@@ -154,8 +316,8 @@ class ImprovementViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         self.check_object_permissions(self.request, instance)
-        instance.delete()
-    
+        delete_with_activity(instance, "improvement", f"Improvement '{instance.description}' deleted")
+
     @action(detail=True, methods=["PUT"], url_path="update-status")
     def update_status(self, request, pk=None):
         feature = self.get_object()
@@ -167,18 +329,19 @@ class ImprovementViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
+class ActivityViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Activity.objects.filter(project__user=self.request.user).order_by('-created_at')
+        return Activity.live.filter(project__user=self.request.user).order_by('-created_at')
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    sparse_fieldset_actions = ('list', 'retrieve', 'me')
 
     @action(detail=False, methods=['get'])
     def me(self, request):
@@ -187,12 +350,16 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class RoadmapViewSet(viewsets.ModelViewSet):
+class RoadmapViewSet(SingleFlightMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = RoadmapSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    sparse_fieldset_actions = ('list', 'retrieve', 'phases')
 
     def get_queryset(self):
-        return Roadmap.objects.filter(project__user=self.request.user).prefetch_related('phases__items')
+        queryset = Roadmap.live.filter(project__user=self.request.user)
+        if self.action in ('schedule', 'forecast'):
+            return queryset.select_related('project')  # they load phases themselves
+        return queryset.prefetch_related('phases__items')
 
     def perform_create(self, serializer):
         project_id = self.request.data.get('projectId')
@@ -201,18 +368,68 @@ class RoadmapViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         self.check_object_permissions(self.request, instance)
-        activity_project = instance.project
-        activity_name = instance.name
-        instance.delete()
-        Activity.objects.create(
-            project=activity_project,
-            type="delete",
-            entity="roadmap",
-            entity_id=instance.id,
-            description=f"Roadmap '{activity_name}' deleted"
-        )
+        delete_with_activity(instance, "roadmap", f"Roadmap '{instance.name}' deleted")
+
+    PROJECTION_OVERFLOW = 'The projection runs past the year 9999; raise the capacity or check the estimates.'
+
+    def get_projection_params(self):
+        """`?capacity=<hours per week>` (default 40) and `?start=<date>` (default today) for projections."""
+        params = self.request.query_params
+        try:
+            capacity = float(params.get('capacity', DEFAULT_WEEKLY_CAPACITY))
+            if not MIN_WEEKLY_CAPACITY <= capacity < float('inf'):
+                raise ValueError
+        except ValueError:
+            raise ValidationError({'capacity': [f'Must be at least {MIN_WEEKLY_CAPACITY} hours per week.']})
+        try:
+            start = date.fromisoformat(params['start']) if 'start' in params else timezone.localdate()
+        except ValueError:
+            raise ValidationError({'start': ['Must be a date in YYYY-MM-DD format.']})
+        return capacity, start
+
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        """Projected start/finish per phase and item."""
+        roadmap = self.get_object()
+        try:
+            return Response(get_roadmap_schedule(roadmap, *self.get_projection_params()))
+        except OverflowError:
+            raise ValidationError({'capacity': [self.PROJECTION_OVERFLOW]})
 
-    @action(detail=True, methods=['get', 'post'])
+    @action(detail=True, methods=['get'])
+    def forecast(self, request, pk=None):
+        """P50/P85/P95 finish dates per phase from `?simulations=` Monte Carlo runs (optional `?seed=`)."""
+        roadmap = self.get_object()
+        capacity, start = self.get_projection_params()
+        try:
+            simulations = int(request.query_params.get('simulations', DEFAULT_SIMULATIONS))
+            seed = int(request.query_params['seed']) if 'seed' in request.query_params else None
+            if not 1 <= simulations <= MAX_SIMULATIONS:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({'simulations': [f'Must be between 1 and {MAX_SIMULATIONS}; seed must be an integer.']})
+        try:
+            return Response(forecast_roadmap(roadmap, capacity, start, simulations, seed))
+        except ForecastTooLarge as error:
+            raise ValidationError({'simulations': [str(error)]})
+        except OverflowError:
+            raise ValidationError({'capacity': [self.PROJECTION_OVERFLOW]})
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """Copy the roadmap with all its phases and items, optionally into another project (`projectId`)."""
+        roadmap = self.get_object()
+        options = RoadmapCloneSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        options = options.validated_data
+        project = roadmap.project
+        if options.get('project_id', project.id) != project.id:
+            project = get_object_or_404(Project, id=options['project_id'], user=request.user)
+        copy = clone_roadmap(roadmap, project, options.get('name'), options['shift_days'], options['reset_status'])
+        copy = self.get_queryset().get(pk=copy.pk)
+        return Response(self.get_serializer(copy).data, status=201)
+
+    @action(detail=True, methods=['get', 'post'], serializer_class=RoadmapPhaseSerializer)
     def phases(self, request, pk=None):
         """Get all phases or create new phase for this roadmap."""
         roadmap = self.get_object()
@@ -234,16 +451,17 @@ class RoadmapViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=201)
         
         phases = RoadmapPhase.objects.filter(roadmap=roadmap).prefetch_related('items')
-        serializer = RoadmapPhaseSerializer(phases, many=True)
+        serializer = self.get_serializer(self.sparse_queryset(phases), many=True)
         return Response(serializer.data)
 
 
-class RoadmapPhaseViewSet(viewsets.ModelViewSet):
+class RoadmapPhaseViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = RoadmapPhaseSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    sparse_fieldset_actions = ('list', 'retrieve', 'items')
 
     def get_queryset(self):
-        return RoadmapPhase.objects.filter(roadmap__project__user=self.request.user).prefetch_related('items')
+        return RoadmapPhase.live.filter(roadmap__project__user=self.request.user).prefetch_related('items')
 
     def perform_create(self, serializer):
         roadmap_id = self.request.data.get('roadmapId')
@@ -252,18 +470,9 @@ class RoadmapPhaseViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         self.check_object_permissions(self.request, instance)
-        roadmap = instance.roadmap
-        phase_name = instance.name
-        instance.delete()
-        Activity.objects.create(
-            project=roadmap.project,
-            type="delete",
-            entity="roadmap_phase",
-            entity_id=instance.id,
-            description=f"Phase '{phase_name}' deleted"
-        )
+        delete_with_activity(instance, "roadmap_phase", f"Phase '{instance.name}' deleted", project=instance.roadmap.project)
 
-    @action(detail=True, methods=['get', 'post'])
+    @action(detail=True, methods=['get', 'post'], serializer_class=RoadmapItemSerializer)
     def items(self, request, pk=None):
         """Get all items or create new item for this phase."""
         phase = self.get_object()
@@ -274,24 +483,11 @@ class RoadmapPhaseViewSet(viewsets.ModelViewSet):
             data['roadmapPhaseId'] = phase.id
             serializer = RoadmapItemSerializer(data=data)
             serializer.is_valid(raise_exception=True)
-            
-            # Handle linked items
-            linked_feature_id = request.data.get('linkedFeatureId')
-            linked_bug_id = request.data.get('linkedBugId')
-            linked_improvement_id = request.data.get('linkedImprovementId')
-            
-            if linked_feature_id:
-                serializer.validated_data['linked_feature_id'] = linked_feature_id
-            if linked_bug_id:
-                serializer.validated_data['linked_bug_id'] = linked_bug_id
-            if linked_improvement_id:
-                serializer.validated_data['linked_improvement_id'] = linked_improvement_id
-            
-            serializer.save(roadmap_phase=phase)
+            serializer.save(roadmap_phase=phase)  # checks the links against the phase's project
             return Response(serializer.data, status=201)
         
         items = RoadmapItem.objects.filter(roadmap_phase=phase)
-        serializer = RoadmapItemSerializer(items, many=True)
+        serializer = self.get_serializer(self.sparse_queryset(items), many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['put'])
@@ -302,24 +498,28 @@ class RoadmapPhaseViewSet(viewsets.ModelViewSet):
         
         old_status = phase.status
         phase.status = request.data.get('status', phase.status)
-        phase.save()
-        Activity.objects.create(
-            project=phase.roadmap.project,
-            type="status_change",
-            entity="roadmap_phase",
-            entity_id=phase.id,
-            description=f"Phase '{phase.name}' status changed from '{old_status}' to '{phase.status}'"
-        )
+        if phase.status != old_status:
+            phase.save(update_fields=['status', 'updated_at'])
+            Activity.objects.create(
+                project=phase.roadmap.project,
+                type="status_change",
+                entity="roadmap_phase",
+                entity_id=phase.id,
+                description=f"Phase '{phase.name}' status changed from '{old_status}' to '{phase.status}'"
+            )
         serializer = self.get_serializer(phase)
         return Response(serializer.data)
 
 
-class RoadmapItemViewSet(viewsets.ModelViewSet):
+class RoadmapItemViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = RoadmapItemSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
 
     def get_queryset(self):
-        return RoadmapItem.objects.filter(roadmap_phase__roadmap__project__user=self.request.user)
+        queryset = RoadmapItem.live.filter(roadmap_phase__roadmap__project__user=self.request.user)
+        if self.action in ('link', 'unlink', 'update', 'partial_update'):
+            queryset = queryset.select_related('roadmap_phase__roadmap')  # for link scoping and the Activity
+        return queryset
 
     def perform_create(self, serializer):
         # Get roadmapPhaseId from request body (required for flat endpoint)
@@ -330,33 +530,15 @@ class RoadmapItemViewSet(viewsets.ModelViewSet):
                 status=400
             )
         
-        phase = get_object_or_404(RoadmapPhase, id=phase_id, roadmap__project__user=self.request.user)
-        
-        # Handle linked items
-        linked_feature_id = self.request.data.get('linkedFeatureId')
-        linked_bug_id = self.request.data.get('linkedBugId')
-        linked_improvement_id = self.request.data.get('linkedImprovementId')
-        
-        if linked_feature_id:
-            serializer.validated_data['linked_feature_id'] = linked_feature_id
-        if linked_bug_id:
-            serializer.validated_data['linked_bug_id'] = linked_bug_id
-        if linked_improvement_id:
-            serializer.validated_data['linked_improvement_id'] = linked_improvement_id
-        
+        phase = get_object_or_404(
+            RoadmapPhase.live.select_related('roadmap'), id=phase_id, roadmap__project__user=self.request.user
+        )
         serializer.save(roadmap_phase=phase)
 
     def perform_destroy(self, instance):
         self.check_object_permissions(self.request, instance)
-        project = instance.roadmap_phase.roadmap.project
-        item_title = instance.title
-        instance.delete()
-        Activity.objects.create(
-            project=project,
-            type="delete",
-            entity="roadmap_item",
-            entity_id=instance.id,
-            description=f"Item '{item_title}' deleted"
+        delete_with_activity(
+            instance, "roadmap_item", f"Item '{instance.title}' deleted", project=instance.roadmap_phase.roadmap.project
         )
 
     @action(detail=True, methods=["patch"], url_path="update-status")
@@ -364,61 +546,73 @@ class RoadmapItemViewSet(viewsets.ModelViewSet):
         item = self.get_object()
         old_status = item.status
         item.status = request.data.get('status', item.status)
-        item.save()
-        Activity.objects.create(
-            project=item.roadmap_phase.roadmap.project,
-            type="status_change",
-            entity="roadmap_item",
-            entity_id=item.id,
-            description=f"Item '{item.title}' status changed from '{old_status}' to '{item.status}'"
-        )
+        if item.status != old_status:
+            item.save(update_fields=['status', 'updated_at'])
+            Activity.objects.create(
+                project=item.roadmap_phase.roadmap.project,
+                type="status_change",
+                entity="roadmap_item",
+                entity_id=item.id,
+                description=f"Item '{item.title}' status changed from '{old_status}' to '{item.status}'"
+            )
         serializer = self.get_serializer(item)
         return Response(serializer.data)
 
-    @action(detail=True, methods=["PATCH"], url_path="link")
-    def link(self, request, pk=None):
-        item = self.get_object()
-        feature_id = request.data.get('linkedFeatureId')
-        bug_id = request.data.get('linkedBugId')
-        improvement_id = request.data.get('linkedImprovementId')
-        
-        if feature_id:
-            item.linked_feature = get_object_or_404(Feature, id=feature_id)
-        if bug_id:
-            item.linked_bug = get_object_or_404(Bug, id=bug_id)
-        if improvement_id:
-            item.linked_improvement = get_object_or_404(Improvement, id=improvement_id)
-        
-        item.save()
+    def save_links(self, item, links, description):
+        """Write the link fields in `links` that changed and log them."""
+        changed = [field for field, value in links.items() if getattr(item, field) != value]
+        if not changed:
+            return
+        for field in changed:
+            setattr(item, field, links[field])
+        item.save(update_fields=[*changed, 'updated_at'])
         Activity.objects.create(
-            project=item.roadmap_phase.roadmap.project,
+            project_id=item.roadmap_phase.roadmap.project_id,
             type="update",
             entity="roadmap_item",
             entity_id=item.id,
-            description=f"Item '{item.title}' linked to feature/bug/improvement"
+            description=description
         )
+
+    @action(detail=True, methods=["PATCH"], url_path="link")
+    def link(self, request, pk=None):
+        item = self.get_object()
+        links = {
+            field: request.data[name] for field, (_, name) in LINK_FIELDS.items() if request.data.get(name)
+        }
+        try:
+            links = {field: int(value) for field, value in links.items()}
+        except (TypeError, ValueError):
+            raise ValidationError({'detail': ['Link ids must be integers.']})
+        errors = link_target_errors([(item.roadmap_phase.roadmap.project_id, links)])[0]
+        if errors:
+            raise ValidationError(errors)
+        self.save_links(item, links, f"Item '{item.title}' linked to feature/bug/improvement")
         serializer = self.get_serializer(item)
         return Response(serializer.data)
 
     @action(detail=True, methods=["PATCH"], url_path="unlink")
     def unlink(self, request, pk=None):
+        """Clear `link_type` ('feature', 'bug' or 'improvement', or a list of them)."""
         item = self.get_object()
-        link_type = request.data.get('link_type')
-        
-        if link_type == 'feature':
-            item.linked_feature = None
-        elif link_type == 'bug':
-            item.linked_bug = None
-        elif link_type == 'improvement':
-            item.linked_improvement = None
-        
-        item.save()
-        Activity.objects.create(
-            project=item.roadmap_phase.roadmap.project,
-            type="update",
-            entity="roadmap_item",
-            entity_id=item.id,
-            description=f"Item '{item.title}' unlinked from {link_type}"
-        )
+        link_types = request.data.get('link_type') if isinstance(request.data, dict) else None
+        link_types = [link_types] if isinstance(link_types, str) else link_types
+        if not isinstance(link_types, list) or not all(isinstance(link_type, str) for link_type in link_types):
+            link_types = []
+        fields = {f'linked_{link_type}_id' for link_type in link_types}
+        if not fields or not fields <= set(LINK_FIELDS):
+            raise ValidationError({'link_type': ["Must be 'feature', 'bug' or 'improvement', or a list of them."]})
+        self.save_links(item, dict.fromkeys(fields), f"Item '{item.title}' unlinked from {', '.join(link_types)}")
         serializer = self.get_serializer(item)
         return Response(serializer.data)
+
+    @action(detail=False, methods=["POST"], url_path="bulk-link")
+    def bulk_link(self, request):
+        """Link or unlink many items in one request: `{"links": [{"itemId", "linkedFeatureId", ...}]}`."""
+        links = request.data.get('links') if isinstance(request.data, dict) else None
+        if not isinstance(links, list) or not 0 < len(links) <= BULK_LINK_LIMIT:
+            raise ValidationError({'links': [f'Must be a list of 1 to {BULK_LINK_LIMIT} links.']})
+        serializer = RoadmapItemLinkSerializer(data=links, many=True)
+        serializer.is_valid(raise_exception=True)
+        items = bulk_link(self.get_queryset(), serializer.validated_data)
+        return Response(self.get_serializer(items, many=True).data)